@@ -1,7 +1,67 @@
-from flask import Flask, request, jsonify
+import os
+import sys
+from time import perf_counter
+
+import numpy as np
+from flask import Flask, Response, request, jsonify
+
+# Allow `python flask_api.py` from inside backend/ as well as imports from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.shared import compact_model, config, metrics, simulation
+from backend.shared.audit_log import get_audit_log
+from backend.shared.model_registry import get_registry
+from backend.shared.result_cache import get_cache, normalize
+from backend.shared.tax_engine import get_engine, grid_points, income_grid
+from backend.shared.validation import (
+    INVALID_TYPE_ERROR,
+    MISSING_FIELDS_ERROR,
+    PayloadError,
+    parse_batch_payload,
+    parse_scalar,
+    parse_simulation,
+    parse_sweep,
+    validate_rows,
+)
 
 app = Flask(__name__)
 
+# ✅ Load the model once per worker (before the first request), then hot-reload in the background
+registry = get_registry()
+registry.load()
+engine = get_engine()
+cache = get_cache()
+# Every /predict and /predict/batch result, written to DATABASE_URL by a background thread
+audit = get_audit_log()
+
+# Used when no trained model is available: the bracket engine computes the tax directly
+ENGINE_VERSION = 'tax-engine'
+
+# ✅ Request metrics, exposed at /metrics (see shared/metrics.py)
+NAN = float('nan')
+PREDICT_STAGES = ('parse', 'validate', 'cache', 'model', 'serialize', 'total')
+predict_seconds = metrics.Histogram(
+    'tax_api_predict_stage_seconds', 'Time spent in each stage of /predict (model: cache misses only).',
+    'stage', PREDICT_STAGES)
+predict_errors = metrics.Counter(
+    'tax_api_predict_errors_total', 'Rejected /predict requests by error.',
+    'error', ('missing_fields', 'invalid_type'))
+
+
+def predict_tax(loaded, income, year):
+    """Predicted tax for income/year arrays using a registry snapshot.
+
+    The model predicts an effective rate in percent from (year, income).
+    """
+    if loaded is None:
+        return engine.liability(income, year)
+    rate = loaded.model.predict(np.column_stack((year, income)))
+    return income * rate / 100
+
+
+def model_version(loaded):
+    return ENGINE_VERSION if loaded is None else loaded.version
+
 # ✅ Optional homepage route (for browser testing)
 @app.route('/')
 def home():
@@ -10,24 +70,243 @@ def home():
 # ✅ Main prediction route
 @app.route('/predict', methods=['POST'])
 def predict():
+    start = perf_counter()
     data = request.get_json(force=True)
+    parsed = perf_counter()
     income = data.get('income')
     year = data.get('year')
 
     # Validate inputs
     if income is None or year is None:
-        return jsonify({'error': 'Missing required fields: income and year'}), 400
+        predict_errors.inc('missing_fields')
+        return jsonify({'error': MISSING_FIELDS_ERROR}), 400
+
+    try:
+        income, year = normalize(*parse_scalar(income, year))
+    except (TypeError, ValueError):
+        predict_errors.inc('invalid_type')
+        return jsonify({'error': INVALID_TYPE_ERROR}), 400
+    validated = perf_counter()
+
+    loaded = registry.get()
+    version = model_version(loaded)
+    predicted_tax = cache.get(income, year, version) if cache is not None else None
+    cached = predicted_tax is not None
+    looked_up = scored = perf_counter()
+    model_seconds = NAN
+    if not cached:
+        tax = predict_tax(loaded, np.array([income]), np.array([year]))
+        predicted_tax = round(float(tax[0]), 2)
+        if cache is not None:
+            cache.set(income, year, version, predicted_tax)
+        scored = perf_counter()
+        model_seconds = scored - looked_up
+
+    response = jsonify({'predicted_tax': predicted_tax, 'model_version': version})
+    done = perf_counter()
+    # One value per PREDICT_STAGES entry
+    predict_seconds.observe((parsed - start, validated - parsed, looked_up - validated, model_seconds,
+                             done - scored, done - start))
+    if audit is not None:
+        audit.record('predict', income, year, predicted_tax, version, (done - start) * 1e3, cached=cached)
+    return response, 200
+
+# ✅ Result cache statistics
+@app.route('/cache/stats')
+def cache_stats():
+    if cache is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify(dict(cache.stats(), enabled=True)), 200
+
+# ✅ Audit log statistics
+@app.route('/audit/stats')
+def audit_stats():
+    if audit is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify(dict(audit.stats(), enabled=True)), 200
+
+# ✅ Prometheus metrics: /predict stage timings and errors, model and result cache state
+METRIC_KINDS = {
+    'tax_api_model_info': ('gauge', 'Model being served (value is always 1).'),
+    'tax_api_model_loaded_timestamp_seconds': ('gauge', 'When the served model was loaded.'),
+    'tax_api_model_reloads_total': ('counter', 'Models loaded by this worker.'),
+    'tax_api_model_reload_errors_total': ('counter', 'Model files that failed to load.'),
+    'tax_api_result_cache_lookups_total': ('counter', 'Result cache lookups by outcome.'),
+    'tax_api_result_cache_evictions_total': ('counter', 'Entries dropped to stay within the size limit.'),
+    'tax_api_result_cache_expirations_total': ('counter', 'Entries dropped after their TTL.'),
+    'tax_api_result_cache_invalidations_total': ('counter', 'Cache flushes caused by a new model version.'),
+    'tax_api_result_cache_store_errors_total': ('counter', 'Shared store calls that failed (treated as misses).'),
+    'tax_api_result_cache_size': ('gauge', 'Entries in the in-process result cache.'),
+    'tax_api_result_cache_hit_ratio': ('gauge', 'Share of lookups answered from the cache.'),
+    'tax_api_audit_rows_total': ('counter', 'Audit log rows by outcome.'),
+    'tax_api_audit_blocked_total': ('counter', 'Requests that waited for room in the full audit buffer.'),
+    'tax_api_audit_batches_total': ('counter', 'Audit log transactions committed.'),
+    'tax_api_audit_queue_size': ('gauge', 'Audit rows buffered, not yet written.'),
+}
+
+
+def metric_samples():
+    loaded = registry.get()
+    source = 'engine' if loaded is None else (
+        'compact' if isinstance(loaded.model, compact_model.CompactModel) else 'pickle')
+    samples = [
+        metrics.sample('tax_api_model_info', 1, {'version': model_version(loaded), 'source': source}.items()),
+        metrics.sample('tax_api_model_reloads_total', registry.reloads),
+        metrics.sample('tax_api_model_reload_errors_total', registry.reload_errors),
+    ]
+    if loaded is not None:
+        samples.append(metrics.sample('tax_api_model_loaded_timestamp_seconds', loaded.loaded_at))
+    if cache is not None:
+        stats = cache.stats()
+        samples += [metrics.sample('tax_api_result_cache_lookups_total', stats[key], (('result', result),))
+                    for key, result in (('hits', 'hit'), ('shared_hits', 'shared_hit'), ('misses', 'miss'))]
+        samples += [metrics.sample(f'tax_api_result_cache_{key}_total', stats[key])
+                    for key in ('evictions', 'expirations', 'invalidations', 'store_errors')]
+        samples.append(metrics.sample('tax_api_result_cache_size', stats['size']))
+        samples.append(metrics.sample('tax_api_result_cache_hit_ratio', stats['hit_ratio']))
+    if audit is not None:
+        stats = audit.stats()
+        samples += [metrics.sample('tax_api_audit_rows_total', stats[key], (('result', key),))
+                    for key in ('written', 'dropped', 'failed')]
+        samples.append(metrics.sample('tax_api_audit_blocked_total', stats['blocked']))
+        samples.append(metrics.sample('tax_api_audit_batches_total', stats['batches']))
+        samples.append(metrics.sample('tax_api_audit_queue_size', stats['queued']))
+    return samples
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    body = metrics.render((predict_seconds, predict_errors), metric_samples(), METRIC_KINDS)
+    return Response(body, content_type=metrics.CONTENT_TYPE)
+
+# ✅ Bracket-engine tax for one income/year
+@app.route('/tax', methods=['POST'])
+def tax():
+    data = request.get_json(force=True)
+    income = data.get('income')
+    year = data.get('year')
+
+    if income is None or year is None:
+        return jsonify({'error': MISSING_FIELDS_ERROR}), 400
+
+    try:
+        income, year = parse_scalar(income, year)
+    except (TypeError, ValueError):
+        return jsonify({'error': INVALID_TYPE_ERROR}), 400
+
+    return jsonify({
+        'computed_tax': round(float(engine.liability(income, year)), 2),
+        'marginal_rate': round(float(engine.marginal_rate(income, year)) * 100, 2),
+    }), 200
+
+
+def score_batch(loaded, income, year, chunk_size=None):
+    """Score validated income/year arrays chunk by chunk with NumPy.
+
+    The whole batch uses one model snapshot, even if a reload lands mid-way.
+    """
+    chunk_size = chunk_size or config.BATCH_CHUNK_SIZE
+    out = np.empty(len(income), dtype=np.float64)
+    for start in range(0, len(income), chunk_size):
+        stop = start + chunk_size
+        np.round(predict_tax(loaded, income[start:stop], year[start:stop]), 2, out=out[start:stop])
+    return out
+
+# ✅ Batch prediction route
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    start = perf_counter()
+    try:
+        frame = parse_batch_payload(request.get_data(), request.content_type)
+    except PayloadError as exc:
+        return jsonify({'error': str(exc)}), 400
 
+    if len(frame) > config.MAX_BATCH_ROWS:
+        return jsonify({'error': f'Batch too large: {len(frame)} rows (max {config.MAX_BATCH_ROWS})'}), 413
+
+    income, year, errors = validate_rows(frame)
+    loaded = registry.get()
+    scores = score_batch(loaded, income, year)
+    predicted = scores.astype(object)
+
+    valid = errors == None  # noqa: E711 — elementwise comparison
+    failed = np.flatnonzero(~valid)
+    predicted[failed] = None
+
+    response = jsonify({
+        'predicted_tax': predicted.tolist(),
+        'errors': [{'row': int(i), 'error': errors[i]} for i in failed],
+        'count': len(frame),
+        'failed': len(failed),
+        'model_version': model_version(loaded),
+    })
+    if audit is not None:
+        audit.record_many('predict/batch', income[valid], year[valid], scores[valid], model_version(loaded),
+                          (perf_counter() - start) * 1e3)
+    return response, 200
+
+def sweep_grid(loaded, income, years):
+    """Predicted tax for every (year, income) of the grid in one vectorized call.
+
+    Returns an array of shape (len(years), len(income)).
+    """
+    flat_income = np.tile(income, len(years))
+    flat_year = np.repeat(np.asarray(years, dtype=np.int64), len(income))
+    return predict_tax(loaded, flat_income, flat_year).reshape(len(years), len(income))
+
+# ✅ Income sweep ("what-if" curve) route
+@app.route('/predict/sweep', methods=['POST'])
+def predict_sweep():
     try:
-        income = float(income)
-        year = int(year)
-    except ValueError:
-        return jsonify({'error': 'Invalid input type — income must be numeric, year must be integer'}), 400
+        income_min, income_max, step, years, mode = parse_sweep(request.get_json(force=True, silent=True))
+    except PayloadError as exc:
+        return jsonify({'error': str(exc)}), 400
 
-    # Simple prediction logic (replace with your ML model if needed)
-    predicted_tax = round(income * 0.2, 2)
+    # As a float: a tiny step over a huge range must be a 413, not an int overflow
+    points = grid_points(income_min, income_max, step) * len(years)
+    if not points <= config.MAX_SWEEP_POINTS:
+        return jsonify({'error': f'Sweep too large: {points:.0f} points (max {config.MAX_SWEEP_POINTS})'}), 413
+
+    income = income_grid(income_min, income_max, step)
+    body = {'income': income.tolist(), 'years': years, 'mode': mode}
+    if mode in ('model', 'both'):
+        loaded = registry.get()
+        body['predicted_tax'] = np.round(sweep_grid(loaded, income, years), 2).tolist()
+        body['model_version'] = model_version(loaded)
+    if mode in ('engine', 'both'):
+        body['computed_tax'] = np.round(engine.sweep(income, years), 2).tolist()
+    return jsonify(body), 200
+
+# ✅ Monte Carlo bracket scenarios ("what-if" revenue) route
+@app.route('/simulate', methods=['POST'])
+def simulate():
+    try:
+        year, scenarios, distribution, filers, seed, population = parse_simulation(
+            request.get_json(force=True, silent=True))
+    except PayloadError as exc:
+        return jsonify({'error': str(exc)}), 400
+
+    if filers > config.MAX_SIMULATION_FILERS or len(scenarios) > config.MAX_SIMULATION_SCENARIOS:
+        return jsonify({'error': f'Simulation too large: {filers} filers x {len(scenarios)} scenarios '
+                                 f'(max {config.MAX_SIMULATION_FILERS} x {config.MAX_SIMULATION_SCENARIOS})'}), 413
+
+    try:
+        results = simulation.simulate(engine, year, scenarios, distribution, filers=filers, seed=seed,
+                                      jobs=config.SIMULATION_JOBS, population=population)
+    except (TypeError, ValueError) as exc:
+        return jsonify({'error': str(exc)}), 400
+    # NaN/inf (e.g. the effective rate of all-zero incomes) is not valid JSON: send null
+    results = results.replace([np.inf, -np.inf], np.nan)
+    results = results.astype(object).where(results.notna(), None)
 
-    return jsonify({'predicted_tax': predicted_tax}), 200
+    return jsonify({
+        'year': year,
+        'filers': filers,
+        'seed': seed,
+        'population': population,
+        'baseline': simulation.baseline(engine, year),
+        'results': results.to_dict(orient='records'),
+    }), 200
 
 # ✅ Run Flask
 if __name__ == "__main__":
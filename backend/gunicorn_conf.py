@@ -0,0 +1,49 @@
+"""Production serving config for the Flask API.
+
+    gunicorn -c backend/gunicorn_conf.py backend.flask_api:app
+
+Every setting can be overridden with an environment variable (or a gunicorn
+command-line flag, which wins over this file).
+
+- ``preload_app``: backend.flask_api is imported once in the master, which
+  loads the model (memory-mapped) and builds the tax tables before forking,
+  so workers share those pages copy-on-write instead of each loading its own.
+  ``gc.freeze()`` before each fork keeps the collector from writing to (and
+  so un-sharing) the preloaded objects.
+- ``gthread`` workers: ``WEB_CONCURRENCY`` processes x ``GUNICORN_THREADS``
+  threads. Scoring is NumPy (releases the GIL for large arrays) and the
+  result cache makes repeat requests cheap, so a few threads per core help;
+  benchmarks/load_test.py compares settings.
+- Keep-alive so clients (the Streamlit prediction client's pooled session)
+  reuse connections.
+- Graceful reload: ``kill -HUP <master pid>`` starts fresh workers and lets the
+  old ones finish their in-flight requests (``graceful_timeout``). New model
+  files don't need a reload; the model registry picks them up by itself.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+preload_app = True
+
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+
+# Recycle workers now and then so slow leaks can't build up; jitter avoids all restarting at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG')  # e.g. '-' for stdout; off by default
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+
+
+def pre_fork(server, worker):
+    # Everything allocated so far (model, tax tables) is moved out of the GC's reach
+    gc.freeze()
@@ -0,0 +1,181 @@
+"""Precomputed per-year aggregates for the dashboard charts.
+
+The Home, Data Exploration and Tax Trends views all need the same handful of
+summaries: per-year means and counts, year-over-year change, the correlation
+matrix and ``describe()`` tables. ``build_aggregates`` computes them in one
+grouped pass and stores mergeable partials (count, sum, min/max and the
+per-year cross-product matrix) so a later call only has to recompute the
+years whose rows changed. The store is pickled next to the processed data.
+
+Only the overall ``describe()`` is not mergeable (its quantiles need every
+row), so it is recomputed from the full frame whenever anything changed.
+Correlations are built from the cross-product sums over complete rows.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from backend.shared.schema import YEAR
+
+# Bump when the stored layout changes so old files are rebuilt instead of misread
+STORE_VERSION = 1
+
+
+def numeric_columns(df):
+    """Same selection the pages used for the correlation heatmap."""
+    return df.select_dtypes(include=['float64', 'int64']).columns.tolist()
+
+
+def year_fingerprints(df):
+    """One uint64 per year that changes when any row of that year changes."""
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return hashes.groupby(df[YEAR].to_numpy()).sum()
+
+
+def _partials(df, columns):
+    """Mergeable per-year partial sums for the given rows."""
+    values = df[columns]
+    key = df[YEAR].rename('_year')
+    grouped = values.groupby(key)
+
+    complete = values.dropna()
+    xtx = {}
+    for year, rows in complete.groupby(key.loc[complete.index]):
+        x = rows.to_numpy(dtype=np.float64)
+        xtx[year] = (len(x), x.sum(axis=0), x.T @ x)
+
+    return {
+        'rows': key.value_counts().sort_index(),
+        'count': grouped.count(),
+        'sum': grouped.sum(),
+        'min': grouped.min(),
+        'max': grouped.max(),
+        'xtx': xtx,
+        'describe': grouped.describe(),
+    }
+
+
+def _merge(old, new, keep_years):
+    """Rows of `old` for keep_years plus everything in `new`, sorted by year."""
+    if isinstance(new, dict):
+        merged = {year: value for year, value in old.items() if year in keep_years}
+        merged.update(new)
+        return dict(sorted(merged.items()))
+    return pd.concat([old.loc[old.index.isin(keep_years)], new]).sort_index()
+
+
+class AggregateStore:
+    def __init__(self, columns, fingerprints, partials, overall_describe):
+        self.version = STORE_VERSION
+        self.columns = columns
+        self.fingerprints = fingerprints
+        self.partials = partials
+        self.overall_describe = overall_describe
+
+    @property
+    def years(self):
+        return self.partials['rows'].index.tolist()
+
+    def year_counts(self):
+        """DataFrame with Year and Count columns (rows per year)."""
+        counts = self.partials['rows']
+        return pd.DataFrame({YEAR: counts.index, 'Count': counts.to_numpy()})
+
+    def year_means(self, column):
+        """DataFrame with Year and the per-year mean of `column`, ready for px.line."""
+        means = self.partials['sum'][column] / self.partials['count'][column]
+        return pd.DataFrame({YEAR: means.index, column: means.to_numpy()})
+
+    def yoy(self, column):
+        """Year-over-year % change of the per-year mean, as Year / YoY Change."""
+        means = self.year_means(column)
+        return pd.DataFrame({YEAR: means[YEAR], 'YoY Change': means[column].pct_change()})
+
+    def mean(self, column):
+        return self.partials['sum'][column].sum() / self.partials['count'][column].sum()
+
+    def max(self, column):
+        return self.partials['max'][column].max()
+
+    def corr(self):
+        """Pearson correlation matrix from the stored cross-product sums."""
+        k = len(self.columns)
+        n, total, xtx = 0, np.zeros(k), np.zeros((k, k))
+        for rows, sums, cross in self.partials['xtx'].values():
+            n += rows
+            total += sums
+            xtx += cross
+        if n < 2:
+            return pd.DataFrame(np.nan, index=self.columns, columns=self.columns)
+        mean = total / n
+        cov = xtx / n - np.outer(mean, mean)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.outer(std, std)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+    def year_quartiles(self, column):
+        """Per-year count, min, quartiles and max of `column` (for box plots without the rows)."""
+        stats = self.partials['describe'][column][['count', 'min', '25%', '50%', '75%', 'max']]
+        return stats.rename_axis(YEAR).reset_index()
+
+    def describe(self, year=None):
+        """describe() of the whole dataset, or of one year's rows."""
+        if year is None:
+            return self.overall_describe
+        return self.partials['describe'].loc[year].unstack(0)[self.columns]
+
+
+def build_aggregates(df, previous=None):
+    """Build the store for `df`, reusing `previous` for years whose rows are unchanged.
+
+    Returns (store, changed_years). changed_years is empty when nothing needed
+    recomputing, in which case `previous` itself is returned.
+    """
+    columns = numeric_columns(df)
+    fingerprints = year_fingerprints(df)
+
+    usable = previous is not None and previous.version == STORE_VERSION and previous.columns == columns
+    if usable:
+        old = previous.fingerprints
+        same = fingerprints.index.isin(old.index)
+        same[same] = fingerprints[same].to_numpy() == old.reindex(fingerprints.index[same]).to_numpy()
+        changed = fingerprints.index[~same].tolist()
+        removed = old.index.difference(fingerprints.index).tolist()
+        if not changed and not removed:
+            return previous, []
+        keep = set(fingerprints.index[same])
+        new = _partials(df[df[YEAR].isin(changed)], columns)
+        partials = {name: _merge(previous.partials[name], new[name], keep) for name in new}
+    else:
+        changed = fingerprints.index.tolist()
+        partials = _partials(df, columns)
+
+    store = AggregateStore(columns, fingerprints, partials, df[columns].describe())
+    return store, changed
+
+
+def aggregates_path(data_path, processed_dir):
+    """Where the store for `data_path` is persisted: <processed_dir>/<stem>_aggregates.pkl"""
+    stem = os.path.splitext(os.path.basename(data_path))[0]
+    return os.path.join(processed_dir, f'{stem}_aggregates.pkl')
+
+
+def load_or_build(df, path):
+    """Load the store at `path`, bring it up to date with `df` and save it if anything changed."""
+    previous = None
+    if os.path.exists(path):
+        try:
+            previous = pd.read_pickle(path)
+        except Exception:
+            previous = None
+
+    store, _ = build_aggregates(df, previous)
+    if store is not previous:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        pd.to_pickle(store, tmp_path)
+        os.replace(tmp_path, path)
+    return store
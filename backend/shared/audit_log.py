@@ -0,0 +1,222 @@
+"""Audit trail of served predictions, written off the request path.
+
+Each prediction (endpoint, income, year, predicted tax, model version,
+request latency, whether it came from the result cache) is appended to an
+in-memory buffer; a background thread per process drains it into the
+``prediction_log`` table of the SQLite database at ``DATABASE_URL``. A
+request only pays for building a tuple and a ``deque.append``.
+
+The writer commits up to ``batch_size`` rows per transaction with one
+prepared ``executemany`` (WAL mode, ``synchronous=NORMAL``), either every
+``flush_interval`` seconds or as soon as a full batch is waiting.
+
+The buffer is bounded (``maxsize``). When it is full the ``full_policy``
+decides: ``drop`` discards the record and counts it; ``block`` makes the
+request wait up to ``block_timeout`` seconds for the writer to make room
+(counted as ``blocked``) before dropping. Rows that can't be written (the
+database rejects them, the file can't be created or opened) are counted as
+``failed`` and the writer keeps going; after a failure it discards what
+arrives for ``flush_interval`` seconds, also as ``failed``, before trying
+the database again, so a broken database never fills the buffer.
+
+The thread is started on first use in each process, so it also works after
+gunicorn forks preloaded workers. Configured by ``AUDIT_LOG*`` in config.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from itertools import repeat
+
+from backend.shared import config
+from backend.shared.result_cache import sqlite_path
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('ts', 'endpoint', 'income', 'year', 'predicted_tax', 'model_version', 'latency_ms', 'cached')
+FULL_POLICIES = ('drop', 'block')
+
+
+def _values(array):
+    # Plain Python numbers: sqlite3 can't bind NumPy integers
+    return array.tolist() if hasattr(array, 'tolist') else array
+
+
+class AuditLog:
+    def __init__(self, path, maxsize=100_000, batch_size=1000, flush_interval=1.0, full_policy='drop',
+                 block_timeout=0.05):
+        if full_policy not in FULL_POLICIES:
+            raise ValueError(f"full_policy must be one of: {', '.join(FULL_POLICIES)}")
+        self.path = path
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.full_policy = full_policy
+        self.block_timeout = block_timeout
+        self._buffer = deque()
+        self._wake = threading.Event()
+        self._room = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._busy = False
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.failed = 0
+        self.batches = 0
+
+    def record(self, endpoint, income, year, predicted_tax, model_version, latency_ms, cached=False):
+        """Queue one prediction; never waits on the database."""
+        if self._pid != os.getpid():
+            self._start()
+        row = (time.time(), endpoint, income, year, predicted_tax, model_version, latency_ms, int(cached))
+        if len(self._buffer) >= self.maxsize and not self._make_room(1):
+            return False
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def record_many(self, endpoint, income, year, predicted_tax, model_version, latency_ms, cached=False):
+        """Queue one row per element of the income/year/predicted_tax arrays. Returns rows queued.
+
+        Rows are built in C (zip/repeat) only for as many as fit, so a huge
+        batch against a full buffer costs little more than the drop count.
+        """
+        if self._pid != os.getpid():
+            self._start()
+        now, cached, total, queued = time.time(), int(cached), len(income), 0
+        while queued < total:
+            room = self.maxsize - len(self._buffer)
+            if room <= 0:
+                if not self._make_room(total - queued):
+                    break
+                continue
+            stop = min(total, queued + room)
+            self._buffer.extend(zip(repeat(now), repeat(endpoint), _values(income[queued:stop]),
+                                    _values(year[queued:stop]), _values(predicted_tax[queued:stop]),
+                                    repeat(model_version), repeat(latency_ms), repeat(cached)))
+            queued = stop
+            self._wake.set()
+        return queued
+
+    def _make_room(self, count):
+        # Slow path, buffer full: wait for the writer (block policy) or drop `count` rows
+        if self.full_policy == 'block':
+            self._wake.set()
+            with self._room:
+                self.blocked += 1
+                if self._room.wait_for(lambda: len(self._buffer) < self.maxsize, self.block_timeout):
+                    return True
+        with self._room:
+            self.dropped += count
+        return False
+
+    def _start(self):
+        with self._room:
+            if self._pid == os.getpid():
+                return
+            # After a fork the parent's writer thread doesn't exist here; its unwritten rows stay with it
+            self._buffer.clear()
+            self._pid = os.getpid()
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self._thread.start()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS prediction_log ('
+                     'id INTEGER PRIMARY KEY, ts REAL, endpoint TEXT, income REAL, year INTEGER, '
+                     'predicted_tax REAL, model_version TEXT, latency_ms REAL, cached INTEGER)')
+        return conn
+
+    def _run(self):
+        conn = None
+        retry_at = 0.0
+        insert = f"INSERT INTO prediction_log ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            while self._buffer:
+                with self._room:
+                    self._busy = True
+                # The only consumer, so the buffer can't empty under us
+                batch = [self._buffer.popleft() for _ in range(min(len(self._buffer), self.batch_size))]
+                with self._room:
+                    self._room.notify_all()
+                try:
+                    if time.monotonic() < retry_at:
+                        # Backing off after a failure: discard rather than let the buffer fill up
+                        self.failed += len(batch)
+                        continue
+                    conn = conn or self._connect()
+                    conn.execute('BEGIN')
+                    conn.executemany(insert, batch)
+                    conn.execute('COMMIT')
+                    self.written += len(batch)
+                    self.batches += 1
+                except Exception:
+                    # Anything (OSError from makedirs, OverflowError binding a huge int, ...) must
+                    # not kill the thread: nothing would restart it in this process
+                    self.failed += len(batch)
+                    logger.exception('Could not write %d audit rows to %s', len(batch), self.path)
+                    if conn is not None:
+                        conn.close()
+                    conn = None
+                    retry_at = time.monotonic() + self.flush_interval
+                finally:
+                    with self._room:
+                        self._busy = False
+                        self._room.notify_all()
+            if self._closed:
+                if conn is not None:
+                    conn.close()
+                return
+
+    def flush(self, timeout=10.0):
+        """Wait until everything recorded so far is written (or failed). Returns False on timeout."""
+        if self._thread is None or self._pid != os.getpid():
+            return not self._buffer
+        deadline = time.monotonic() + timeout
+        with self._room:
+            while self._buffer or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._wake.set()
+                self._room.wait(min(remaining, 0.05))
+        return True
+
+    def close(self, timeout=10.0):
+        """Write what is buffered and stop the writer thread."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self._pid = None
+
+    def stats(self):
+        return {'queued': len(self._buffer), 'written': self.written, 'dropped': self.dropped,
+                'blocked': self.blocked, 'failed': self.failed, 'batches': self.batches,
+                'capacity': self.maxsize, 'full_policy': self.full_policy}
+
+
+_audit_log = None
+
+
+def get_audit_log():
+    """The audit log for DATABASE_URL in this process, or None if AUDIT_LOG is off."""
+    global _audit_log
+    if _audit_log is None and config.AUDIT_LOG:
+        _audit_log = AuditLog(sqlite_path(config.DATABASE_URL), config.AUDIT_LOG_QUEUE_SIZE,
+                              config.AUDIT_LOG_BATCH_SIZE, config.AUDIT_LOG_FLUSH_INTERVAL,
+                              config.AUDIT_LOG_FULL_POLICY, config.AUDIT_LOG_BLOCK_TIMEOUT)
+    return _audit_log
@@ -0,0 +1,258 @@
+"""Compact NumPy export of trained models for the prediction path.
+
+Unpickling a 100-tree RandomForest is slow, and a single-row ``predict`` spends
+most of its time in sklearn's input validation and per-tree dispatch. The
+training scripts therefore also export the fitted model next to the pickle
+(``models/model.pkl`` -> ``models/model_compact/``):
+
+- linear models (anything with ``coef_``/``intercept_``): a coefficient vector;
+- tree ensembles (RandomForest/ExtraTrees, a single DecisionTree,
+  GradientBoosting with its default initial estimator): every tree's nodes
+  flattened into one set of ``.npy`` arrays (feature, threshold, left, right,
+  value) plus each tree's root offset.
+
+``CompactModel.predict`` scores with plain NumPy: linear is one matmul; trees
+walk all rows x all trees at once, one level per step. Leaves point at
+themselves with an infinite threshold, so the walk is a fixed number of
+gathers with no branching. Features are compared as float32, like sklearn.
+
+A tree's output only depends on which interval between its thresholds each
+feature falls in, so with few features (the served model has two) the whole
+ensemble collapses into a lookup table over the union of all thresholds.
+When that grid is small enough (``MAX_GRID_CELLS``) it is exported too and
+prediction becomes one ``searchsorted`` per feature plus one gather, which is
+faster than sklearn for batches as well as for single rows. The grid gives
+exactly the node walk's results; it is only a precomputed form of it.
+
+``meta.json`` names the array files and the SHA-256 of the pickle they came
+from, plus the model's ``feature_importances_`` when it has them, so the
+Model Evaluation page can chart them without unpickling it (``read_meta``).
+``save_model`` writes the arrays first and renames ``meta.json`` and then the
+pickle into place, so the registry only uses an export that matches
+the model file it is serving. ``benchmarks/bench_inference.py`` compares
+load and predict times against the sklearn estimator.
+"""
+import json
+import os
+import uuid
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# Rows x trees scored per step when walking forests; bounds temporary memory
+MAX_CELLS = 1 << 20
+
+# Largest threshold grid (cells, float64 each) exported as a lookup table
+MAX_GRID_CELLS = 1 << 22
+
+
+def compact_path(model_path):
+    return os.path.splitext(model_path)[0] + '_compact'
+
+
+def _trees(model):
+    """(list of sklearn Tree objects, base, scale) or None if the model isn't a supported tree ensemble."""
+    name = type(model).__name__
+    if hasattr(model, 'tree_'):
+        return [model.tree_], 0.0, 1.0
+    if name in ('RandomForestRegressor', 'ExtraTreesRegressor'):
+        return [est.tree_ for est in model.estimators_], 0.0, 1.0 / len(model.estimators_)
+    if name == 'GradientBoostingRegressor' and type(model.init_).__name__ == 'DummyRegressor':
+        base = float(np.ravel(model.init_.constant_)[0])
+        return [est.tree_ for est in model.estimators_[:, 0]], base, float(model.learning_rate)
+    return None
+
+
+def to_arrays(model):
+    """(meta dict, {name: array}) for a fitted model; raises ValueError if it can't be exported."""
+    n_features = int(getattr(model, 'n_features_in_', 0))
+    meta = {'format_version': FORMAT_VERSION, 'source': type(model).__name__, 'n_features_in': n_features}
+
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_') and np.ndim(model.coef_) == 1:
+        meta.update(kind='linear', intercept=float(model.intercept_))
+        return meta, {'coef': np.asarray(model.coef_, dtype=np.float64)}
+
+    trees = _trees(model)
+    if trees is None:
+        raise ValueError(f'Cannot export {type(model).__name__} to the compact format')
+    trees, base, scale = trees
+
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+    feature, threshold, left, right, value = [], [], [], [], []
+    for offset, tree in zip(offsets, trees):
+        nodes = np.arange(tree.node_count)
+        leaf = tree.children_left < 0
+        feature.append(np.where(leaf, 0, tree.feature))
+        threshold.append(np.where(leaf, np.inf, tree.threshold))
+        left.append(np.where(leaf, nodes, tree.children_left) + offset)
+        right.append(np.where(leaf, nodes, tree.children_right) + offset)
+        value.append(tree.value[:, 0, 0])
+
+    meta.update(kind='trees', base=base, scale=scale, depth=max(int(tree.max_depth) for tree in trees),
+                feature_importances=[float(importance) for importance in model.feature_importances_])
+    arrays = {
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'value': np.concatenate(value).astype(np.float64),
+        'roots': offsets[:-1].astype(np.int32),
+    }
+    arrays.update(_grid(CompactModel(meta, arrays), trees))
+    return meta, arrays
+
+
+def _grid(model, trees):
+    """Lookup-table arrays for a tree ensemble, or {} if the grid would be too big.
+
+    Per feature, the sorted union of every split threshold; cell k of a feature
+    holds values with exactly k thresholds below them. Each cell is scored once
+    by walking the trees with a point inside it (the cell's upper threshold,
+    which goes left at that split; +inf for the last cell).
+    """
+    edges = []
+    for i in range(model.n_features_in_):
+        splits = [tree.threshold[(tree.children_left >= 0) & (tree.feature == i)] for tree in trees]
+        edges.append(np.unique(np.concatenate(splits)).astype(np.float64))
+    shape = tuple(len(e) + 1 for e in edges)
+    if np.prod(shape, dtype=np.float64) > MAX_GRID_CELLS:
+        return {}
+
+    points = np.meshgrid(*[np.append(e, np.inf) for e in edges], indexing='ij')
+    X = np.column_stack([p.ravel() for p in points])
+    values = np.concatenate([model._walk(X[start:start + 65536]) for start in range(0, len(X), 65536)])
+    return {
+        'grid': model.meta['base'] + model.meta['scale'] * values,
+        'grid_edges': np.concatenate(edges),
+        'grid_shape': np.array(shape, dtype=np.int64),
+    }
+
+
+def export(model, directory, source_digest=None):
+    """Write `model` to `directory` in the compact format. Returns the meta dict.
+
+    Arrays get fresh file names and meta.json is replaced last, so a reader
+    always sees a complete export; files from older exports are removed.
+    """
+    meta, arrays = to_arrays(model)
+    os.makedirs(directory, exist_ok=True)
+    prefix = uuid.uuid4().hex[:12]
+    meta['files'] = {}
+    for name, array in arrays.items():
+        filename = f'{prefix}_{name}.npy'
+        np.save(os.path.join(directory, filename), np.ascontiguousarray(array))
+        meta['files'][name] = filename
+    meta['source_sha256'] = source_digest
+
+    meta_path = os.path.join(directory, 'meta.json')
+    with open(f'{meta_path}.tmp', 'w') as fh:
+        json.dump(meta, fh, indent=2)
+    os.replace(f'{meta_path}.tmp', meta_path)
+
+    # Readers that still map the old arrays keep them alive until they let go (POSIX)
+    for filename in os.listdir(directory):
+        if filename.endswith('.npy') and filename not in meta['files'].values():
+            try:
+                os.remove(os.path.join(directory, filename))
+            except OSError:
+                pass
+    return meta
+
+
+class CompactModel:
+    """NumPy-only predictor with the part of the sklearn API the backend uses."""
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.kind = meta['kind']
+        self.n_features_in_ = meta['n_features_in']
+        for name, array in arrays.items():
+            setattr(self, name, array)
+
+    def __repr__(self):
+        return f"CompactModel({self.meta['source']}, kind={self.kind!r})"
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f'X has {X.shape[1]} features, but the model expects {self.n_features_in_}')
+        if self.kind == 'linear':
+            return X @ self.coef + self.meta['intercept']
+
+        # sklearn compares float32 features against float64 thresholds
+        X = X.astype(np.float32)
+        if hasattr(self, 'grid'):
+            return self._lookup(X)
+        out = np.empty(len(X), dtype=np.float64)
+        step = max(MAX_CELLS // len(self.roots), 1)
+        for start in range(0, len(X), step):
+            out[start:start + step] = self._walk(X[start:start + step])
+        return self.meta['base'] + self.meta['scale'] * out
+
+    def _lookup(self, X):
+        cell = np.zeros(len(X), dtype=np.int64)
+        start = 0
+        for i, size in enumerate(self.grid_shape):
+            edges = self.grid_edges[start:start + size - 1]
+            cell = cell * size + np.searchsorted(edges, X[:, i].astype(np.float64), side='left')
+            start += size - 1
+        return self.grid[cell]
+
+    def _walk(self, X):
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.meta['depth']):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node].sum(axis=1)
+
+
+def read_meta(directory, source_digest=None):
+    """The meta dict of the export in `directory`, or None if there is none (or it
+    was exported from a different pickle than `source_digest`). Reads no arrays."""
+    try:
+        with open(os.path.join(directory, 'meta.json')) as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format_version') != FORMAT_VERSION:
+        return None
+    if source_digest is not None and meta.get('source_sha256') != source_digest:
+        return None
+    return meta
+
+
+def load(directory, source_digest=None, mmap_mode='r'):
+    """The CompactModel in `directory`, or None if there is none (or it was
+    exported from a different pickle than `source_digest`)."""
+    meta = read_meta(directory, source_digest)
+    if meta is None:
+        return None
+    arrays = {name: np.load(os.path.join(directory, filename), mmap_mode=mmap_mode)
+              for name, filename in meta['files'].items()}
+    return CompactModel(meta, arrays)
+
+
+def save_model(model, model_path):
+    """Pickle `model` to model_path and export its compact form next to it.
+
+    The pickle goes to a temp file first so its hash can be recorded in the
+    export, then is renamed into place (what the model registry expects).
+    Returns the compact meta dict, or None if the model type isn't supported.
+    """
+    # Local imports: model_registry imports this module, and serving never needs joblib
+    import joblib
+    from backend.shared.model_registry import file_digest
+
+    os.makedirs(os.path.dirname(os.path.abspath(model_path)), exist_ok=True)
+    tmp_path = f'{model_path}.tmp'
+    joblib.dump(model, tmp_path)
+    try:
+        meta = export(model, compact_path(model_path), source_digest=file_digest(tmp_path))
+    except ValueError:
+        meta = None
+    os.replace(tmp_path, model_path)
+    return meta
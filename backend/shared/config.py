@@ -1,4 +1,69 @@
 import os
+
+# Repository root, so defaults work no matter which directory a script is started from
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///tax.db')
-MODEL_PATH = os.getenv('MODEL_PATH', '../../models/model.pkl')
-DATA_PATH = os.getenv('DATA_PATH', '../../data/processed/cleaned_tax_data.pkl')
\ No newline at end of file
+MODEL_PATH = os.getenv('MODEL_PATH', os.path.join(BASE_DIR, 'models', 'model.pkl'))
+# Processed dataset; the extension picks the format (.parquet, .feather or .pkl), see shared/storage.py
+DATA_PATH = os.getenv('DATA_PATH', os.path.join(BASE_DIR, 'data', 'processed', 'cleaned_tax_data.parquet'))
+
+# Processed dataset + bracket tables published for zero-copy sharing between processes
+# (shared/shared_data.py; e.g. /dev/shm/tax_shared.bin), and seconds between checks for a new version
+SHARED_DATA_PATH = os.getenv('SHARED_DATA_PATH', os.path.join(os.path.dirname(DATA_PATH), 'shared_data.bin'))
+SHARED_DATA_CHECK_INTERVAL = float(os.getenv('SHARED_DATA_CHECK_INTERVAL', '5'))
+
+# Seconds between checks of MODEL_PATH for a new model
+MODEL_RELOAD_INTERVAL = float(os.getenv('MODEL_RELOAD_INTERVAL', '5'))
+# Serve the NumPy export in <model>_compact/ when it matches MODEL_PATH (see shared/compact_model.py)
+USE_COMPACT_MODEL = os.getenv('USE_COMPACT_MODEL', '1') != '0'
+
+# /predict result cache: entries per worker (0 disables), seconds to keep them,
+# and where workers share them: memory (not shared), sqlite (DATABASE_URL) or module:factory
+RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', '10000'))
+RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', '300'))
+RESULT_CACHE_BACKEND = os.getenv('RESULT_CACHE_BACKEND', 'memory')
+
+# Audit log of every /predict and /predict/batch result in DATABASE_URL (shared/audit_log.py):
+# on/off, rows buffered in memory, rows per transaction, seconds between writes, and what a
+# request does when the buffer is full: drop the row, or block up to AUDIT_LOG_BLOCK_TIMEOUT seconds first
+AUDIT_LOG = os.getenv('AUDIT_LOG', '1') != '0'
+AUDIT_LOG_QUEUE_SIZE = int(os.getenv('AUDIT_LOG_QUEUE_SIZE', '100000'))
+AUDIT_LOG_BATCH_SIZE = int(os.getenv('AUDIT_LOG_BATCH_SIZE', '1000'))
+AUDIT_LOG_FLUSH_INTERVAL = float(os.getenv('AUDIT_LOG_FLUSH_INTERVAL', '1'))
+AUDIT_LOG_FULL_POLICY = os.getenv('AUDIT_LOG_FULL_POLICY', 'drop')
+AUDIT_LOG_BLOCK_TIMEOUT = float(os.getenv('AUDIT_LOG_BLOCK_TIMEOUT', '0.05'))
+
+# Batch prediction limits
+BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '65536'))
+MAX_BATCH_ROWS = int(os.getenv('MAX_BATCH_ROWS', '5000000'))
+# Largest income x year grid /predict/sweep will evaluate
+MAX_SWEEP_POINTS = int(os.getenv('MAX_SWEEP_POINTS', '1000000'))
+
+# Monte Carlo scenario simulator (shared/simulation.py): most simulated filers and scenarios
+# per /simulate request, and worker processes per run. The default 1 runs inline: requests are
+# already served by several (threaded) workers, so a pool per request would oversubscribe the CPUs.
+# Opt in with N > 1 (0 = all cores) on a machine with cores to spare, e.g. cpu_count // API workers.
+MAX_SIMULATION_FILERS = int(os.getenv('MAX_SIMULATION_FILERS', '10000000'))
+MAX_SIMULATION_SCENARIOS = int(os.getenv('MAX_SIMULATION_SCENARIOS', '20'))
+SIMULATION_JOBS = int(os.getenv('SIMULATION_JOBS', '1'))
+
+# Flask API as seen from the dashboard (frontend/streamlit_app/prediction_client.py):
+# seconds to connect / to wait for a response, and retries on connection errors and 502-504
+API_URL = os.getenv('API_URL', 'http://localhost:5000')
+API_CONNECT_TIMEOUT = float(os.getenv('API_CONNECT_TIMEOUT', '0.5'))
+API_READ_TIMEOUT = float(os.getenv('API_READ_TIMEOUT', '10'))
+API_RETRIES = int(os.getenv('API_RETRIES', '2'))
+
+# Dashboard charts (frontend/streamlit_app/plotting.py): most points a scatter sends to the
+# browser, and the point count above which it is drawn with WebGL
+PLOT_MAX_POINTS = int(os.getenv('PLOT_MAX_POINTS', '5000'))
+PLOT_WEBGL_THRESHOLD = int(os.getenv('PLOT_WEBGL_THRESHOLD', '1000'))
+
+# Dashboard profiling (frontend/streamlit_app/profiling.py): off, 1 (section timings),
+# cprofile or pyinstrument (also dump a profile of every rerun to PROFILE_DIR)
+PROFILE_DASHBOARD = os.getenv('PROFILE_DASHBOARD', 'off')
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+
+# Raw bracket data used by the tax engine
+RAW_DATA_PATH = os.getenv('RAW_DATA_PATH', os.path.join(BASE_DIR, 'data', 'raw', 'tax_data.csv'))
@@ -0,0 +1,239 @@
+"""Score a model on the processed dataset in bounded memory, across processes.
+
+``models/evaluate_model.py`` and the Model Evaluation page used to load every
+row, predict them all at once and keep the residuals around for the metrics
+and the histogram. Here the file is split into its parts (parquet row groups
+or Arrow record batches, see ``storage.count_parts``); each part is read and
+scored ``chunk_rows`` rows at a time and folded into an ``ErrorStats``:
+
+- sums of the error, squared error and absolute error (MSE, MAE, bias);
+- count/mean/M2 of the target (Chan et al.'s pairwise update), for R²;
+- a residual histogram on fixed edges (``RESIDUAL_EDGES``), plus
+  under/overflow counts and the min/max residual;
+- per-year count and error sums;
+- optionally a bounded random sample of (actual, predicted) pairs for the
+  scatter: every row gets a random key and the ``sample_size`` largest keys
+  are kept, so samples from different chunks merge exactly.
+
+Every field merges by addition (or by keeping the top keys), so parts can be
+scored in any order by any number of loky workers and combined afterwards;
+results don't depend on ``jobs``. Each worker loads the model once
+(``_model``), and only the small ``ErrorStats`` objects travel back.
+
+Residuals are actual - predicted, in percentage points of the target rate.
+"""
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+from backend.shared import config, storage
+from backend.shared.schema import FEATURES, TARGET, YEAR
+
+DEFAULT_CHUNK_ROWS = 50_000
+# Half-point bins from -20 to +20 percentage points; rarer residuals land in the under/overflow counts
+RESIDUAL_EDGES = np.linspace(-20.0, 20.0, 81)
+
+
+class ErrorStats:
+    def __init__(self, edges=RESIDUAL_EDGES, sample_size=0):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.sample_size = sample_size
+        self.count = 0
+        self.skipped = 0
+        self.sum_error = 0.0
+        self.sum_squared = 0.0
+        self.sum_absolute = 0.0
+        self.mean_actual = 0.0
+        self.m2_actual = 0.0
+        self.min_error = np.inf
+        self.max_error = -np.inf
+        # [underflow, one count per bin..., overflow]
+        self.hist = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        # year -> [count, sum error, sum squared, sum absolute]
+        self.years = {}
+        self._keys = np.empty(0)
+        self._actual = np.empty(0)
+        self._predicted = np.empty(0)
+
+    def update(self, year, actual, predicted, rng=None):
+        """Fold one chunk of rows in (all arrays the same length, NaN-free)."""
+        year = np.asarray(year)
+        actual = np.asarray(actual, dtype=np.float64)
+        predicted = np.asarray(predicted, dtype=np.float64)
+        n = len(actual)
+        if not n:
+            return self
+        error = actual - predicted
+        chunk = ErrorStats(self.edges)
+        chunk.count = n
+        chunk.sum_error = float(error.sum())
+        chunk.sum_squared = float(error @ error)
+        chunk.sum_absolute = float(np.abs(error).sum())
+        chunk.mean_actual = float(actual.mean())
+        chunk.m2_actual = float(((actual - chunk.mean_actual) ** 2).sum())
+        chunk.min_error = float(error.min())
+        chunk.max_error = float(error.max())
+        chunk.hist = np.bincount(np.searchsorted(self.edges, error, side='right'), minlength=len(self.edges) + 1)
+
+        values, inverse = np.unique(year, return_inverse=True)
+        sums = np.stack([np.bincount(inverse, minlength=len(values)).astype(np.float64),
+                         np.bincount(inverse, error, len(values)),
+                         np.bincount(inverse, error * error, len(values)),
+                         np.bincount(inverse, np.abs(error), len(values))], axis=1)
+        chunk.years = dict(zip((int(value) for value in values), sums))
+
+        if self.sample_size:
+            rng = rng if rng is not None else np.random.default_rng()
+            chunk.sample_size = self.sample_size
+            chunk._keys, chunk._actual, chunk._predicted = rng.random(n), actual, predicted
+            chunk._trim()
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """Add another ErrorStats (same edges) into this one; returns self."""
+        if not other.count:
+            self.skipped += other.skipped
+            return self
+        total = self.count + other.count
+        delta = other.mean_actual - self.mean_actual
+        self.m2_actual += other.m2_actual + delta * delta * self.count * other.count / total
+        self.mean_actual += delta * other.count / total
+        self.count = total
+        self.skipped += other.skipped
+        self.sum_error += other.sum_error
+        self.sum_squared += other.sum_squared
+        self.sum_absolute += other.sum_absolute
+        self.min_error = min(self.min_error, other.min_error)
+        self.max_error = max(self.max_error, other.max_error)
+        self.hist = self.hist + other.hist
+        for year, sums in other.years.items():
+            self.years[year] = self.years[year] + sums if year in self.years else sums
+        if self.sample_size:
+            self._keys = np.concatenate([self._keys, other._keys])
+            self._actual = np.concatenate([self._actual, other._actual])
+            self._predicted = np.concatenate([self._predicted, other._predicted])
+            self._trim()
+        return self
+
+    def _trim(self):
+        if len(self._keys) <= self.sample_size:
+            return
+        keep = np.argpartition(self._keys, -self.sample_size)[-self.sample_size:]
+        self._keys, self._actual, self._predicted = self._keys[keep], self._actual[keep], self._predicted[keep]
+
+    @property
+    def mse(self):
+        return self.sum_squared / self.count if self.count else float('nan')
+
+    @property
+    def rmse(self):
+        return float(np.sqrt(self.mse))
+
+    @property
+    def mae(self):
+        return self.sum_absolute / self.count if self.count else float('nan')
+
+    @property
+    def bias(self):
+        """Mean residual: positive when the model under-predicts."""
+        return self.sum_error / self.count if self.count else float('nan')
+
+    @property
+    def r2(self):
+        if not self.count or not self.m2_actual:
+            return float('nan')
+        return 1.0 - self.sum_squared / self.m2_actual
+
+    def histogram(self):
+        """Residual counts per bin (left, right, count); the first and last rows
+        are the under/overflow, bounded by the observed min/max residual."""
+        if self.count:
+            outer = (min(self.min_error, self.edges[0]), max(self.max_error, self.edges[-1]))
+        else:
+            outer = (self.edges[0], self.edges[-1])
+        edges = np.concatenate([[outer[0]], self.edges, [outer[1]]])
+        return pd.DataFrame({'left': edges[:-1], 'right': edges[1:], 'count': self.hist})
+
+    def by_year(self):
+        """Per-year rows, MSE, MAE and bias."""
+        years = sorted(self.years)
+        sums = np.array([self.years[year] for year in years]).reshape(-1, 4)
+        count = sums[:, 0]
+        return pd.DataFrame({YEAR: years, 'rows': count.astype(np.int64), 'mse': sums[:, 2] / count,
+                             'mae': sums[:, 3] / count, 'bias': sums[:, 1] / count})
+
+    def sample(self):
+        """(actual, predicted) arrays of the kept sample, in a fixed order."""
+        order = np.argsort(self._keys)
+        return self._actual[order], self._predicted[order]
+
+    def summary(self):
+        return {'rows': self.count, 'skipped': self.skipped, 'mse': self.mse, 'rmse': self.rmse,
+                'mae': self.mae, 'r2': self.r2, 'bias': self.bias}
+
+
+@functools.lru_cache(maxsize=2)
+def _model(path, mtime):
+    # Once per worker process; same loading rules as the API (compact export when it matches)
+    from backend.shared.model_registry import ModelRegistry
+    loaded = ModelRegistry(path, use_compact=config.USE_COMPACT_MODEL).load()
+    if loaded is None:
+        raise ValueError(f'Could not load a model from {path}')
+    return loaded.model
+
+
+def score_part(model_path, data_path, part, chunk_rows=DEFAULT_CHUNK_ROWS, edges=RESIDUAL_EDGES,
+               sample_size=0, seed=0, years=None):
+    """ErrorStats of one part of the processed file, read chunk_rows rows at a time."""
+    model = _model(model_path, os.stat(model_path).st_mtime_ns)
+    stats = ErrorStats(edges, sample_size)
+    # A seed per part keeps the sample independent of how parts are spread over workers
+    rng = np.random.default_rng([seed, part])
+    for df in storage.iter_part(data_path, part, columns=FEATURES + [TARGET], batch_size=chunk_rows):
+        missing = [col for col in FEATURES + [TARGET] if col not in df.columns]
+        if missing:
+            raise ValueError(f'{data_path} has no {", ".join(missing)} column(s)')
+        values = df.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.isfinite(values).all(axis=1)
+        if years is not None:
+            valid &= np.isin(values[:, 0], years)
+        stats.skipped += int(len(values) - valid.sum())
+        values = values[valid]
+        if len(values):
+            X = values[:, :len(FEATURES)]
+            stats.update(X[:, 0].astype(np.int64), values[:, -1], model.predict(X), rng)
+    return stats
+
+
+def evaluate(model_path=None, data_path=None, chunk_rows=DEFAULT_CHUNK_ROWS, jobs=None, edges=RESIDUAL_EDGES,
+             sample_size=0, seed=0, years=None):
+    """Score the model (config.MODEL_PATH) on the processed dataset (config.DATA_PATH).
+
+    jobs: worker processes (default: all cores, at most one per part); 1 runs inline.
+    years: only rows from these years (e.g. a holdout).
+    Returns the merged ErrorStats.
+    """
+    model_path = model_path or config.MODEL_PATH
+    data_path = data_path or config.DATA_PATH
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f'Model not found: {model_path}')
+    parts = storage.count_parts(data_path)
+    if not parts:
+        raise FileNotFoundError(f'Processed data not found: {data_path}')
+    years = None if years is None else np.asarray(sorted(years), dtype=np.float64)
+    args = (chunk_rows, edges, sample_size, seed, years)
+
+    jobs = min(jobs or os.cpu_count() or 1, parts)
+    if jobs == 1:
+        results = (score_part(model_path, data_path, part, *args) for part in range(parts))
+    else:
+        import joblib
+        results = joblib.Parallel(n_jobs=jobs, backend='loky', return_as='generator_unordered')(
+            joblib.delayed(score_part)(model_path, data_path, part, *args) for part in range(parts))
+
+    total = ErrorStats(edges, sample_size)
+    for stats in results:
+        total.merge(stats)
+    return total
@@ -0,0 +1,166 @@
+"""Incremental rebuild of the processed dataset.
+
+A JSON manifest next to the processed file (``<stem>_manifest.json``) records,
+for every raw input file, its size, mtime and SHA-256, plus a fingerprint per
+year of the cleaned rows it produced. ``update`` then:
+
+1. skips every input whose size and mtime are unchanged (no read at all) or
+   whose content hash is unchanged (touched but identical);
+2. cleans only the changed inputs, into a staging file, summing per-year
+   fingerprints as the chunks stream past;
+3. compares the combined per-year fingerprints with the manifest, so only
+   years whose rows actually differ are replaced, and an input that was
+   re-saved with the same rows does not trigger a rewrite;
+4. streams the old dataset minus those years, plus the new rows for them, into
+   a temp file that is renamed over the old one (``ProcessedWriter``), so
+   readers see either the old or the new dataset, never a mix.
+
+The manifest is written (atomically) after the data. It also records the
+processed file's own size and mtime: if the file was rebuilt by something
+else, or the manifest is missing, the next update is a full rebuild.
+"""
+import json
+import os
+from collections import namedtuple
+
+from backend.shared import config
+from backend.shared.aggregates import year_fingerprints
+from backend.shared.model_registry import file_digest
+from backend.shared.schema import DEFAULT_CHUNK_BYTES, YEAR, read_raw_chunks
+from backend.shared.storage import ProcessedWriter, iter_processed, resolve_path
+
+# Bump when the manifest layout changes so old manifests trigger a full rebuild
+MANIFEST_VERSION = 1
+
+_MASK = (1 << 64) - 1
+
+UpdateResult = namedtuple('UpdateResult', 'path rows reprocessed changed_years')
+
+
+def manifest_path(output_path):
+    return os.path.splitext(output_path)[0] + '_manifest.json'
+
+
+def load_manifest(path):
+    """The manifest at `path`, or an empty one if it is missing, unreadable or outdated."""
+    try:
+        with open(path) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get('version') == MANIFEST_VERSION else {}
+
+
+def save_manifest(manifest, path):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _stat(path):
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def file_state(path, previous=None):
+    """Size, mtime and SHA-256 of `path`; the hash is reused if size and mtime match `previous`."""
+    state = _stat(path)
+    if previous and all(previous.get(key) == state[key] for key in ('size', 'mtime_ns')):
+        state['sha256'] = previous['sha256']
+    else:
+        state['sha256'] = file_digest(path)
+    return state
+
+
+def _add_fingerprints(totals, df):
+    # Per-year sums of row hashes are additive, so chunks can be folded in one at a time
+    for year, value in year_fingerprints(df).items():
+        totals[int(year)] = (totals.get(int(year), 0) + int(value)) & _MASK
+
+
+def _combine(inputs):
+    """{year: fingerprint} over all inputs, from their manifest entries."""
+    totals = {}
+    for entry in inputs.values():
+        for year, value in entry['years'].items():
+            totals[int(year)] = (totals.get(int(year), 0) + int(value, 16)) & _MASK
+    return totals
+
+
+def _entry(state, fingerprints, rows):
+    return dict(state, rows=rows, years={str(year): f'{value:016x}' for year, value in fingerprints.items()})
+
+
+def update(inputs, output_path=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Bring the processed dataset up to date with the raw `inputs` (list of CSV paths).
+
+    Returns UpdateResult(path, rows, reprocessed input paths, sorted changed years).
+    """
+    output_path = output_path or config.DATA_PATH
+    inputs = [os.path.abspath(path) for path in inputs]
+    mpath = manifest_path(output_path)
+    manifest = load_manifest(mpath)
+
+    # The old dataset can only be reused if it is exactly the file the manifest describes
+    current = resolve_path(output_path)
+    if current is None or manifest.get('output') != dict(_stat(current), path=current):
+        manifest = {}
+    previous = manifest.get('inputs', {})
+
+    states = {path: file_state(path, previous.get(path)) for path in inputs}
+    changed = [path for path in inputs
+               if path not in previous or previous[path]['sha256'] != states[path]['sha256']]
+    removed = [path for path in previous if path not in states]
+
+    entries = {path: dict(previous[path], **states[path]) for path in inputs if path not in changed}
+    if not changed and not removed:
+        if entries != previous:
+            save_manifest(dict(manifest, inputs=entries), mpath)
+        return UpdateResult(current, manifest['rows'], [], [])
+
+    # Clean only the changed inputs, into a staging file next to the output
+    base, ext = os.path.splitext(output_path)
+    stage = ProcessedWriter(f'{base}.staging{ext}')
+    try:
+        with stage:
+            for path in changed:
+                fingerprints, rows = {}, 0
+                for chunk in read_raw_chunks(path, chunk_bytes):
+                    stage.write(chunk)
+                    _add_fingerprints(fingerprints, chunk)
+                    rows += len(chunk)
+                entries[path] = _entry(states[path], fingerprints, rows)
+
+        old_years, new_years = _combine(previous), _combine(entries)
+        changed_years = sorted(year for year in old_years.keys() | new_years.keys()
+                               if old_years.get(year) != new_years.get(year))
+        path, rows = current, manifest.get('rows', 0)
+
+        if changed_years or not manifest:
+            wanted = set(changed_years)
+            # Unchanged inputs that also have rows for a changed year are re-read for those years only
+            shared = [p for p in inputs if p not in changed and wanted & {int(y) for y in entries[p]['years']}]
+            with ProcessedWriter(output_path) as writer:
+                if manifest:
+                    for df in iter_processed(current, exclude_years=wanted):
+                        writer.write(df)
+                new_rows = [iter_processed(stage.path)]
+                new_rows += [read_raw_chunks(shared_path, chunk_bytes) for shared_path in shared]
+                for chunks in new_rows:
+                    for df in chunks:
+                        df = df[df[YEAR].isin(wanted)]
+                        if len(df):
+                            writer.write(df)
+            path, rows = writer.path, writer.rows
+    finally:
+        if os.path.exists(stage.path):
+            os.remove(stage.path)
+
+    save_manifest({
+        'version': MANIFEST_VERSION,
+        'output': dict(_stat(path), path=path),
+        'rows': rows,
+        'inputs': entries,
+    }, mpath)
+    return UpdateResult(path, rows, changed, changed_years)
@@ -0,0 +1,145 @@
+"""Request metrics for the Flask API in the Prometheus text format.
+
+A tiny stand-in for ``prometheus_client`` (not a dependency): fixed-bucket
+histograms and labelled counters, and ``render`` to write them out together
+with values read at scrape time (model version, cache stats). Recording a
+request is a lock and a list append; the bucketing is done in NumPy batches.
+
+Values are per process. Under gunicorn each worker keeps its own, and a
+scrape of ``/metrics`` is answered by whichever worker gets it; the worker's
+pid is exported so the series can be told apart.
+``benchmarks/bench_metrics.py`` measures the per-request overhead.
+"""
+import os
+import threading
+
+import numpy as np
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds in seconds: 5 µs .. 2.5 s, fine enough at the low end for cache hits
+DEFAULT_BUCKETS = (5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                   1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _label(name, value):
+    value = str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    return f'{name}="{value}"'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Histogram with one series per value of a single label.
+
+    ``observe`` takes one row per request: a duration for every label value,
+    in order (NaN for a stage that didn't run). It only appends the row; rows
+    are bucketed with NumPy every FLUSH_EVERY requests and at scrape time.
+    """
+
+    FLUSH_EVERY = 1024
+
+    def __init__(self, name, help, label, values, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.values = tuple(values)
+        self.buckets = np.asarray(buckets, dtype=np.float64)
+        self._counts = np.zeros((len(self.values), len(self.buckets) + 1), dtype=np.int64)
+        self._sums = np.zeros(len(self.values))
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def observe(self, row):
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.FLUSH_EVERY:
+                self._flush()
+
+    def _flush(self):
+        # Called with the lock held
+        if not self._pending:
+            return
+        rows = np.array(self._pending, dtype=np.float64)
+        self._pending = []
+        seen = ~np.isnan(rows)
+        # side='left': a value equal to a bound belongs in that bucket (Prometheus "le")
+        index = np.searchsorted(self.buckets, rows, side='left')
+        for column in range(len(self.values)):
+            self._counts[column] += np.bincount(index[seen[:, column], column], minlength=len(self.buckets) + 1)
+        self._sums += np.where(seen, rows, 0.0).sum(axis=0)
+
+    def snapshot(self):
+        """{label value: (cumulative bucket counts, sum)}"""
+        with self._lock:
+            self._flush()
+            cumulative = np.cumsum(self._counts, axis=1)
+            sums = self._sums.copy()
+        return {value: (cumulative[i].tolist(), float(sums[i])) for i, value in enumerate(self.values)}
+
+    def render(self, extra=''):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        bounds = [_number(float(bound)) for bound in self.buckets] + ['+Inf']
+        for value, (cumulative, total) in self.snapshot().items():
+            labels = _label(self.label, value) + extra
+            for bound, count in zip(bounds, cumulative):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_sum{{{labels}}} {_number(total)}')
+            lines.append(f'{self.name}_count{{{labels}}} {cumulative[-1]}')
+        return lines
+
+
+class Counter:
+    """Counter with one series per value of a single label."""
+
+    def __init__(self, name, help, label, values):
+        self.name = name
+        self.help = help
+        self.label = label
+        self._values = dict.fromkeys(values, 0)
+        self._lock = threading.Lock()
+
+    def inc(self, value, amount=1):
+        with self._lock:
+            self._values[value] += amount
+
+    def get(self, value):
+        return self._values[value]
+
+    def render(self, extra=''):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = list(self._values.items())
+        lines.extend(f'{self.name}{{{_label(self.label, value)}{extra}}} {count}' for value, count in items)
+        return lines
+
+
+def sample(name, value, labels=()):
+    """A value read at scrape time (model version, cache stats): (name, labels, value)."""
+    return name, tuple(labels), value
+
+
+def render(metrics, samples=(), kinds=None):
+    """The full /metrics body.
+
+    metrics: Histogram/Counter objects; samples: ``sample(...)`` tuples, grouped
+    by name in the order given; kinds: {name: (type, help)} for those samples.
+    Every series gets a ``pid`` label.
+    """
+    pid = _label('pid', os.getpid())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render(',' + pid))
+    seen = set()
+    for name, labels, value in samples:
+        if name not in seen:
+            seen.add(name)
+            kind, help = (kinds or {}).get(name, ('gauge', name))
+            lines += [f'# HELP {name} {help}', f'# TYPE {name} {kind}']
+        text = ','.join([_label(k, v) for k, v in labels] + [pid])
+        lines.append(f'{name}{{{text}}} {_number(value)}')
+    return '\n'.join(lines) + '\n'
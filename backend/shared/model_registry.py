@@ -0,0 +1,133 @@
+"""Process-wide cache for the trained prediction model.
+
+The model is loaded once per worker with ``joblib.load(mmap_mode='r')`` so
+large NumPy arrays are memory-mapped and shared between forked gunicorn
+workers. A background check notices when the file on disk changes (mtime,
+size, then content hash) and swaps the new model in with a single reference
+assignment, so requests never wait on a reload and never see a half-loaded
+model.
+
+Publish a new model by writing it to a temporary file and renaming it over
+MODEL_PATH; overwriting in place would change pages under a live memory map.
+``compact_model.save_model`` does that and also exports a NumPy-only copy;
+when that export was made from the same pickle (by hash) it is served instead,
+skipping the unpickle and sklearn's per-call overhead.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+from backend.shared import compact_model, config
+from backend.shared.schema import FEATURES
+
+logger = logging.getLogger(__name__)
+
+# The served model maps a (year, income) feature row to an effective tax rate in percent
+N_FEATURES = len(FEATURES)
+
+LoadedModel = namedtuple('LoadedModel', ['model', 'version', 'path', 'signature', 'loaded_at'])
+
+
+def file_digest(path, block_size=1 << 20):
+    """SHA-256 of a file, read in blocks so large models don't spike memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    def __init__(self, path, reload_interval=5.0, mmap_mode='r', use_compact=True):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.mmap_mode = mmap_mode
+        self.use_compact = use_compact
+        self._current = None
+        self._digest = None
+        self._failed_signature = None
+        self._last_check = None
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.reload_errors = 0
+
+    def get(self):
+        """Return the current LoadedModel (or None) without ever blocking on I/O
+        once a model is in place."""
+        current = self._current
+        if self._last_check is not None and time.monotonic() - self._last_check < self.reload_interval:
+            return current
+        if current is None:
+            # Nothing to serve yet, so the first load happens inline
+            return self.load()
+
+        # Only one background check at a time; everyone else keeps the old model
+        if self._lock.acquire(blocking=False):
+            self._last_check = time.monotonic()
+            threading.Thread(target=self._check_and_release, daemon=True).start()
+        return current
+
+    def load(self):
+        """Synchronously load (or refresh) the model. Used at startup/preload."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            self._refresh()
+        return self._current
+
+    def _check_and_release(self):
+        try:
+            self._refresh()
+        finally:
+            self._lock.release()
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        signature = (stat.st_mtime_ns, stat.st_size)
+        current = self._current
+        if signature == self._failed_signature or (current is not None and current.signature == signature):
+            return
+
+        try:
+            digest = file_digest(self.path)
+            if current is not None and digest == self._digest:
+                # Touched but unchanged: remember the new mtime and keep the model
+                self._current = current._replace(signature=signature)
+                return
+
+            model = None
+            if self.use_compact:
+                model = compact_model.load(compact_model.compact_path(self.path), digest, self.mmap_mode)
+            if model is None:
+                import joblib  # only when there is no matching compact export
+                model = joblib.load(self.path, mmap_mode=self.mmap_mode)
+            n_features = getattr(model, 'n_features_in_', N_FEATURES)
+            if n_features != N_FEATURES:
+                raise ValueError(f'expected a model with {N_FEATURES} features (year, income), got {n_features}')
+        except Exception:
+            self._failed_signature = signature
+            self.reload_errors += 1
+            logger.exception('Failed to load model from %s; keeping the previous one', self.path)
+            return
+
+        self._digest = digest
+        self._current = LoadedModel(model, digest[:12], self.path, signature, time.time())
+        self.reloads += 1
+        logger.info('Loaded model %s from %s', self._current.version, self.path)
+
+
+_registry = None
+
+
+def get_registry():
+    """The registry for config.MODEL_PATH, created on first use in each process."""
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry(config.MODEL_PATH, reload_interval=config.MODEL_RELOAD_INTERVAL,
+                                  use_compact=config.USE_COMPACT_MODEL)
+    return _registry
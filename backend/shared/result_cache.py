@@ -0,0 +1,223 @@
+"""LRU + TTL cache of single /predict results.
+
+Keys are the normalized ``(income, year, model_version)``: income rounded to
+cents, year as int. The model version is part of the key, so a reloaded model
+can never be answered from the old one's entries; on top of that the cache
+drops everything from other versions as soon as it sees a new one, so stale
+entries don't sit in memory until they age out.
+
+Lookups go to an in-process LRU first, then to an optional shared store that
+all gunicorn workers see (``SQLiteStore`` on ``DATABASE_URL``, or any object
+with the same ``get``/``set``/``purge``/``clear`` methods). A shared hit is
+copied into the local LRU. The store is only ever a speed-up: any error from
+it (a locked database, a full disk, a custom store's connection error) is
+logged, counted in ``store_errors`` and the request carries on as a miss. The store is called
+outside the cache's lock, so one slow write doesn't stall the worker's
+other threads.
+
+Configured from ``backend/shared/config.py``: ``RESULT_CACHE_SIZE`` (0
+disables caching), ``RESULT_CACHE_TTL`` and ``RESULT_CACHE_BACKEND``
+(``memory``, ``sqlite`` or ``module:factory`` returning a store).
+"""
+import importlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from backend.shared import config
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(income, year):
+    """The cache key's (income, year): income to cents, year as int."""
+    return round(float(income), 2), int(year)
+
+
+def sqlite_path(url):
+    """File path of a ``sqlite:///path`` URL; relative paths are under the repo root."""
+    prefix = 'sqlite:///'
+    if not url.startswith(prefix):
+        raise ValueError(f'Expected a sqlite:/// DATABASE_URL, got {url!r}')
+    path = url[len(prefix):]
+    return path if os.path.isabs(path) else os.path.join(config.BASE_DIR, path)
+
+
+class SQLiteStore:
+    """Result store in a local SQLite file, shared by every worker on the host."""
+
+    # Expired rows are deleted every this many writes
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS prediction_cache ('
+                         'income REAL, year INTEGER, version TEXT, value REAL, expires REAL, '
+                         'PRIMARY KEY (income, year, version))')
+
+    def _connect(self):
+        # One connection per thread; WAL lets readers in other workers run alongside a writer.
+        # A connection inherited through fork (gunicorn preload) must not be reused.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key, now):
+        row = self._connect().execute(
+            'SELECT value FROM prediction_cache WHERE income = ? AND year = ? AND version = ? AND expires > ?',
+            (*key, now)).fetchone()
+        return None if row is None else row[0]
+
+    def set(self, key, value, expires):
+        conn = self._connect()
+        conn.execute('INSERT OR REPLACE INTO prediction_cache VALUES (?, ?, ?, ?, ?)', (*key, value, expires))
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            conn.execute('DELETE FROM prediction_cache WHERE expires <= ?', (time.time(),))
+
+    def purge(self, keep_version):
+        self._connect().execute('DELETE FROM prediction_cache WHERE version != ?', (keep_version,))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM prediction_cache')
+
+
+class ResultCache:
+    def __init__(self, maxsize=10000, ttl=300.0, store=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store = store
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.store_errors = 0
+
+    def _check_version(self, version):
+        """Drop the local entries of an older version. Called with the lock held;
+        returns True when the caller should purge the store (after releasing it)."""
+        if version == self._version:
+            return False
+        previous, self._version = self._version, version
+        if previous is None:
+            return False
+        self._entries.clear()
+        self.invalidations += 1
+        return self.store is not None
+
+    def _store_call(self, method, *args):
+        # Never called with the lock held. Stores may be any RESULT_CACHE_BACKEND
+        # factory, so whatever they raise is a miss, not a failed request.
+        try:
+            return getattr(self.store, method)(*args)
+        except Exception:
+            logger.warning('Result cache store %s() failed', method, exc_info=True)
+            with self._lock:
+                self.store_errors += 1
+            return None
+
+    def get(self, income, year, version):
+        """Cached value for the normalized key, or None."""
+        key = (*normalize(income, year), version)
+        now = time.time()
+        with self._lock:
+            purge = self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+                self.expirations += 1
+
+        if purge:
+            self._store_call('purge', version)
+        value = self._store_call('get', key, now) if self.store is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+            self._put(key, value, now + self.ttl)
+        return value
+
+    def set(self, income, year, version, value):
+        key = (*normalize(income, year), version)
+        expires = time.time() + self.ttl
+        with self._lock:
+            purge = self._check_version(version)
+            self._put(key, value, expires)
+        if purge:
+            self._store_call('purge', version)
+        if self.store is not None:
+            self._store_call('set', key, value, expires)
+
+    def _put(self, key, value, expires):
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self._store_call('clear')
+
+    def stats(self):
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'backend': 'memory' if self.store is None else type(self.store).__name__,
+            'model_version': self._version,
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'hit_ratio': (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+            'store_errors': self.store_errors,
+        }
+
+
+def make_store(backend=None):
+    """The shared store for RESULT_CACHE_BACKEND, or None for a per-process cache."""
+    backend = backend or config.RESULT_CACHE_BACKEND
+    if backend == 'memory':
+        return None
+    if backend == 'sqlite':
+        return SQLiteStore(sqlite_path(config.DATABASE_URL))
+    module, _, factory = backend.partition(':')
+    return getattr(importlib.import_module(module), factory)()
+
+
+_cache = None
+
+
+def get_cache():
+    """The result cache for this process, or None if RESULT_CACHE_SIZE is 0."""
+    global _cache
+    if _cache is None and config.RESULT_CACHE_SIZE > 0:
+        _cache = ResultCache(config.RESULT_CACHE_SIZE, config.RESULT_CACHE_TTL, make_store())
+    return _cache
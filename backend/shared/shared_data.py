@@ -0,0 +1,238 @@
+"""Publish the processed dataset and bracket tables once; attach them zero-copy.
+
+Every Streamlit session, API worker and training script used to read and
+decode its own private copy of the processed file. ``publish`` writes the
+dataset's columns and the tax engine's bracket tables (years, thresholds,
+rates) as raw NumPy arrays into one file (``config.SHARED_DATA_PATH``).
+Readers ``mmap`` it read-only and get NumPy views straight into the mapping,
+so every process on the machine shares the same page-cache pages: N readers
+cost about one copy of the data, not N. Put the file on a tmpfs such as
+``/dev/shm`` to keep it in memory.
+
+Layout (all arrays 64-byte aligned):
+
+    b'TAXSHM01'  uint32 format  uint32 header length
+    JSON header  {"version", "created", "sources", "rows", "arrays": {name: {dtype, shape, offset}}}
+    array data
+
+``version`` goes up by one on every publish. ``sources`` records the
+(mtime_ns, size) of the processed file and the raw CSV it was built from, so
+readers only use the dataset or the brackets while they still match the
+files on disk (``read_processed`` / ``engine`` fall back to the files).
+
+A publish writes a temp file and renames it over the old one. Readers that
+already attached keep the old mapping (and their views stay valid) until
+they drop it; ``SharedData.get`` notices the new inode and attaches the new
+version, like the model registry does for models.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from backend.shared import config, storage
+from backend.shared.schema import YEAR
+
+MAGIC = b'TAXSHM01'
+FORMAT_VERSION = 1
+ALIGN = 64
+_PREFIX = struct.Struct('<8sII')
+
+
+def _signature(path):
+    """(mtime_ns, size) of `path`, or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def read_header(path=None):
+    """The header of the published file, or None if there is none (or it isn't one)."""
+    try:
+        with open(path or config.SHARED_DATA_PATH, 'rb') as fh:
+            magic, version, length = _PREFIX.unpack(fh.read(_PREFIX.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return None
+            return json.loads(fh.read(length))
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def publish(path=None, data_path=None, raw_path=None):
+    """Write the processed dataset and the bracket tables to `path` and swap it in.
+
+    Returns the new header.
+    """
+    from backend.shared.tax_engine import TaxEngine
+
+    path = path or config.SHARED_DATA_PATH
+    data_file = storage.resolve_path(data_path)
+    if data_file is None:
+        raise FileNotFoundError(f'Processed data not found: {data_path or config.DATA_PATH}')
+    raw_path = raw_path or config.RAW_DATA_PATH
+    # Signatures first: if a file changes while we read it, readers will see it as stale
+    sources = {'dataset': dict(path=os.path.abspath(data_file), signature=_signature(data_file)),
+               'brackets': dict(path=os.path.abspath(raw_path), signature=_signature(raw_path))}
+
+    df = storage.read_processed(data_file)
+    engine = TaxEngine.from_csv(raw_path)
+    arrays = {}
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if values.dtype.kind not in 'biufM':
+            raise ValueError(f'Column {column!r} has dtype {values.dtype}; only numeric columns can be shared')
+        arrays[f'dataset/{column}'] = values
+    arrays.update({'brackets/years': engine.years, 'brackets/thresholds': engine.thresholds,
+                   'brackets/rates': engine.rates})
+
+    previous = read_header(path)
+    header = {'version': previous['version'] + 1 if previous else 1, 'created': time.time(),
+              'sources': sources, 'rows': len(df), 'columns': [str(c) for c in df.columns], 'arrays': {}}
+    # Offsets depend on the header's length, which depends on the offsets: lay out
+    # against a generous reserve for the header and pad it to that size
+    reserve = _aligned(_PREFIX.size + len(json.dumps(header)) + 128 * (len(arrays) + 1))
+    offset = reserve
+    for name, values in arrays.items():
+        values = np.ascontiguousarray(values)
+        arrays[name] = values
+        header['arrays'][name] = {'dtype': values.dtype.str, 'shape': list(values.shape), 'offset': offset}
+        offset = _aligned(offset + values.nbytes)
+    encoded = json.dumps(header).encode()
+    if _PREFIX.size + len(encoded) > reserve:
+        raise ValueError('shared data header does not fit its reserved space')
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    try:
+        with open(tmp_path, 'wb') as fh:
+            fh.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(encoded)) + encoded)
+            for name, values in arrays.items():
+                fh.seek(header['arrays'][name]['offset'])
+                fh.write(values.reshape(-1).view(np.uint8))
+            fh.truncate(max(offset, reserve))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return header
+
+
+class Snapshot:
+    """One published version, mapped read-only."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as fh:
+            stat = os.fstat(fh.fileno())
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, length = _PREFIX.unpack_from(self._mmap)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f'{path} is not a shared data file (format {FORMAT_VERSION})')
+        self.header = json.loads(self._mmap[_PREFIX.size:_PREFIX.size + length])
+        self.path = path
+        self.inode = (stat.st_dev, stat.st_ino)
+        self.version = self.header['version']
+        self.columns = self.header['columns']
+
+    def array(self, name):
+        """Zero-copy, read-only view of one published array."""
+        info = self.header['arrays'][name]
+        dtype = np.dtype(info['dtype'])
+        count = int(np.prod(info['shape'], dtype=np.int64))
+        return np.frombuffer(self._mmap, dtype, count, info['offset']).reshape(info['shape'])
+
+    def is_current(self, part, path):
+        """Whether the published `part` ('dataset' or 'brackets') was built from `path` as it is now."""
+        source = self.header['sources'][part]
+        return source['path'] == os.path.abspath(path) and source['signature'] == _signature(path)
+
+    def frame(self, columns=None):
+        """The dataset (or just `columns` it has) as a DataFrame of views into the mapping."""
+        columns = self.columns if columns is None else [c for c in columns if c in self.columns]
+        return pd.DataFrame({c: self.array(f'dataset/{c}') for c in columns}, copy=False)
+
+    def engine(self):
+        from backend.shared.tax_engine import TaxEngine
+        return TaxEngine(self.array('brackets/years'), self.array('brackets/thresholds'),
+                         self.array('brackets/rates'))
+
+
+class SharedData:
+    """The latest published Snapshot at `path`, re-attached when a new version is swapped in.
+
+    Checks the file at most every `check_interval` seconds (a stat call).
+    """
+
+    def __init__(self, path, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._current = None
+        self._last_check = None
+        self._lock = threading.Lock()
+        self.attaches = 0
+
+    def get(self):
+        """The current Snapshot, or None if nothing (valid) is published."""
+        now = time.monotonic()
+        if self._last_check is not None and now - self._last_check < self.check_interval:
+            return self._current
+        with self._lock:
+            self._last_check = now
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                self._current = None
+                return None
+            if self._current is None or self._current.inode != (stat.st_dev, stat.st_ino):
+                try:
+                    self._current = Snapshot(self.path)
+                    self.attaches += 1
+                except (OSError, ValueError, struct.error):
+                    self._current = None
+            return self._current
+
+    def current(self, part, path):
+        """The Snapshot if its `part` matches `path` on disk, else None."""
+        snapshot = self.get()
+        return snapshot if snapshot is not None and snapshot.is_current(part, path) else None
+
+
+_shared = None
+
+
+def get_shared():
+    """The SharedData for config.SHARED_DATA_PATH, created on first use in each process."""
+    global _shared
+    if _shared is None:
+        _shared = SharedData(config.SHARED_DATA_PATH, config.SHARED_DATA_CHECK_INTERVAL)
+    return _shared
+
+
+def read_processed(path=None, columns=None, years=None):
+    """storage.read_processed, served from the published snapshot (zero-copy) when it
+    matches the processed file on disk."""
+    actual = storage.resolve_path(path)
+    snapshot = get_shared().current('dataset', actual) if actual is not None else None
+    if snapshot is None:
+        return storage.read_processed(path, columns=columns, years=years)
+    df = snapshot.frame(columns)
+    if years is not None:
+        year = snapshot.array(f'dataset/{YEAR}')
+        keep = np.ones(len(year), dtype=bool)
+        if years[0] is not None:
+            keep &= year >= years[0]
+        if years[1] is not None:
+            keep &= year <= years[1]
+        df = df[keep].reset_index(drop=True)
+    return df
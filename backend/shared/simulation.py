@@ -0,0 +1,175 @@
+"""Monte Carlo revenue estimates for bracket what-if scenarios.
+
+A scenario starts from one year's schedule in the tax engine and overrides
+any of its bottom rate, bottom limit, top rate or top limit (rates in
+percent). As in ``TaxEngine.from_frame``, the middle bracket stays at the
+midpoint of the two rates.
+
+Simulated filers' incomes come from a distribution (``draw_incomes``):
+
+    {'kind': 'lognormal', 'median': 45000, 'sigma': 0.9}
+    {'kind': 'pareto', 'alpha': 1.8, 'minimum': 20000}
+    {'kind': 'empirical', 'values': [...]}            # resampled with replacement
+
+Filers are drawn in blocks of ``BLOCK_FILERS``; block j always comes from the
+generator seeded with (seed, j), and each block is taxed under the baseline
+and every scenario. So all scenarios see the same filers (their differences
+are not sampling noise), and results are identical for any ``jobs``: blocks
+run on a loky process pool and their sums are added in block order.
+"""
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from backend.shared.tax_engine import TaxEngine
+
+BLOCK_FILERS = 1 << 20
+BRACKETS = ('bottom', 'middle', 'top')
+DISTRIBUTIONS = {'lognormal': ('median', 'sigma'), 'pareto': ('alpha', 'minimum'), 'empirical': ('values',)}
+
+# Unset fields keep the year's baseline value
+Scenario = namedtuple('Scenario', 'name bottom_rate bottom_limit top_rate top_limit', defaults=(None,) * 4)
+BASELINE = Scenario('Baseline')
+
+
+def check_distribution(distribution):
+    """Raise ValueError unless `distribution` is one draw_incomes() accepts."""
+    kind = distribution.get('kind') if isinstance(distribution, dict) else None
+    if kind not in DISTRIBUTIONS:
+        raise ValueError(f"distribution kind must be one of: {', '.join(DISTRIBUTIONS)}")
+    missing = [name for name in DISTRIBUTIONS[kind] if distribution.get(name) is None]
+    if missing:
+        raise ValueError(f"{kind} distribution needs: {', '.join(missing)}")
+    if kind == 'empirical':
+        try:
+            values = np.asarray(distribution['values'], dtype=np.float64)
+        except (TypeError, ValueError):
+            values = None
+        if values is None or values.ndim != 1 or not len(values) or not np.isfinite(values).all():
+            raise ValueError('empirical values must be a non-empty list of finite numbers')
+        return
+    try:
+        params = [float(distribution[name]) for name in DISTRIBUTIONS[kind]]
+    except (TypeError, ValueError):
+        params = [np.nan]
+    if not all(np.isfinite(value) and value > 0 for value in params):
+        raise ValueError(f"{', '.join(DISTRIBUTIONS[kind])} must be positive numbers")
+
+
+def draw_incomes(distribution, n, rng):
+    """n incomes from `distribution` (see module docstring)."""
+    kind = distribution['kind']
+    if kind == 'lognormal':
+        return rng.lognormal(np.log(float(distribution['median'])), float(distribution['sigma']), n)
+    if kind == 'pareto':
+        # numpy's pareto is the Lomax form; shift and scale it to a Pareto with this minimum
+        return (rng.pareto(float(distribution['alpha']), n) + 1.0) * float(distribution['minimum'])
+    return rng.choice(np.asarray(distribution['values'], dtype=np.float64), n)
+
+
+def baseline(engine, year):
+    """The year's schedule as Scenario fields (rates in percent).
+
+    Raises ValueError for a year the engine has no schedule for (it would
+    otherwise silently use the nearest year's).
+    """
+    pos = int(engine.year_positions(year))
+    if engine.years[pos] != int(year):
+        raise ValueError(f'No bracket schedule for {year}: years {engine.min_year}-{engine.max_year} in the data')
+    return {'bottom_rate': float(engine.rates[pos, 0] * 100), 'bottom_limit': float(engine.thresholds[pos, 1]),
+            'top_rate': float(engine.rates[pos, -1] * 100), 'top_limit': float(engine.thresholds[pos, -1])}
+
+
+def schedule(engine, year, scenario=BASELINE):
+    """A one-year TaxEngine for `scenario` applied to the year's schedule."""
+    values = baseline(engine, year)
+    values.update({field: float(value) for field, value in scenario._asdict().items()
+                   if field != 'name' and value is not None})
+    if not (0 <= values['bottom_rate'] <= 100 and 0 <= values['top_rate'] <= 100):
+        raise ValueError(f"{scenario.name}: rates must be between 0 and 100")
+    if values['bottom_limit'] < 0 or values['top_limit'] < 0:
+        raise ValueError(f"{scenario.name}: limits must not be negative")
+    bottom_limit = values['bottom_limit']
+    thresholds = [[0.0, bottom_limit, max(values['top_limit'], bottom_limit)]]
+    rates = np.array([[values['bottom_rate'], (values['bottom_rate'] + values['top_rate']) / 2,
+                       values['top_rate']]]) / 100
+    return TaxEngine([int(year)], thresholds, rates)
+
+
+def simulate_block(schedules, year, distribution, block, size, seed):
+    """Sums over one block of filers, one row per schedule:
+    [revenue, sum of squared change vs schedules[0], paying more, paying less,
+    filers per bracket..., revenue per bracket...]; plus the block's total income."""
+    income = draw_incomes(distribution, size, np.random.default_rng([seed, block]))
+    k = len(BRACKETS)
+    sums = np.zeros((len(schedules), 4 + 2 * k))
+    reference = None
+    for row, engine in enumerate(schedules):
+        tax = engine.liability(income, year)
+        bracket = engine.bracket_index(income, year)
+        if reference is None:
+            reference = tax
+        change = tax - reference
+        sums[row, :4] = tax.sum(), change @ change, np.count_nonzero(change > 0), np.count_nonzero(change < 0)
+        sums[row, 4:4 + k] = np.bincount(bracket, minlength=k)
+        sums[row, 4 + k:] = np.bincount(bracket, tax, minlength=k)
+    return float(income.sum()), sums
+
+
+def simulate(engine, year, scenarios, distribution, filers=1_000_000, seed=0, jobs=1, population=None):
+    """Revenue under the year's baseline and each scenario for `filers` simulated filers.
+
+    population: scale totals to this many filers (default: the simulated ones).
+    jobs: worker processes for the blocks (None or 0: all cores); 1 runs inline.
+    Returns a DataFrame, one row per scenario with the baseline first.
+    """
+    check_distribution(distribution)
+    if filers < 1:
+        raise ValueError('filers must be at least 1')
+    scenarios = [BASELINE] + [Scenario(**s) if isinstance(s, dict) else s for s in scenarios]
+    schedules = [schedule(engine, year, scenario) for scenario in scenarios]
+    blocks = [(block, min(BLOCK_FILERS, filers - start)) for block, start in enumerate(range(0, filers, BLOCK_FILERS))]
+    args = (schedules, int(year), distribution)
+
+    jobs = min(jobs or os.cpu_count() or 1, len(blocks))
+    if jobs <= 1:
+        results = (simulate_block(*args, block, size, seed) for block, size in blocks)
+    else:
+        import joblib
+        # Ordered results: the sums are added in the same order for any number of workers
+        results = joblib.Parallel(n_jobs=jobs, backend='loky', return_as='generator')(
+            joblib.delayed(simulate_block)(*args, block, size, seed) for block, size in blocks)
+
+    income, sums = 0.0, np.zeros((len(schedules), 4 + 2 * len(BRACKETS)))
+    for block_income, block_sums in results:
+        income += block_income
+        sums += block_sums
+    return _summarize(scenarios, sums, income, filers, population)
+
+
+def _summarize(scenarios, sums, income, filers, population):
+    k = len(BRACKETS)
+    scale = population / filers if population else 1.0
+    revenue = sums[:, 0]
+    change = revenue - revenue[0]
+    mean_change = change / filers
+    variance = np.maximum(sums[:, 1] / filers - mean_change ** 2, 0.0)
+    out = pd.DataFrame({
+        'scenario': [scenario.name for scenario in scenarios],
+        'revenue': revenue * scale,
+        'revenue_change': change * scale,
+        'revenue_change_pct': change / revenue[0] * 100 if revenue[0] else np.nan,
+        # Standard error of the total change from sampling the filers
+        'revenue_change_se': np.sqrt(filers * variance) * scale,
+        'tax_per_filer': revenue / filers,
+        'effective_rate_pct': revenue / income * 100 if income else np.nan,
+        'paying_more_pct': sums[:, 2] / filers * 100,
+        'paying_less_pct': sums[:, 3] / filers * 100,
+    })
+    for i, name in enumerate(BRACKETS):
+        out[f'{name}_filers_pct'] = sums[:, 4 + i] / filers * 100
+    for i, name in enumerate(BRACKETS):
+        out[f'{name}_revenue'] = sums[:, 4 + k + i] * scale
+    return out
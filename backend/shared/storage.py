@@ -0,0 +1,290 @@
+"""Read/write the processed dataset at config.DATA_PATH.
+
+The format follows the file extension:
+
+- ``.parquet`` (default): columnar, sorted by Year and split into row groups
+  so ``years=`` filters skip whole row groups using their min/max statistics.
+- ``.feather`` / ``.arrow``: Arrow IPC, memory-mapped on read (zero-copy).
+- ``.pkl``: the original pickle format.
+
+If the columnar file does not exist yet (or pyarrow is not installed), readers
+fall back to the ``.pkl`` file with the same stem, so data written by older
+versions of the pipeline keeps working. Files written with the old snake_case
+column names (``schema.LEGACY_NAMES``) are read under the canonical names:
+callers ask for and get "Year", "Bottom Bracket Rate %", ...
+"""
+import os
+
+import pandas as pd
+
+from backend.shared import config
+from backend.shared.schema import LEGACY_NAMES, YEAR
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow is in requirements.txt
+    pa = None
+
+ROW_GROUP_SIZE = 100_000
+
+COLUMNAR_EXTENSIONS = ('.parquet', '.feather', '.arrow')
+
+
+def _ext(path):
+    return os.path.splitext(path)[1].lower()
+
+
+def pickle_path(path):
+    return os.path.splitext(path)[0] + '.pkl'
+
+
+def resolve_path(path=None):
+    """The file that will actually be read for `path`, or None if neither it nor its pickle exists."""
+    path = path or config.DATA_PATH
+    if os.path.exists(path) and (pa is not None or _ext(path) not in COLUMNAR_EXTENSIONS):
+        return path
+    fallback = pickle_path(path)
+    return fallback if os.path.exists(fallback) else None
+
+
+def _year_filter(df, years):
+    start, end = years
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df[YEAR] >= start
+    if end is not None:
+        mask &= df[YEAR] <= end
+    return df[mask]
+
+
+def _file_names(names):
+    """{canonical name: name in the file} for the columns a file has."""
+    return {LEGACY_NAMES.get(name, name): name for name in names}
+
+
+def _canonical(df):
+    """`df` with legacy snake_case columns renamed to the canonical names."""
+    if any(name in LEGACY_NAMES for name in df.columns):
+        return df.rename(columns=LEGACY_NAMES)
+    return df
+
+
+def _schema_names(path, ext):
+    if ext == '.parquet':
+        return pq.read_schema(path).names
+    # Opening a memory-mapped IPC file only reads its footer
+    return feather.read_table(path, memory_map=True).schema.names
+
+
+def read_processed(path=None, columns=None, years=None):
+    """Load the processed dataset.
+
+    columns: only these columns are read from disk (columnar formats);
+    names the file doesn't have are skipped, like a missing column in a page.
+    years: (start, end) inclusive, either may be None; parquet pushes this
+    down to row-group statistics, the other formats filter after loading.
+    """
+    requested = path or config.DATA_PATH
+    actual = resolve_path(requested)
+    if actual is None:
+        raise FileNotFoundError(f'Processed data not found: {requested}')
+
+    ext = _ext(actual)
+    if ext not in COLUMNAR_EXTENSIONS:
+        df = _canonical(pd.read_pickle(actual))
+        if years is not None:
+            df = _year_filter(df, years).reset_index(drop=True)
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+        return df
+
+    names = _file_names(_schema_names(actual, ext))
+    read_columns = None
+    if columns is not None:
+        columns = [col for col in columns if col in names]
+        read_columns = columns + [YEAR] if years is not None and YEAR not in columns else columns
+    file_columns = None if read_columns is None else [names[col] for col in read_columns]
+
+    if ext == '.parquet':
+        filters = None
+        if years is not None:
+            year = names.get(YEAR, YEAR)
+            filters = [(year, op, bound) for op, bound in (('>=', years[0]), ('<=', years[1])) if bound is not None]
+        df = _canonical(pq.read_table(actual, columns=file_columns, filters=filters or None,
+                                      memory_map=True).to_pandas())
+    else:
+        df = _canonical(feather.read_table(actual, columns=file_columns, memory_map=True).to_pandas())
+        if years is not None:
+            df = _year_filter(df, years).reset_index(drop=True)
+
+    if read_columns is not columns:
+        df = df[columns]
+    return df
+
+
+def write_processed(df, path=None):
+    """Write the processed dataset atomically (temp file + rename). Returns the path written."""
+    path = path or config.DATA_PATH
+    ext = _ext(path)
+    if ext in COLUMNAR_EXTENSIONS and pa is None:
+        path, ext = pickle_path(path), '.pkl'
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    if ext == '.parquet':
+        if YEAR in df.columns:
+            df = df.sort_values(YEAR, kind='stable')
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+    elif ext in ('.feather', '.arrow'):
+        # Uncompressed so readers can memory-map it without decoding
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+class ProcessedWriter:
+    """Append chunks to the processed dataset without holding it all in memory.
+
+    Chunks go to a temp file that replaces `path` on close(), so readers never
+    see a half-written dataset. Parquet writes each chunk as its own row
+    group(s) (rows are not re-sorted across chunks); Arrow IPC writes record
+    batches. Pickle cannot be appended to, so in that format chunks are
+    collected and written at the end.
+
+        with ProcessedWriter() as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, path=None):
+        path = path or config.DATA_PATH
+        ext = _ext(path)
+        if ext in COLUMNAR_EXTENSIONS and pa is None:
+            path, ext = pickle_path(path), '.pkl'
+        self.path = path
+        self.ext = ext
+        self.rows = 0
+        self._tmp_path = f'{path}.tmp'
+        self._writer = None
+        self._schema = None
+        self._chunks = []
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def write(self, df):
+        self.rows += len(df)
+        if self.ext not in COLUMNAR_EXTENSIONS:
+            self._chunks.append(df)
+            return
+        table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema
+            if self.ext == '.parquet':
+                self._writer = pq.ParquetWriter(self._tmp_path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(self._tmp_path, self._schema)
+        if self.ext == '.parquet':
+            self._writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+        else:
+            self._writer.write_table(table)
+
+    def close(self):
+        """Finish the file and atomically move it into place. Returns the path written."""
+        if self.ext not in COLUMNAR_EXTENSIONS:
+            df = pd.concat(self._chunks, ignore_index=True) if self._chunks else pd.DataFrame()
+            df.to_pickle(self._tmp_path)
+            self._chunks = []
+        elif self._writer is None:
+            # No chunks at all: still produce an (empty) file
+            return write_processed(pd.DataFrame(), self.path)
+        else:
+            self._writer.close()
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def iter_processed(path, exclude_years=None):
+    """Yield the processed dataset batch by batch (bounded memory), optionally
+    skipping rows whose Year is in exclude_years."""
+    actual = resolve_path(path)
+    if actual is None:
+        return
+    ext = _ext(actual)
+    if ext == '.parquet':
+        batches = (batch.to_pandas() for batch in pq.ParquetFile(actual, memory_map=True).iter_batches())
+    elif ext in ('.feather', '.arrow'):
+        reader = pa.ipc.open_file(pa.memory_map(actual))
+        batches = (reader.get_batch(i).to_pandas() for i in range(reader.num_record_batches))
+    else:
+        batches = iter([pd.read_pickle(actual)])
+
+    for df in batches:
+        if exclude_years:
+            df = df[~df[YEAR].isin(exclude_years)]
+        if len(df):
+            yield df
+
+
+def count_parts(path=None):
+    """How many independently readable parts the processed file has: parquet
+    row groups, Arrow record batches, or 1 for a pickle. 0 if it doesn't exist."""
+    actual = resolve_path(path)
+    if actual is None:
+        return 0
+    ext = _ext(actual)
+    if ext == '.parquet':
+        return pq.ParquetFile(actual, memory_map=True).num_row_groups
+    if ext in ('.feather', '.arrow'):
+        return pa.ipc.open_file(pa.memory_map(actual)).num_record_batches
+    return 1
+
+
+def iter_part(path, part, columns=None, batch_size=ROW_GROUP_SIZE):
+    """Yield one part (see count_parts) of the processed file in frames of at
+    most batch_size rows, reading only `columns`. Lets separate processes
+    read disjoint parts of the same file without loading the rest of it."""
+    actual = resolve_path(path)
+    if actual is None:
+        raise FileNotFoundError(f'Processed data not found: {path or config.DATA_PATH}')
+    ext = _ext(actual)
+    if ext == '.parquet':
+        parquet = pq.ParquetFile(actual, memory_map=True)
+        if columns is not None:
+            names = _file_names(parquet.schema_arrow.names)
+            columns = [names.get(col, col) for col in columns]
+        for batch in parquet.iter_batches(batch_size=batch_size, row_groups=[part], columns=columns):
+            yield _canonical(batch.to_pandas())
+        return
+    if ext in ('.feather', '.arrow'):
+        batch = pa.ipc.open_file(pa.memory_map(actual)).get_batch(part)
+        if columns is not None:
+            names = _file_names(batch.schema.names)
+            batch = batch.select([names.get(col, col) for col in columns])
+        # Slicing a memory-mapped batch is zero-copy; only each slice is converted
+        for start in range(0, batch.num_rows, batch_size):
+            yield _canonical(batch.slice(start, batch_size).to_pandas())
+        return
+    df = _canonical(pd.read_pickle(actual))
+    if columns is not None:
+        df = df[columns]
+    for start in range(0, len(df), batch_size):
+        yield df.iloc[start:start + batch_size]
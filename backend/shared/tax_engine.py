@@ -0,0 +1,147 @@
+"""Vectorized progressive-bracket tax engine.
+
+Each year in ``tax_data.csv`` records only the bottom bracket (rate, upper
+limit) and the top bracket (rate, lower limit). The engine turns that into a
+three-bracket schedule per year:
+
+    [0, bottom_limit)          at the bottom rate
+    [bottom_limit, top_limit)  at the midpoint of the two rates (not in the data)
+    [top_limit, inf)           at the top rate
+
+For every bracket we precompute ``base = cumulative_tax_at_threshold -
+threshold * rate`` so liability is a single lookup plus one multiply-add:
+``tax = base[i] + income * rate[i]``. A single-year array finds its bracket
+with one ``np.searchsorted``; a mixed-year array counts the thresholds at or
+below each income for its own year, which gives the same index and avoids a
+binary search over every year's keys (~4x faster with three brackets).
+"""
+import numpy as np
+import pandas as pd
+
+from backend.shared import config
+from backend.shared.schema import BOTTOM_LIMIT, BOTTOM_RATE, TOP_LIMIT, TOP_RATE, YEAR, load_raw
+
+
+class TaxEngine:
+    def __init__(self, years, thresholds, rates):
+        """years: (n,) ints; thresholds, rates: (n, k) arrays, thresholds[:, 0] == 0,
+        rates as fractions. Arrays already sorted by year are used as given (not copied)."""
+        self.years = np.asarray(years, dtype=np.int64)
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.rates = np.asarray(rates, dtype=np.float64)
+        if (self.years[1:] < self.years[:-1]).any():
+            order = np.argsort(self.years, kind='stable')
+            self.years, self.thresholds, self.rates = self.years[order], self.thresholds[order], self.rates[order]
+        n, k = self.thresholds.shape
+
+        widths = np.diff(self.thresholds, axis=1)
+        cumulative = np.zeros((n, k))
+        cumulative[:, 1:] = np.cumsum(widths * self.rates[:, :-1], axis=1)
+        self.cumulative = cumulative
+        self._base = (cumulative - self.thresholds * self.rates).ravel()
+        self._rate = self.rates.ravel()
+        self._k = k
+
+        # Dense year -> position table; gaps use the latest earlier year,
+        # years outside the data are clamped to the first/last schedule.
+        self.min_year = int(self.years[0])
+        self.max_year = int(self.years[-1])
+        span = np.arange(self.min_year, self.max_year + 1)
+        self._position = np.searchsorted(self.years, span, side='right') - 1
+
+    @classmethod
+    def from_frame(cls, df):
+        df = df.drop_duplicates(subset=YEAR, keep='first')
+        bottom_limit = df[BOTTOM_LIMIT].to_numpy(dtype=np.float64)
+        top_limit = np.maximum(df[TOP_LIMIT].to_numpy(dtype=np.float64), bottom_limit)
+        bottom_rate = df[BOTTOM_RATE].to_numpy(dtype=np.float64) / 100
+        top_rate = df[TOP_RATE].to_numpy(dtype=np.float64) / 100
+
+        thresholds = np.column_stack((np.zeros(len(df)), bottom_limit, top_limit))
+        rates = np.column_stack((bottom_rate, (bottom_rate + top_rate) / 2, top_rate))
+        return cls(df[YEAR].to_numpy(dtype=np.int64), thresholds, rates)
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls.from_frame(load_raw(path).dropna())
+
+    def year_positions(self, year):
+        year = np.clip(np.asarray(year, dtype=np.int64), self.min_year, self.max_year)
+        return self._position[year - self.min_year]
+
+    def bracket_index(self, income, year):
+        """Flat index into the bracket tables for each (income, year)."""
+        income = np.asarray(income, dtype=np.float64)
+        positions = self.year_positions(year)
+        if positions.ndim == 0:
+            # One year for the whole array: search just that year's k thresholds
+            start = int(positions) * self._k
+            local = self.thresholds[int(positions)]
+            return start + np.searchsorted(local, income, side='right') - 1
+        idx = positions * self._k
+        for j in range(1, self._k):
+            idx += income >= self.thresholds[positions, j]
+        return idx
+
+    def liability(self, income, year):
+        """Tax owed for each income; `year` is a scalar or an array broadcastable to income."""
+        income = np.maximum(np.asarray(income, dtype=np.float64), 0.0)
+        idx = self.bracket_index(income, year)
+        tax = np.multiply(income, self._rate[idx])
+        tax += self._base[idx]
+        return tax
+
+    def sweep(self, income, years):
+        """Tax for every (year, income) pair of a grid: shape (len(years), len(income)).
+
+        Each row is one single-year evaluation, so it takes the searchsorted path.
+        """
+        income = np.asarray(income, dtype=np.float64)
+        out = np.empty((len(years), len(income)), dtype=np.float64)
+        for row, year in enumerate(years):
+            out[row] = self.liability(income, int(year))
+        return out
+
+    def marginal_rate(self, income, year):
+        income = np.maximum(np.asarray(income, dtype=np.float64), 0.0)
+        return self._rate[self.bracket_index(income, year)]
+
+    def schedule(self, year):
+        """The bracket table for one year as a DataFrame (rates in percent)."""
+        pos = int(self.year_positions(year))
+        return pd.DataFrame({
+            'Income Over': self.thresholds[pos],
+            'Rate %': self.rates[pos] * 100,
+            'Tax at Threshold': self.cumulative[pos],
+        })
+
+
+def grid_points(income_min, income_max, step):
+    """grid_size() as a float, for size checks: inf instead of OverflowError on huge ranges."""
+    return float(np.floor((income_max - income_min) / step + 1e-9)) + 1
+
+
+def grid_size(income_min, income_max, step):
+    """Number of incomes income_grid() returns for this range."""
+    return int(grid_points(income_min, income_max, step))
+
+
+def income_grid(income_min, income_max, step):
+    """income_min, income_min + step, ... up to and including income_max (when it lands on a step)."""
+    return income_min + step * np.arange(grid_size(income_min, income_max, step), dtype=np.float64)
+
+
+_engine = None
+
+
+def get_engine():
+    """The engine built from config.RAW_DATA_PATH, created on first use in each process.
+
+    Uses the published bracket tables (shared_data.py) when they match the CSV.
+    """
+    global _engine
+    if _engine is None:
+        from backend.shared.shared_data import get_shared
+        snapshot = get_shared().current('brackets', config.RAW_DATA_PATH)
+        _engine = snapshot.engine() if snapshot is not None else TaxEngine.from_csv(config.RAW_DATA_PATH)
+    return _engine
@@ -0,0 +1,190 @@
+import io
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+from backend.shared.simulation import check_distribution
+
+MISSING_FIELDS_ERROR = 'Missing required fields: income and year'
+INVALID_TYPE_ERROR = 'Invalid input type — income must be numeric, year must be integer'
+
+REQUIRED_FIELDS = ['income', 'year']
+
+# Calendar years a request may ask for; the tax engine uses the nearest year it has data for.
+# Anything wider would overflow int64 further down.
+MIN_YEAR, MAX_YEAR = 1, 9999
+# Largest |income| accepted: well beyond any filer, and far enough from the float64
+# limit that tax * 100 (rounding to cents) can't overflow to inf
+MAX_INCOME = 1e15
+
+
+class PayloadError(ValueError):
+    """Raised when a batch payload cannot be parsed at all."""
+
+
+def parse_batch_payload(body, content_type):
+    """Turn a raw request body into a two-column frame of unvalidated values.
+
+    Accepted formats:
+    - JSON array of {"income", "year"} objects
+    - columnar JSON: {"income": [...], "year": [...]}
+    - NDJSON (application/x-ndjson), one object per line
+    - CSV (text/csv) with an income and year header
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+
+    try:
+        if content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+            if not body.strip():
+                frame = pd.DataFrame(columns=REQUIRED_FIELDS)
+            else:
+                frame = pd.read_json(io.BytesIO(body), lines=True, dtype=False)
+        elif content_type == 'text/csv':
+            frame = pd.read_csv(io.BytesIO(body), dtype=str, skipinitialspace=True)
+            frame.columns = frame.columns.str.strip().str.lower()
+        else:
+            data = json.loads(body)
+            if isinstance(data, dict):
+                frame = pd.DataFrame({field: data.get(field) for field in REQUIRED_FIELDS})
+            elif isinstance(data, list):
+                frame = pd.DataFrame.from_records(data)
+            else:
+                raise PayloadError('Batch payload must be a JSON array or an object of columns')
+    except PayloadError:
+        raise
+    except (ValueError, TypeError, AttributeError, pd.errors.ParserError) as exc:
+        raise PayloadError(f'Malformed batch payload: {exc}') from exc
+
+    for field in REQUIRED_FIELDS:
+        if field not in frame.columns:
+            frame[field] = None
+    return frame[REQUIRED_FIELDS]
+
+
+def parse_scalar(income, year):
+    """Validate one income/year pair the same way validate_rows checks a row.
+
+    Returns (income, year) as float and int; raises ValueError otherwise
+    (TypeError for non-scalars is turned into ValueError too).
+    """
+    try:
+        income, year_f = float(income), float(year)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(INVALID_TYPE_ERROR) from None
+    if not abs(income) <= MAX_INCOME or not MIN_YEAR <= year_f <= MAX_YEAR or year_f != math.floor(year_f):
+        raise ValueError(INVALID_TYPE_ERROR)
+    return income, int(year_f)
+
+
+def validate_rows(frame):
+    """Validate every row in one vectorized pass.
+
+    Returns (income, year, errors) where income is float64, year is int64 and
+    errors is an object array holding None for valid rows or the same error
+    message the single-row /predict endpoint would return.
+    """
+    raw_income = frame['income'].to_numpy(dtype=object)
+    raw_year = frame['year'].to_numpy(dtype=object)
+
+    missing = pd.isna(raw_income) | pd.isna(raw_year)
+    income = pd.to_numeric(frame['income'], errors='coerce').to_numpy(dtype=np.float64, copy=True)
+    year_f = pd.to_numeric(frame['year'], errors='coerce').to_numpy(dtype=np.float64, copy=True)
+
+    # NaN fails both range checks, so non-numeric and non-finite values are caught too
+    with np.errstate(invalid='ignore'):
+        in_range = (np.abs(income) <= MAX_INCOME) & (year_f >= MIN_YEAR) & (year_f <= MAX_YEAR)
+    invalid = ~missing & (~in_range | (year_f != np.floor(year_f)))
+
+    errors = np.full(len(frame), None, dtype=object)
+    errors[missing] = MISSING_FIELDS_ERROR
+    errors[invalid] = INVALID_TYPE_ERROR
+
+    bad = missing | invalid
+    income[bad] = 0.0
+    year_f[bad] = 0.0
+    return income, year_f.astype(np.int64), errors
+
+
+SWEEP_MODES = ('model', 'engine', 'both')
+
+
+def parse_sweep(data):
+    """Validate a /predict/sweep request.
+
+    Returns (income_min, income_max, step, years, mode); raises PayloadError
+    with a message for the client on anything else.
+    """
+    if not isinstance(data, dict):
+        raise PayloadError('Sweep payload must be a JSON object')
+    if data.get('income_max') is None or data.get('step') is None or data.get('years') is None:
+        raise PayloadError('Missing required fields: income_max, step and years')
+
+    years = data['years'] if isinstance(data['years'], list) else [data['years']]
+    try:
+        income_min = float(data.get('income_min', 0))
+        income_max = float(data['income_max'])
+        step = float(data['step'])
+        years = [int(year) for year in years]
+    except (TypeError, ValueError):
+        raise PayloadError('Invalid input type — incomes and step must be numeric, years must be integers')
+
+    if not all(np.isfinite([income_min, income_max, step])) or step <= 0 or income_max < income_min:
+        raise PayloadError('Need a finite range with income_min <= income_max and step > 0')
+    if not np.isfinite(income_max - income_min):
+        raise PayloadError('Income range is too wide')
+    if not years:
+        raise PayloadError('years must not be empty')
+    if not all(MIN_YEAR <= year <= MAX_YEAR for year in years):
+        raise PayloadError(f'years must be between {MIN_YEAR} and {MAX_YEAR}')
+    mode = data.get('mode', 'model')
+    if mode not in SWEEP_MODES:
+        raise PayloadError(f"mode must be one of: {', '.join(SWEEP_MODES)}")
+    return income_min, income_max, step, years, mode
+
+
+SCENARIO_FIELDS = ('bottom_rate', 'bottom_limit', 'top_rate', 'top_limit')
+
+
+def parse_simulation(data):
+    """Validate a /simulate request.
+
+    Returns (year, scenarios, distribution, filers, seed, population) with
+    scenarios as dicts for simulation.Scenario; raises PayloadError with a
+    message for the client on anything else.
+    """
+    if not isinstance(data, dict):
+        raise PayloadError('Simulation payload must be a JSON object')
+    if data.get('year') is None or data.get('distribution') is None:
+        raise PayloadError('Missing required fields: year and distribution')
+    raw_scenarios = data.get('scenarios', [])
+    if not isinstance(raw_scenarios, list) or not all(isinstance(s, dict) for s in raw_scenarios):
+        raise PayloadError('scenarios must be a list of objects')
+
+    for raw in raw_scenarios:
+        unknown = set(raw) - set(SCENARIO_FIELDS) - {'name'}
+        if unknown:
+            raise PayloadError(f"Unknown scenario field(s): {', '.join(sorted(unknown))}")
+
+    try:
+        year = int(data['year'])
+        filers = int(data.get('filers', 1_000_000))
+        seed = int(data.get('seed', 0))
+        population = float(data['population']) if data.get('population') is not None else None
+        scenarios = [dict({field: float(raw[field]) for field in SCENARIO_FIELDS if raw.get(field) is not None},
+                          name=str(raw.get('name') or f'Scenario {i}'))
+                     for i, raw in enumerate(raw_scenarios, start=1)]
+    except (TypeError, ValueError, OverflowError):
+        raise PayloadError('Invalid input type — year, filers and seed must be integers, '
+                           'scenario rates and limits numeric')
+
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        raise PayloadError(f'year must be between {MIN_YEAR} and {MAX_YEAR}')
+    if filers < 1 or seed < 0 or (population is not None and not population > 0):
+        raise PayloadError('filers must be at least 1, seed non-negative and population positive')
+    try:
+        check_distribution(data['distribution'])
+    except ValueError as exc:
+        raise PayloadError(str(exc)) from None
+    return year, scenarios, data['distribution'], filers, seed, population
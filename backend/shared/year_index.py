@@ -0,0 +1,57 @@
+"""A dataset sorted by Year once, with O(1) per-year slices.
+
+The dashboard's year filters used ``df[df['Year'] == year]`` (a scan of every
+row on each rerun) and rebuilt ``sorted(df['Year'].unique())`` each time.
+``YearIndex`` sorts the frame by Year once (stable, so rows keep their order
+within a year; already-sorted input is not copied) and stores where each
+year's rows start and stop. A year's rows are then a positional slice: a
+zero-copy view under pandas copy-on-write, whose cost doesn't depend on how
+many rows the dataset has.
+"""
+import numpy as np
+
+from backend.shared.schema import YEAR
+
+ALL = 'All'
+
+
+class YearIndex:
+    def __init__(self, df):
+        years = df[YEAR].to_numpy()
+        if len(years) and not (years[1:] >= years[:-1]).all():
+            order = np.argsort(years, kind='stable')
+            df = df.take(order).reset_index(drop=True)
+            years = years[order]
+        self._frame = df
+        starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]]) if len(years) else np.array([], dtype=int)
+        stops = np.r_[starts[1:], len(years)]
+        self.years = [int(year) for year in years[starts]]
+        self._offsets = dict(zip(self.years, zip(starts.tolist(), stops.tolist())))
+
+    @property
+    def frame(self):
+        """The whole dataset, sorted by Year (a shallow copy, safe to add columns to)."""
+        return self._frame.copy(deep=False)
+
+    def __len__(self):
+        return len(self._frame)
+
+    def __contains__(self, year):
+        return year in self._offsets
+
+    def offsets(self, year):
+        """(start, stop) row positions of `year`; (0, 0) if it has no rows."""
+        return self._offsets.get(int(year), (0, 0))
+
+    def year(self, year):
+        """The rows of one year as a view (empty frame for an unknown year)."""
+        start, stop = self.offsets(year)
+        return self._frame.iloc[start:stop]
+
+    def select(self, year):
+        """What the year filters want: every row for ``'All'``, else that year's rows."""
+        return self.frame if year == ALL else self.year(year)
+
+    def counts(self):
+        """{year: row count}"""
+        return {year: stop - start for year, (start, stop) in self._offsets.items()}
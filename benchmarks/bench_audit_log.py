@@ -0,0 +1,103 @@
+"""Overhead of the prediction audit log (backend/shared/audit_log.py).
+
+    python benchmarks/bench_audit_log.py [--requests 200000] [--budget-us 5]
+
+1. Micro: what /predict adds per request (one AuditLog.record, buffering a
+   row for the writer thread) timed in a tight loop, against an empty loop.
+   Exits with status 1 when this is over --budget-us.
+2. Writer: how fast the background thread drains the buffer into SQLite
+   (rows/s, rows per transaction).
+3. End to end: /predict through the Flask test client (cache hits) with the
+   audit log on and off, alternating rounds, printed for reference.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from backend.shared.audit_log import AuditLog
+
+
+def recorded(log, n):
+    for i in range(n):
+        log.record('predict', 50000.0, 2020, 1234.5, 'v1', 0.25, False)
+
+
+def bare(n):
+    for i in range(n):
+        pass
+
+
+def best_of(fn, *args, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def micro_overhead_us(n, tmp):
+    # Room for every row of every repeat, so nothing is dropped while we time
+    log = AuditLog(os.path.join(tmp, 'micro.db'), maxsize=6 * n)
+    overhead = (best_of(recorded, log, n) - best_of(bare, n)) / n * 1e6
+    log.close()
+    return overhead, log.stats()
+
+
+def writer_rows_per_second(n, tmp):
+    log = AuditLog(os.path.join(tmp, 'writer.db'), maxsize=n, flush_interval=60)
+    recorded(log, n)
+    start = time.perf_counter()
+    log.flush(timeout=600)
+    elapsed = time.perf_counter() - start
+    stats = log.stats()
+    log.close()
+    return stats['written'] / elapsed, stats['written'] / max(stats['batches'], 1)
+
+
+def end_to_end_us(n, tmp, rounds=5):
+    from backend import flask_api
+    client = flask_api.app.test_client()
+    real = flask_api.audit
+    log = AuditLog(os.path.join(tmp, 'api.db'))
+    body = {'income': 50000, 'year': 2020}
+    # Nothing goes to the real DATABASE_URL, warm-up included
+    flask_api.audit = None
+    client.post('/predict', json=body)
+
+    def run():
+        for _ in range(n):
+            client.post('/predict', json=body)
+
+    timings = {'on': [], 'off': []}
+    try:
+        for _ in range(rounds):
+            for label, audit in (('on', log), ('off', None)):
+                flask_api.audit = audit
+                timings[label].append(best_of(run, repeat=1) / n * 1e6)
+    finally:
+        flask_api.audit = real
+        log.close()
+    return min(timings['on']), min(timings['off'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure the prediction audit log overhead.')
+    parser.add_argument('--requests', type=int, default=200000, help='iterations of the micro benchmark')
+    parser.add_argument('--http-requests', type=int, default=2000, help='/predict calls per end-to-end round')
+    parser.add_argument('--budget-us', type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        overhead, stats = micro_overhead_us(args.requests, tmp)
+        print(f"audit record per request: {overhead:.2f} µs (budget {args.budget_us:.1f} µs), "
+              f"{stats['written']:,} rows written, {stats['dropped']:,} dropped")
+        rate, per_batch = writer_rows_per_second(args.requests, tmp)
+        print(f"writer: {rate:,.0f} rows/s, {per_batch:,.0f} rows per transaction")
+        on, off = end_to_end_us(args.http_requests, tmp)
+        print(f"/predict end to end: {on:.1f} µs with audit log, {off:.1f} µs without ({on - off:+.1f} µs)")
+    sys.exit(0 if overhead <= args.budget_us else 1)
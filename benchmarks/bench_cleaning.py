@@ -0,0 +1,59 @@
+"""Compare the old per-column regex cleanup with backend/shared/schema.py.
+
+    python benchmarks/bench_cleaning.py --rows 3000000
+
+Builds a synthetic ;-delimited file by repeating data/raw/tax_data.csv, then
+times reading + cleaning it both ways and checks they agree.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.shared import schema
+from benchmarks.synthetic import make_synthetic_csv
+
+
+def regex_path(path):
+    """What frontend/streamlit_app/app.py used to do on every rerun."""
+    df = pd.read_csv(path, delimiter=';')
+    df.columns = df.columns.str.strip()
+    for col in schema.NUMERIC_COLUMNS:
+        df[col] = (
+            df[col]
+            .astype(str)
+            .str.replace(r"[^\d.\-]", "", regex=True)
+            .replace("", pd.NA)
+            .astype(float)
+        )
+    return df
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic_tax_data.csv')
+        rows = make_synthetic_csv(path, args.rows)
+
+        old, old_s = timed(regex_path, path)
+        new, new_s = timed(schema.load_raw, path)
+
+    assert np.allclose(old[schema.NUMERIC_COLUMNS].to_numpy(), new[schema.NUMERIC_COLUMNS].to_numpy(), equal_nan=True)
+    print(f"rows: {rows:,}")
+    print(f"regex path : {old_s:7.2f}s ({rows / old_s:,.0f} rows/s)")
+    print(f"schema path: {new_s:7.2f}s ({rows / new_s:,.0f} rows/s)")
+    print(f"speedup    : {old_s / new_s:.1f}x")
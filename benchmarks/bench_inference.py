@@ -0,0 +1,81 @@
+"""Compare sklearn models with their compact NumPy export (backend/shared/compact_model.py).
+
+    python benchmarks/bench_inference.py --rows 100000
+    python benchmarks/bench_inference.py --model models/model.pkl
+
+Without --model, fits the two models the training scripts produce (a
+100-tree RandomForest and a LinearRegression on the raw data). For each,
+times loading, single-row predict (the /predict path) and batch predict, and
+checks the two predictors agree.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.shared import compact_model, config
+from backend.shared.schema import FEATURES, TARGET, load_raw
+
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times), float(np.median(times))
+
+
+def bench(name, model_path, rows, repeats):
+    _, load_pickle = best_of(lambda: joblib.load(model_path), 5)
+    _, load_compact = best_of(lambda: compact_model.load(compact_model.compact_path(model_path)), 5)
+    model = joblib.load(model_path)
+    compact = compact_model.load(compact_model.compact_path(model_path))
+
+    rng = np.random.default_rng(0)
+    batch = np.column_stack((rng.integers(1913, 2021, rows), rng.uniform(0, 1e6, rows)))
+    one = batch[:1]
+
+    _, single_sklearn = best_of(lambda: model.predict(one), repeats)
+    _, single_compact = best_of(lambda: compact.predict(one), repeats)
+    batch_sklearn, _ = best_of(lambda: model.predict(batch), 3)
+    batch_compact, _ = best_of(lambda: compact.predict(batch), 3)
+    diff = np.abs(model.predict(batch) - compact.predict(batch)).max()
+
+    print(f"\n{name} ({os.path.getsize(model_path) / 1e6:.1f} MB pickle)")
+    print(f"  load                 joblib {load_pickle * 1e3:9.2f} ms | compact {load_compact * 1e3:9.2f} ms "
+          f"({load_pickle / load_compact:.0f}x)")
+    print(f"  predict 1 row        sklearn {single_sklearn * 1e6:8.0f} us | compact {single_compact * 1e6:8.0f} us "
+          f"({single_sklearn / single_compact:.0f}x)")
+    print(f"  predict {rows:,} rows sklearn {rows / batch_sklearn:10,.0f}/s | compact {rows / batch_compact:10,.0f}/s "
+          f"({batch_sklearn / batch_compact:.1f}x)")
+    print(f"  max abs difference   {diff:.2e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', help='existing model.pkl (its export is created if missing)')
+    parser.add_argument('--rows', type=int, default=100_000, help='rows in the batch benchmark')
+    parser.add_argument('--repeats', type=int, default=200, help='single-row predict calls to time')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.model:
+            if compact_model.load(compact_model.compact_path(args.model)) is None:
+                compact_model.export(joblib.load(args.model), compact_model.compact_path(args.model))
+            bench(os.path.basename(args.model), args.model, args.rows, args.repeats)
+        else:
+            df = load_raw(config.RAW_DATA_PATH)[FEATURES + [TARGET]].dropna()
+            X, y = df[FEATURES].to_numpy(), df[TARGET].to_numpy()
+            for name, model in (('RandomForestRegressor(n_estimators=100)', RandomForestRegressor(100, random_state=42)),
+                                ('LinearRegression', LinearRegression())):
+                path = os.path.join(tmp, f'{type(model).__name__}.pkl')
+                compact_model.save_model(model.fit(X, y), path)
+                bench(name, path, args.rows, args.repeats)
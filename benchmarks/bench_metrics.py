@@ -0,0 +1,99 @@
+"""Overhead of the /predict instrumentation (backend/shared/metrics.py).
+
+    python benchmarks/bench_metrics.py [--requests 200000] [--budget-us 5]
+
+1. Micro: what /predict adds per request (perf_counter calls, the stage
+   tuple, one observe including its share of the batched bucketing) timed in
+   a tight loop, against an empty loop. Exits with status 1 when this is over
+   --budget-us.
+2. End to end: /predict through the Flask test client (cache hits) with the
+   real histogram and with a no-op one, alternating rounds. The difference
+   is within the noise of a request that takes hundreds of µs; it is printed
+   for reference.
+"""
+import argparse
+import os
+import sys
+import time
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from backend.shared import metrics
+
+NAN = float('nan')
+
+
+class NullHistogram:
+    def observe(self, row):
+        pass
+
+
+def instrumented(histogram, n):
+    for _ in range(n):
+        start = perf_counter()
+        parsed = perf_counter()
+        validated = perf_counter()
+        looked_up = scored = perf_counter()
+        model_seconds = NAN
+        done = perf_counter()
+        histogram.observe((parsed - start, validated - parsed, looked_up - validated, model_seconds,
+                           done - scored, done - start))
+
+
+def bare(n):
+    for _ in range(n):
+        pass
+
+
+def best_of(fn, *args, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def micro_overhead_us(n):
+    histogram = metrics.Histogram('bench_seconds', 'bench', 'stage',
+                                  ('parse', 'validate', 'cache', 'model', 'serialize', 'total'))
+    return (best_of(instrumented, histogram, n) - best_of(bare, n)) / n * 1e6
+
+
+def end_to_end_us(n, rounds=5):
+    from backend import flask_api
+    client = flask_api.app.test_client()
+    real, audit = flask_api.predict_seconds, flask_api.audit
+    # Metrics only: don't write audit rows into DATABASE_URL (bench_audit_log.py measures those)
+    flask_api.audit = None
+    body = {'income': 50000, 'year': 2020}
+    client.post('/predict', json=body)
+
+    def run():
+        for _ in range(n):
+            client.post('/predict', json=body)
+
+    timings = {'on': [], 'off': []}
+    try:
+        for _ in range(rounds):
+            for label, histogram in (('on', real), ('off', NullHistogram())):
+                flask_api.predict_seconds = histogram
+                timings[label].append(best_of(run, repeat=1) / n * 1e6)
+    finally:
+        flask_api.predict_seconds, flask_api.audit = real, audit
+    return min(timings['on']), min(timings['off'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure the /predict instrumentation overhead.')
+    parser.add_argument('--requests', type=int, default=200000, help='iterations of the micro benchmark')
+    parser.add_argument('--http-requests', type=int, default=2000, help='/predict calls per end-to-end round')
+    parser.add_argument('--budget-us', type=float, default=5.0)
+    args = parser.parse_args()
+
+    overhead = micro_overhead_us(args.requests)
+    print(f"instrumentation per request: {overhead:.2f} µs (budget {args.budget_us:.1f} µs)")
+    on, off = end_to_end_us(args.http_requests)
+    print(f"/predict end to end: {on:.1f} µs with metrics, {off:.1f} µs without ({on - off:+.1f} µs)")
+    sys.exit(0 if overhead <= args.budget_us else 1)
@@ -0,0 +1,90 @@
+"""Memory of N processes reading the processed dataset privately vs attaching it shared.
+
+    python benchmarks/bench_shared_data.py [--rows 2000000] [--workers 4]
+
+Writes a synthetic processed file and publishes it (backend/shared/shared_data.py),
+then starts --workers fresh processes per mode that each load the whole
+dataset and touch every column:
+
+- private: storage.read_processed (what every session/worker did before);
+- shared:  shared_data.Snapshot(...).frame(), zero-copy views of one mapping.
+
+While all workers of a mode are alive, each reports how much its RSS grew
+and its proportional set size (PSS, shared pages split between the
+processes mapping them) from /proc/self/smaps_rollup, so Linux only. The
+summed PSS growth is what the machine actually pays: ~N copies for private,
+~one copy for shared.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _memory_mb():
+    fields = {}
+    with open('/proc/self/smaps_rollup') as fh:
+        for line in fh:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return fields['Rss'], fields['Pss']
+
+
+def _worker(mode, data_path, shared_path, barrier, results):
+    from backend.shared import shared_data, storage
+    before = _memory_mb()
+    if mode == 'private':
+        df = storage.read_processed(data_path)
+    else:
+        df = shared_data.Snapshot(shared_path).frame()
+    total = sum(float(df[column].sum()) for column in df.columns)
+    barrier.wait()
+    after = _memory_mb()
+    results.put((after[0] - before[0], after[1] - before[1], total))
+    barrier.wait()
+
+
+def measure(mode, workers, data_path, shared_path):
+    """[(RSS growth MB, PSS growth MB, checksum)] for each worker of one mode."""
+    ctx = multiprocessing.get_context('spawn')
+    barrier, results = ctx.Barrier(workers), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, data_path, shared_path, barrier, results))
+             for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    out = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    return out
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare per-process memory of private vs shared dataset loads.')
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    from backend.shared import config, schema, shared_data, storage
+    from benchmarks.synthetic import make_synthetic_csv
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'tax.csv')
+        data_path = os.path.join(tmp, 'processed.parquet')
+        shared_path = os.path.join(tmp, 'shared_data.bin')
+        make_synthetic_csv(csv_path, args.rows)
+        storage.write_processed(schema.load_raw(csv_path), data_path)
+        header = shared_data.publish(shared_path, data_path, config.RAW_DATA_PATH)
+        print(f"{header['rows']:,} rows, {os.path.getsize(shared_path) / 2 ** 20:,.1f} MB published")
+
+        for mode in ('private', 'shared'):
+            rows = measure(mode, args.workers, data_path, shared_path)
+            rss = sum(row[0] for row in rows)
+            pss = sum(row[1] for row in rows)
+            assert len({round(row[2], 3) for row in rows}) == 1
+            print(f"{mode:8} {args.workers} workers: RSS +{rss:8,.1f} MB total, PSS +{pss:8,.1f} MB total "
+                  f"({pss / args.workers:,.1f} MB per worker)")
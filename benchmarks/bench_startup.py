@@ -0,0 +1,136 @@
+"""Cold-start import time of the API and the dashboard pages.
+
+    python benchmarks/bench_startup.py                     # measure and report
+    python benchmarks/bench_startup.py --save-baseline     # record benchmarks/results/startup_baseline.json
+    python benchmarks/bench_startup.py --baseline benchmarks/results/startup_baseline.json
+
+Each target runs in a fresh interpreter under ``python -X importtime``; the
+reported time is the sum of the top-level imports' cumulative times (best of
+--repeat), so it counts imports only, not data loading or page rendering.
+The dashboard targets run the Streamlit scripts in bare mode.
+
+Exits with status 1 when a target imports a module it should not need (e.g.
+sklearn on the Home page; see FORBIDDEN) or, with --baseline, when its
+import time grew by more than --threshold.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join('frontend', 'streamlit_app')
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'results', 'startup_baseline.json')
+
+
+def _page(path):
+    # st.stop() and missing files end a bare-mode run early; the imports are done by then
+    return (f"import runpy, sys; sys.path.insert(0, {APP_DIR!r})\n"
+            f"try:\n    runpy.run_path({path!r})\nexcept BaseException:\n    pass")
+
+
+TARGETS = {
+    'api': 'import backend.flask_api',
+    'dashboard': _page(os.path.join(APP_DIR, 'app.py')),
+    'page.data_exploration': _page(os.path.join(APP_DIR, 'pages', 'data_exploration.py')),
+    'page.tax_trends': _page(os.path.join(APP_DIR, 'pages', 'tax_trends.py')),
+    'page.ml_predictions': _page(os.path.join(APP_DIR, 'pages', 'ml_predictions.py')),
+    'page.scenario_simulator': _page(os.path.join(APP_DIR, 'pages', 'scenario_simulator.py')),
+    'page.model_evaluation': _page(os.path.join(APP_DIR, 'pages', 'model_evaluation.py')),
+}
+
+# Heavy packages each target must not import at start-up
+FORBIDDEN = {
+    'api': ('sklearn', 'joblib', 'requests'),
+    'dashboard': ('sklearn', 'joblib', 'requests'),
+    'page.data_exploration': ('sklearn', 'joblib', 'requests'),
+    'page.tax_trends': ('sklearn', 'joblib', 'requests'),
+    'page.ml_predictions': ('sklearn', 'joblib'),
+    'page.scenario_simulator': ('sklearn', 'joblib', 'requests'),
+    'page.model_evaluation': ('sklearn', 'joblib', 'requests'),
+}
+
+
+def parse_importtime(stderr):
+    """(total µs of top-level imports, {module: cumulative µs}) from -X importtime output."""
+    total, modules = 0, {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        depth = len(name) - len(name.lstrip(' '))
+        name = name.strip()
+        modules[name] = int(cumulative)
+        if depth <= 1:
+            total += int(cumulative)
+    return total, modules
+
+
+def measure(target, repeat=3):
+    """Best-of-repeat import profile of one target: (total µs, modules)."""
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', TARGETS[target]], cwd=ROOT,
+                              capture_output=True, text=True,
+                              env=dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='1'))
+        result = parse_importtime(proc.stderr)
+        if best is None or result[0] < best[0]:
+            best = result
+    return best
+
+
+def heaviest(modules, count=5):
+    """Top-level third-party packages by cumulative import time."""
+    top = {}
+    for name, us in modules.items():
+        root = name.split('.')[0]
+        top[root] = max(top.get(root, 0), us)
+    return sorted(top.items(), key=lambda item: -item[1])[:count]
+
+
+def run(targets, repeat=3, log=print):
+    results = {}
+    for target in targets:
+        total, modules = measure(target, repeat)
+        imported = sorted(name for name in FORBIDDEN.get(target, ()) if name in modules)
+        results[target] = {'import_ms': total / 1e3, 'modules': len(modules), 'forbidden': imported,
+                           'heaviest': {name: us / 1e3 for name, us in heaviest(modules)}}
+        flag = f"  FORBIDDEN: {', '.join(imported)}" if imported else ''
+        log(f"{target:24} {total / 1e3:9.1f} ms {len(modules):6d} modules{flag}")
+        log('    ' + ', '.join(f'{name} {ms:.0f} ms' for name, ms in results[target]['heaviest'].items()))
+    return results
+
+
+def regressions(results, baseline, threshold):
+    """Targets whose import time grew past threshold x the baseline."""
+    return {target: result['import_ms'] / baseline[target]['import_ms'] for target, result in results.items()
+            if target in baseline and result['import_ms'] > threshold * baseline[target]['import_ms']}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure cold-start import time of the API and dashboard.')
+    parser.add_argument('--targets', nargs='+', default=list(TARGETS), choices=list(TARGETS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', help='fail if slower than this saved run by more than --threshold')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, help='write results here')
+    args = parser.parse_args()
+
+    results = run(args.targets, args.repeat)
+    failed = any(result['forbidden'] for result in results.values())
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            slower = regressions(results, json.load(fh), args.threshold)
+        for target, ratio in slower.items():
+            print(f"REGRESSION {target}: {ratio:.2f}x the baseline import time")
+        failed = failed or bool(slower)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Saved to {args.save_baseline}")
+
+    sys.exit(1 if failed else 0)
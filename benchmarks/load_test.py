@@ -0,0 +1,134 @@
+"""Load-test /predict under gunicorn at different worker/thread settings.
+
+    python benchmarks/load_test.py --workers 1 2 4 --threads 1 4 --requests 5000 --concurrency 16
+    python benchmarks/load_test.py --url http://localhost:5000 --requests 2000
+
+For each (workers, threads) pair this starts gunicorn with
+backend/gunicorn_conf.py on a free port, waits for it to answer, sends a
+warm-up round and then --requests POSTs to /predict from --concurrency client
+threads (each with its own keep-alive session), and reports req/s and
+p50/p90/p99 latency. With --url it load-tests an already running server once.
+
+Incomes are drawn at random to a cent, so almost every request misses the
+result cache; --cached repeats one (income, year) to measure the cache-hit path.
+--json writes all results to a file.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, threads, port):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads),
+               GUNICORN_BIND=f'127.0.0.1:{port}', GUNICORN_LOGLEVEL='warning')
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'backend/gunicorn_conf.py',
+                             'backend.flask_api:app'], cwd=ROOT, env=env)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with code {proc.returncode}')
+        try:
+            requests.get(url + '/', timeout=1)
+            return proc, url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError('gunicorn did not start within 60s')
+
+
+def payloads(count, cached, seed=0):
+    if cached:
+        return [{'income': 50000.0, 'year': 2020}] * count
+    rng = np.random.default_rng(seed)
+    incomes = np.round(rng.uniform(0, 1e6, count), 2)
+    years = rng.integers(1913, 2021, count)
+    return [{'income': float(i), 'year': int(y)} for i, y in zip(incomes, years)]
+
+
+def run_load(url, bodies, concurrency):
+    """POST every body to url/predict from `concurrency` threads; returns (latencies s, errors, wall s)."""
+    latencies = np.empty(len(bodies))
+    errors = [0] * concurrency
+    next_index = iter(range(len(bodies)))
+    lock = threading.Lock()
+
+    def client(slot):
+        session = requests.Session()
+        while True:
+            with lock:
+                i = next(next_index, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            try:
+                ok = session.post(url + '/predict', json=bodies[i], timeout=10).status_code == 200
+            except requests.RequestException:
+                ok = False
+            latencies[i] = time.perf_counter() - start
+            errors[slot] += not ok
+
+    threads = [threading.Thread(target=client, args=(slot,)) for slot in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors), time.perf_counter() - start
+
+
+def measure(url, args, label):
+    run_load(url, payloads(min(200, args.requests), args.cached, seed=1), args.concurrency)  # warm-up
+    latencies, errors, wall = run_load(url, payloads(args.requests, args.cached), args.concurrency)
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1e3
+    result = dict(label, requests=args.requests, concurrency=args.concurrency, errors=errors,
+                  req_per_s=args.requests / wall, p50_ms=p50, p90_ms=p90, p99_ms=p99)
+    print(f"{label.get('workers', '-')!s:>7} {label.get('threads', '-')!s:>7} {result['req_per_s']:10,.0f} "
+          f"{p50:8.2f} {p90:8.2f} {p99:8.2f} {errors:7d}")
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load-test /predict under gunicorn.')
+    parser.add_argument('--url', help='test this running server instead of starting gunicorn')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16, help='client threads')
+    parser.add_argument('--cached', action='store_true', help='repeat one request (result-cache hits)')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'threads':>7} {'req/s':>10} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    results = []
+    if args.url:
+        results.append(measure(args.url.rstrip('/'), args, {}))
+    else:
+        for workers in args.workers:
+            for threads in args.threads:
+                proc, url = start_server(workers, threads, free_port())
+                try:
+                    results.append(measure(url, args, {'workers': workers, 'threads': threads}))
+                finally:
+                    proc.terminate()
+                    proc.wait(timeout=30)
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
@@ -0,0 +1,319 @@
+"""Benchmark suite: ingestion, cleaning, aggregates, training and inference.
+
+    python benchmarks/run_suite.py                          # 10^2 .. 10^6 rows
+    python benchmarks/run_suite.py --max-rows 10000000      # up to 10^7
+    python benchmarks/run_suite.py --only predict fit --repeat 5
+    python benchmarks/run_suite.py --compare benchmarks/results/<old commit>.json
+
+Every sized benchmark runs on synthetic copies of data/raw/tax_data.csv
+(benchmarks/synthetic.py) at each size up to its own cap (a 100-tree forest
+is not fitted on 10^7 rows). Each timing is the best/median/mean of --repeat
+runs after setup; setup (writing the CSV, loading frames) is not timed.
+
+Results go to benchmarks/results/<commit>.json (commit, machine, per-benchmark
+timings). --compare prints current/baseline median ratios and exits with
+status 1 if any benchmark got slower than --threshold, so it can gate CI.
+
+/predict benchmarks go through the Flask test client with a freshly trained
+RandomForest served by the compact NumPy export (as in production) and the
+result cache disabled, so they measure scoring, not cache hits. filter.*
+select one year's rows at a time, with a boolean mask (the old way) and with
+backend/shared/year_index.py. evaluate.* score that model on a processed
+parquet file with backend/shared/evaluation.py, inline and on every core.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from backend.shared import compact_model, evaluation, schema, storage
+from backend.shared.aggregates import build_aggregates
+from backend.shared.schema import FEATURES, TARGET, YEAR
+from backend.shared.year_index import YearIndex
+from benchmarks.synthetic import make_synthetic_csv
+
+DEFAULT_SIZES = [10 ** k for k in range(2, 7)]
+SINGLE_REQUESTS = 200
+FILTER_SELECTIONS = 100
+
+# sized: runs once per data size up to max_rows; otherwise once per suite.
+# setup(ctx, rows) -> args for run(*args); ops: operations per run (per-op time is reported)
+Benchmark = namedtuple('Benchmark', 'name sized max_rows setup run ops')
+
+
+class Context:
+    """Per-suite scratch space: synthetic CSVs and frames are built once per size."""
+
+    def __init__(self, tmp):
+        self.tmp = tmp
+        self._csv = {}
+        self._frames = {}
+        self._client = None
+        self._restore = None
+
+    def csv(self, rows):
+        if rows not in self._csv:
+            path = os.path.join(self.tmp, f'tax_{rows}.csv')
+            make_synthetic_csv(path, rows)
+            self._csv[rows] = path
+        return self._csv[rows]
+
+    def frame(self, rows):
+        if rows not in self._frames:
+            self._frames[rows] = schema.load_raw(self.csv(rows))
+        return self._frames[rows]
+
+    def model_path(self):
+        path = os.path.join(self.tmp, 'model.pkl')
+        if not os.path.exists(path):
+            from sklearn.ensemble import RandomForestRegressor
+            df = self.frame(10 ** 4).dropna()
+            model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
+            model.fit(df[FEATURES].to_numpy(), df[TARGET].to_numpy())
+            compact_model.save_model(model.set_params(n_jobs=1), path)
+        return path
+
+    def client(self):
+        if self._client is None:
+            from backend import flask_api
+            from backend.shared.model_registry import ModelRegistry
+            self._restore = (flask_api, flask_api.registry, flask_api.cache, flask_api.audit)
+            flask_api.registry = ModelRegistry(self.model_path(), reload_interval=3600)
+            flask_api.registry.load()
+            # Measure the request path alone: no result cache, no audit rows written to DATABASE_URL
+            flask_api.cache = None
+            flask_api.audit = None
+            self._client = flask_api.app.test_client()
+        return self._client
+
+    def close(self):
+        if self._restore is not None:
+            flask_api, flask_api.registry, flask_api.cache, flask_api.audit = self._restore
+
+
+def _ingest(ctx, rows):
+    return ctx.csv(rows), os.path.join(ctx.tmp, f'processed_{rows}.parquet')
+
+
+def _run_pipeline(src, dst):
+    from scripts import data_pipeline
+    with contextlib.redirect_stdout(io.StringIO()):
+        data_pipeline.run([src], dst)
+
+
+def _raw_strings(ctx, rows):
+    return (pd.read_csv(ctx.csv(rows), sep=schema.DELIMITER, usecols=range(len(schema.COLUMNS)), dtype=str,
+                        keep_default_na=False),)
+
+
+def _year_filter(ctx, rows):
+    df = ctx.frame(rows)
+    years = sorted(df[YEAR].unique().tolist())
+    return df, YearIndex(df), [years[i % len(years)] for i in range(FILTER_SELECTIONS)]
+
+
+def _filter_by_mask(df, index, years):
+    for year in years:
+        df[df[YEAR] == year]
+
+
+def _filter_by_index(df, index, years):
+    for year in years:
+        index.year(year)
+
+
+def _fit(family):
+    def setup(ctx, rows):
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.linear_model import LinearRegression
+        model = LinearRegression() if family == 'linear' else RandomForestRegressor(100, random_state=42, n_jobs=-1)
+        df = ctx.frame(rows).dropna()
+        return model, df[FEATURES].to_numpy(), df[TARGET].to_numpy()
+    return setup
+
+
+def _single_requests(ctx, rows):
+    rng = np.random.default_rng(0)
+    bodies = [{'income': float(i), 'year': int(y)}
+              for i, y in zip(np.round(rng.uniform(0, 1e6, SINGLE_REQUESTS), 2), rng.integers(1913, 2021, SINGLE_REQUESTS))]
+    return ctx.client(), bodies
+
+
+def _post_each(client, bodies):
+    for body in bodies:
+        assert client.post('/predict', json=body).status_code == 200
+
+
+def _batch_request(ctx, rows):
+    rng = np.random.default_rng(0)
+    payload = json.dumps({'income': np.round(rng.uniform(0, 1e6, rows), 2).tolist(),
+                          'year': rng.integers(1913, 2021, rows).tolist()})
+    return ctx.client(), payload
+
+
+def _post_batch(client, payload):
+    assert client.post('/predict/batch', data=payload, content_type='application/json').status_code == 200
+
+
+def _evaluation(jobs):
+    def setup(ctx, rows):
+        path = os.path.join(ctx.tmp, f'evaluate_{rows}.parquet')
+        if not os.path.exists(path):
+            storage.write_processed(ctx.frame(rows), path)
+        return ctx.model_path(), path, jobs
+    return setup
+
+
+def _evaluate(model_path, data_path, jobs):
+    evaluation.evaluate(model_path, data_path, jobs=jobs)
+
+
+def _load_pickle(ctx, rows):
+    return ctx.model_path(),
+
+
+def _joblib_load(path):
+    import joblib
+    return joblib.load(path)
+
+
+def _load_compact(ctx, rows):
+    return compact_model.compact_path(ctx.model_path()),
+
+
+BENCHMARKS = [
+    Benchmark('ingest.data_pipeline', True, 10 ** 7, _ingest, _run_pipeline, 1),
+    Benchmark('clean.load_raw', True, 10 ** 7, lambda ctx, rows: (ctx.csv(rows),), schema.load_raw, 1),
+    Benchmark('clean.clean_frame', True, 10 ** 7, _raw_strings, schema.clean_frame, 1),
+    Benchmark('aggregates.build', True, 10 ** 7, lambda ctx, rows: (ctx.frame(rows),), build_aggregates, 1),
+    Benchmark('filter.year_mask', True, 10 ** 7, _year_filter, _filter_by_mask, FILTER_SELECTIONS),
+    Benchmark('filter.year_index', True, 10 ** 7, _year_filter, _filter_by_index, FILTER_SELECTIONS),
+    Benchmark('fit.linear', True, 10 ** 7, _fit('linear'), lambda model, X, y: model.fit(X, y), 1),
+    Benchmark('fit.random_forest', True, 10 ** 5, _fit('random_forest'), lambda model, X, y: model.fit(X, y), 1),
+    Benchmark('predict.single', False, None, _single_requests, _post_each, SINGLE_REQUESTS),
+    Benchmark('predict.batch', True, 10 ** 6, _batch_request, _post_batch, 1),
+    Benchmark('evaluate.inline', True, 10 ** 7, _evaluation(1), _evaluate, 1),
+    Benchmark('evaluate.parallel', True, 10 ** 7, _evaluation(None), _evaluate, 1),
+    Benchmark('model.load_pickle', False, None, _load_pickle, _joblib_load, 1),
+    Benchmark('model.load_compact', False, None, _load_compact, compact_model.load, 1),
+]
+
+
+def _time(run, args, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_suite(sizes=None, repeat=3, only=None, log=print):
+    """Run every selected benchmark; returns the list of result dicts."""
+    sizes = sorted(sizes or DEFAULT_SIZES)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = Context(tmp)
+        try:
+            for bench in BENCHMARKS:
+                if only and not any(pattern in bench.name for pattern in only):
+                    continue
+                for rows in ([n for n in sizes if n <= bench.max_rows] if bench.sized else [None]):
+                    results.append(_measure(bench, ctx, rows, repeat, log))
+        finally:
+            ctx.close()
+    return results
+
+
+def _measure(bench, ctx, rows, repeat, log):
+    args = bench.setup(ctx, rows)
+    times = _time(bench.run, args, repeat)
+    best = min(times)
+    result = {'name': bench.name, 'rows': rows, 'repeat': repeat, 'min_s': best,
+              'median_s': float(np.median(times)), 'mean_s': float(np.mean(times))}
+    if rows:
+        result['rows_per_s'] = rows / best
+    if bench.ops > 1:
+        result['per_op_ms'] = 1e3 * best / bench.ops
+    detail = f"{result['rows_per_s']:14,.0f} rows/s" if rows else f"{1e3 * best / bench.ops:11.3f} ms/op"
+    log(f"{bench.name:22} {rows or '-':>10} {best * 1e3:12.2f} ms {detail}")
+    return result
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results):
+    return {
+        'commit': _git('rev-parse', '--short', 'HEAD') or 'unknown',
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'versions': {name: __import__(name).__version__ for name in ('numpy', 'pandas', 'sklearn', 'pyarrow')},
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=1.25, log=print):
+    """Print median-time ratios against a baseline report; returns the regressions."""
+    old = {(r['name'], r['rows']): r['median_s'] for r in baseline['results']}
+    regressions = []
+    log(f"\nvs {baseline['commit']} (ratio = now / before; > {threshold} is a regression)")
+    for result in current['results']:
+        key = (result['name'], result['rows'])
+        if key not in old:
+            continue
+        ratio = result['median_s'] / old[key]
+        flag = 'REGRESSION' if ratio > threshold else ''
+        log(f"{result['name']:22} {result['rows'] or '-':>10} {ratio:8.2f}x {flag}")
+        if flag:
+            regressions.append(dict(result, ratio=ratio))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the benchmark suite and save the results as JSON.')
+    parser.add_argument('--sizes', type=int, nargs='+', help='data sizes in rows (default 10^2 .. 10^6)')
+    parser.add_argument('--max-rows', type=int, help='use every power of ten from 10^2 up to this')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', help='run benchmarks whose name contains any of these')
+    parser.add_argument('--output', help='results file (default benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='baseline results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio counted as a regression')
+    args = parser.parse_args()
+
+    sizes = args.sizes
+    if args.max_rows:
+        sizes = [10 ** k for k in range(2, int(np.log10(args.max_rows)) + 1)]
+
+    print(f"{'benchmark':22} {'rows':>10} {'best':>15}")
+    current = report(run_suite(sizes, args.repeat, args.only))
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"{current['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as fh:
+        json.dump(current, fh, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(current, json.load(fh), args.threshold)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,25 @@
+"""Synthetic raw tax data at any size, for the benchmarks.
+
+Repeats the body of data/raw/tax_data.csv (keeping its quirks: BOM header,
+non-breaking spaces in the rates, trailing ';;') until the file has the
+requested number of rows, so the cleaning code sees real-looking input.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.shared import config
+
+
+def make_synthetic_csv(path, rows):
+    """Write exactly `rows` data rows to path. Returns the row count."""
+    with open(config.RAW_DATA_PATH, encoding='utf-8-sig') as fh:
+        header, *body = fh.read().splitlines()
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write(header + '\n')
+        block = '\n'.join(body) + '\n'
+        for _ in range(rows // len(body)):
+            fh.write(block)
+        if rows % len(body):
+            fh.write('\n'.join(body[:rows % len(body)]) + '\n')
+    return rows
@@ -1,5 +1,9 @@
+from io import StringIO
+
 import pandas as pd
-import os
+
+from backend.shared.schema import clean_frame
+from backend.shared.storage import write_processed
 
 # Your dataset as a string (copy-paste from your message)
 data_string = """Year;Bottom Bracket Rate %;Bottom Bracket Taxable Income up to;Top Bracket Rate %;Top Bracket Taxable Income Over;;
@@ -13,26 +17,13 @@ data_string = """Year;Bottom Bracket Rate %;Bottom Bracket Taxable Income up to;
 2013;10;17850;39.6;450000;;
 2012;10;17400;35;388350;;"""
 
-# Convert to DataFrame, selecting only the first 5 columns to avoid 'Unnamed' extras
-from io import StringIO
-df = pd.read_csv(StringIO(data_string), sep=';', usecols=[0, 1, 2, 3, 4])
-
-# Clean column names (remove trailing spaces if any)
-df.columns = df.columns.str.strip()
-
-# Optional: Convert numeric columns to appropriate types
-df['Year'] = df['Year'].astype(int)
-df['Bottom Bracket Rate %'] = df['Bottom Bracket Rate %'].astype(float)
-df['Bottom Bracket Taxable Income up to'] = df['Bottom Bracket Taxable Income up to'].astype(int)
-df['Top Bracket Rate %'] = df['Top Bracket Rate %'].astype(float)
-df['Top Bracket Taxable Income Over'] = df['Top Bracket Taxable Income Over'].astype(int)
-
-# Ensure the processed folder exists
-os.makedirs('data/processed', exist_ok=True)
+# Convert to DataFrame and clean it with the shared schema (canonical names and dtypes,
+# trailing 'Unnamed' columns dropped)
+df = clean_frame(pd.read_csv(StringIO(data_string), sep=';', dtype=str))
 
-# Save as pickle
-df.to_pickle('data/processed/cleaned_tax_data.pkl')
+# Save to the processed store (format follows DATA_PATH: parquet by default, pickle fallback)
+saved_path = write_processed(df)
 
-print("Pickle file created successfully!")
+print(f"Processed data saved to: {saved_path}")
 print("Columns:", df.columns.tolist())
 print(df.head())
\ No newline at end of file
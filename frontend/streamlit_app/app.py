@@ -1,67 +1,42 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-import joblib
-import requests
-from sklearn.metrics import mean_squared_error
 import os
+import sys
+
+# Make the repo root importable so the dashboard can use backend modules in-process
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from backend.shared import config
+from backend.shared.tax_engine import get_engine
+from data_loader import load_raw_aggregates, load_raw_indexed, show_cache_stats
+import plotting
+import profiling
 
 # =========================
 # Streamlit Setup
 # =========================
 st.set_page_config(page_title="Tax Analyzer Dashboard", layout="wide")
 st.title("💼 Tax Analyzer Dashboard")
+profiler = profiling.start("Dashboard")
 
 # =========================
-# Load Dataset (Auto-Detect)
+# Load Dataset (cached, cleaned once per file version)
 # =========================
-# Tries multiple possible paths for flexibility
-possible_paths = [
-    os.path.join('data', 'raw', 'tax_data.csv'),
-    os.path.join('..', 'data', 'raw', 'tax_data.csv'),
-    os.path.join('..', '..', 'data', 'raw', 'tax_data.csv'),
-]
-
-data_path = None
-for path in possible_paths:
-    if os.path.exists(path):
-        data_path = path
-        break
-
-if not data_path:
-    st.error("❌ Could not find 'tax_data.csv'. Please ensure it's placed in one of these locations:\n\n"
-             "• ./data/raw/tax_data.csv\n• ../data/raw/tax_data.csv\n• ../../data/raw/tax_data.csv")
-    st.stop()
-
 try:
-    df = pd.read_csv(data_path, delimiter=';')
-    st.sidebar.success(f"✅ Data loaded successfully from: {data_path}")
+    with profiler.section("Load data"):
+        # Sorted by Year once per file version: year filters are slices, not scans
+        indexed = load_raw_indexed()
+        df = indexed.frame
+    with profiler.section("Aggregates"):
+        aggregates = load_raw_aggregates()
+    st.sidebar.success(f"✅ Data loaded successfully from: {config.RAW_DATA_PATH}")
+except FileNotFoundError:
+    st.error(f"❌ Could not find 'tax_data.csv' at: {config.RAW_DATA_PATH}")
+    st.stop()
 except Exception as e:
     st.error(f"❌ Error loading data: {e}")
     st.stop()
 
-# =========================
-# Clean & Convert Data
-# =========================
-df.columns = df.columns.str.strip()
-
-numeric_cols = [
-    "Bottom Bracket Rate %",
-    "Bottom Bracket Taxable Income up to",
-    "Top Bracket Rate %",
-    "Top Bracket Taxable Income Over"
-]
-
-for col in numeric_cols:
-    if col in df.columns:
-        df[col] = (
-            df[col]
-            .astype(str)
-            .str.replace(r"[^\d.\-]", "", regex=True)
-            .replace("", pd.NA)
-            .astype(float)
-        )
+show_cache_stats()
 
 # =========================
 # Sidebar Navigation
@@ -78,26 +53,26 @@ if page == "Home":
 
     col1, col2, col3 = st.columns(3)
     if 'Year' in df.columns and 'Bottom Bracket Rate %' in df.columns:
-        col1.metric("📅 Total Years", df["Year"].nunique())
-        col2.metric("💰 Avg Bottom Rate (%)", round(df["Bottom Bracket Rate %"].mean(), 2))
-        col3.metric("📈 Max Top Rate (%)", df["Top Bracket Rate %"].max())
+        col1.metric("📅 Total Years", len(aggregates.years))
+        col2.metric("💰 Avg Bottom Rate (%)", round(aggregates.mean("Bottom Bracket Rate %"), 2))
+        col3.metric("📈 Max Top Rate (%)", aggregates.max("Top Bracket Rate %"))
 
     # Chart 1
     if 'Year' in df.columns and 'Bottom Bracket Rate %' in df.columns:
-        fig = px.line(df.groupby('Year')['Bottom Bracket Rate %'].mean().reset_index(),
-                      x='Year', y='Bottom Bracket Rate %',
-                      title="Average Bottom Bracket Rate Over Years",
-                      color_discrete_sequence=px.colors.qualitative.Set2)
-        st.plotly_chart(fig, use_container_width=True)
+        with profiler.section("Bottom rate trend"):
+            fig = px.line(aggregates.year_means('Bottom Bracket Rate %'),
+                          x='Year', y='Bottom Bracket Rate %',
+                          title="Average Bottom Bracket Rate Over Years",
+                          color_discrete_sequence=px.colors.qualitative.Set2)
+            st.plotly_chart(fig, use_container_width=True)
 
     # Chart 2
     if 'Year' in df.columns:
-        year_counts = df['Year'].value_counts().reset_index()
-        year_counts.columns = ['Year', 'Count']
-        fig = px.bar(year_counts, x='Year', y='Count',
-                     title="Number of Entries by Year",
-                     color_discrete_sequence=px.colors.sequential.Viridis)
-        st.plotly_chart(fig, use_container_width=True)
+        with profiler.section("Entries by year"):
+            fig = px.bar(aggregates.year_counts(), x='Year', y='Count',
+                         title="Number of Entries by Year",
+                         color_discrete_sequence=px.colors.sequential.Viridis)
+            st.plotly_chart(fig, use_container_width=True)
 
 # =========================
 # DATA EXPLORATION
@@ -105,34 +80,45 @@ if page == "Home":
 elif page == "Data Exploration":
     st.header("🔍 Explore the Tax Data")
 
-    selected_year = st.selectbox("Select Year", ["All"] + sorted(df["Year"].unique().tolist()))
+    selected_year = st.selectbox("Select Year", ["All"] + indexed.years)
 
-    filtered_df = df if selected_year == "All" else df[df["Year"] == selected_year]
+    with profiler.section("Filter"):
+        filtered_df = indexed.select(selected_year)
 
     # Histogram
     if 'Bottom Bracket Rate %' in filtered_df.columns:
-        fig = px.histogram(filtered_df, x='Bottom Bracket Rate %', nbins=10,
-                           color_discrete_sequence=px.colors.sequential.Plasma,
-                           title="Distribution of Bottom Bracket Rates")
-        st.plotly_chart(fig, use_container_width=True)
+        with profiler.section("Rate histogram"):
+            fig = plotting.histogram(filtered_df['Bottom Bracket Rate %'], nbins=10,
+                                     color=px.colors.sequential.Plasma[0],
+                                     title="Distribution of Bottom Bracket Rates")
+            fig.update_layout(xaxis_title='Bottom Bracket Rate %', yaxis_title='count')
+            st.plotly_chart(fig, use_container_width=True)
 
     # Scatter
     if {'Bottom Bracket Taxable Income up to', 'Top Bracket Rate %'}.issubset(filtered_df.columns):
-        fig = px.scatter(filtered_df, x='Bottom Bracket Taxable Income up to', y='Top Bracket Rate %',
-                         color='Year', size='Bottom Bracket Rate %',
-                         title="Income vs Top Bracket Rate by Year")
-        st.plotly_chart(fig, use_container_width=True)
+        with profiler.section("Income vs top rate scatter"):
+            fig = plotting.scatter(filtered_df['Bottom Bracket Taxable Income up to'], filtered_df['Top Bracket Rate %'],
+                                   color=filtered_df['Year'], color_title='Year',
+                                   size=filtered_df['Bottom Bracket Rate %'],
+                                   title="Income vs Top Bracket Rate by Year")
+            fig.update_layout(xaxis_title='Bottom Bracket Taxable Income up to', yaxis_title='Top Bracket Rate %')
+            st.plotly_chart(fig, use_container_width=True)
 
     # Box Plot
     if 'Top Bracket Taxable Income Over' in filtered_df.columns:
-        fig = px.box(filtered_df, x='Year', y='Top Bracket Taxable Income Over',
-                     color_discrete_sequence=px.colors.sequential.Viridis,
-                     title="Top Bracket Income by Year")
-        st.plotly_chart(fig, use_container_width=True)
+        with profiler.section("Top income box plot"):
+            quartiles = aggregates.year_quartiles('Top Bracket Taxable Income Over')
+            if selected_year != "All":
+                quartiles = quartiles[quartiles['Year'] == selected_year]
+            fig = plotting.box(quartiles, color=px.colors.sequential.Viridis[0],
+                               title="Top Bracket Income by Year")
+            fig.update_layout(xaxis_title='Year', yaxis_title='Top Bracket Taxable Income Over')
+            st.plotly_chart(fig, use_container_width=True)
 
     # Summary
     st.subheader("🧾 Summary Statistics")
-    st.dataframe(filtered_df.describe())
+    with profiler.section("describe()"):
+        st.dataframe(aggregates.describe(None if selected_year == "All" else selected_year))
 
 # =========================
 # TAX TRENDS
@@ -141,39 +127,40 @@ elif page == "Tax Trends":
     st.header("📉 Tax Rate Trends")
 
     if 'Bottom Bracket Rate %' in df.columns:
-        fig = px.line(df.groupby('Year')['Bottom Bracket Rate %'].mean().reset_index(),
-                      x='Year', y='Bottom Bracket Rate %',
-                      title="Average Bottom Bracket Rate Over Time")
-        st.plotly_chart(fig, use_container_width=True)
+        with profiler.section("Bottom rate trend"):
+            fig = px.line(aggregates.year_means('Bottom Bracket Rate %'),
+                          x='Year', y='Bottom Bracket Rate %',
+                          title="Average Bottom Bracket Rate Over Time")
+            st.plotly_chart(fig, use_container_width=True)
 
     if 'Bottom Bracket Taxable Income up to' in df.columns:
-        fig = px.line(df.groupby('Year')['Bottom Bracket Taxable Income up to'].mean().reset_index(),
-                      x='Year', y='Bottom Bracket Taxable Income up to',
-                      title="Average Bottom Bracket Income Over Time")
-        st.plotly_chart(fig, use_container_width=True)
+        with profiler.section("Bottom income trend"):
+            fig = px.line(aggregates.year_means('Bottom Bracket Taxable Income up to'),
+                          x='Year', y='Bottom Bracket Taxable Income up to',
+                          title="Average Bottom Bracket Income Over Time")
+            st.plotly_chart(fig, use_container_width=True)
 
     
     st.subheader("📊 Correlation Heatmap")
-    numeric_df = df.select_dtypes(include=['float64', 'int64'])
-    if not numeric_df.empty:
-        fig = px.imshow(
-            numeric_df.corr(),
-            text_auto=True,
-            color_continuous_scale=px.colors.diverging.RdYlBu,  # ✅ Fixed here
-            title="Feature Correlations"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+    if aggregates.columns:
+        with profiler.section("Correlation heatmap"):
+            fig = px.imshow(
+                aggregates.corr(),
+                text_auto=True,
+                color_continuous_scale=px.colors.diverging.RdYlBu,  # ✅ Fixed here
+                title="Feature Correlations"
+            )
+            st.plotly_chart(fig, use_container_width=True)
     else:
         st.warning("No numeric columns found for correlation analysis.")
 
 
     st.subheader("📆 YoY Change in Bottom Bracket Rate")
-    trend_df = df.groupby('Year')['Bottom Bracket Rate %'].mean().pct_change().reset_index()
-    trend_df.columns = ['Year', 'YoY Change']
-    fig = px.bar(trend_df, x='Year', y='YoY Change',
-                 title="Year-over-Year % Change in Bottom Bracket Rates",
-                 color_discrete_sequence=px.colors.qualitative.Set2)
-    st.plotly_chart(fig, use_container_width=True)
+    with profiler.section("YoY change"):
+        fig = px.bar(aggregates.yoy('Bottom Bracket Rate %'), x='Year', y='YoY Change',
+                     title="Year-over-Year % Change in Bottom Bracket Rates",
+                     color_discrete_sequence=px.colors.qualitative.Set2)
+        st.plotly_chart(fig, use_container_width=True)
 
 # =========================
 # ML PREDICTIONS
@@ -182,22 +169,34 @@ elif page == "ML Predictions":
     st.header("🤖 Tax Prediction Engine")
 
     income = st.slider("Select Income", 0, 1_000_000, 50_000)
-    year = st.selectbox("Select Year", sorted(df["Year"].unique().tolist()))
+    year = st.selectbox("Select Year", indexed.years)
+
+    with profiler.section("Bracket engine"):
+        engine = get_engine()
+        computed = float(engine.liability(income, year))
+    col1, col2 = st.columns(2)
+    col1.metric("🧮 Computed Tax (bracket engine)", f"${computed:,.2f}")
+    col2.metric("📐 Marginal Rate", f"{float(engine.marginal_rate(income, year)) * 100:.2f}%")
+    with st.expander(f"Bracket schedule for {year}"):
+        st.dataframe(engine.schedule(year))
 
     if st.button("Predict"):
+        # Imported here so the other pages don't pay for requests/urllib3
+        from prediction_client import ApiError, get_client
         try:
-            response = requests.post("http://localhost:5000/predict",
-                                     json={"income": income, "year": year})
-            response.raise_for_status()
-            pred = response.json().get("predicted_tax")
-
-            if pred is not None:
-                st.success(f"Predicted Tax: ${pred:,.2f}")
-        except requests.exceptions.ConnectionError:
-            st.error("⚠️ Flask API not running. Please start backend server.")
-        except Exception as e:
-            st.error(f"Unexpected error: {e}")
+            with profiler.section("Predict request"):
+                prediction = get_client().predict(income, year)
+            st.success(f"Predicted Tax: ${prediction.tax:,.2f}")
+            if prediction.source == "engine":
+                st.info("⚠️ Flask API not reachable — showing the bracket engine's tax instead.")
+        except ApiError as e:
+            st.error(f"API Error: {e}")
 
 # =========================
 # MODEL EVALUATION
 # =========================
+
+# =========================
+# Profiling (opt-in, see profiling.py)
+# =========================
+profiler.report()
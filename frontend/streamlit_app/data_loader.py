@@ -0,0 +1,184 @@
+"""Shared, cached data loading for the dashboard and every page.
+
+Streamlit re-runs the whole script on each widget interaction, so reading and
+cleaning the dataset inline means doing it again on every click. The loaders
+here are wrapped in ``st.cache_resource`` and keyed on (path, mtime): the file
+is read and cleaned once, and re-read only when it changes on disk.
+
+When the processed dataset has been published to shared memory
+(backend/shared/shared_data.py), it is attached zero-copy instead of being
+read, so every server process shares one copy of it.
+
+Every call hands back a shallow copy of the cached frame. With pandas
+copy-on-write that is a zero-copy view: pages can filter or add columns
+freely without a defensive ``df.copy()`` and without touching the cache.
+On pandas < 3 importing this module therefore turns on
+``mode.copy_on_write`` for the whole process (pandas 3 always has it); it
+can't be scoped with ``pd.option_context``, because pages modify the frames
+after the loader has returned.
+"""
+import os
+import sys
+
+import pandas as pd
+import streamlit as st
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from backend.shared import config
+from backend.shared.aggregates import aggregates_path, load_or_build
+from backend.shared.schema import load_raw
+from backend.shared.shared_data import read_processed
+from backend.shared.storage import resolve_path
+from backend.shared.year_index import YearIndex
+
+# Process-wide on purpose, see the module docstring
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# Per-loader call/miss counters (hits = calls - misses), kept for the life of the server process
+_stats = {}
+
+
+def _count(name, field):
+    counts = _stats.setdefault(name, {'calls': 0, 'misses': 0})
+    counts[field] += 1
+
+
+def _mtime(path):
+    return os.stat(path).st_mtime_ns
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_raw(path, mtime):
+    _count('raw', 'misses')
+    return load_raw(path)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_processed(path, mtime, columns=None, years=None):
+    _count('processed', 'misses')
+    return read_processed(path, columns=columns, years=years)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_importances(path, mtime):
+    # From the compact export's meta.json: no unpickling, so no sklearn/joblib import
+    from backend.shared.compact_model import compact_path, read_meta
+    from backend.shared.model_registry import file_digest
+    _count('feature_importances', 'misses')
+    meta = read_meta(compact_path(path), file_digest(path))
+    if meta is None or 'feature_importances' not in meta:
+        return None
+    return tuple(meta['feature_importances'])
+
+
+def load_raw_data(path=None):
+    """The cleaned raw CSV (config.RAW_DATA_PATH). Raises FileNotFoundError if missing."""
+    path = path or config.RAW_DATA_PATH
+    _count('raw', 'calls')
+    return _load_raw(path, _mtime(path)).copy(deep=False)
+
+
+def _processed_file(path):
+    actual = resolve_path(path or config.DATA_PATH)
+    if actual is None:
+        raise FileNotFoundError(f'Processed data not found: {path or config.DATA_PATH}')
+    return actual
+
+
+def load_processed_data(path=None, columns=None, years=None):
+    """The processed dataset (config.DATA_PATH). Raises FileNotFoundError if missing.
+
+    columns/years are pushed down to the storage layer, so a page that needs two
+    columns or a year range only reads (and caches) that much.
+    """
+    path = _processed_file(path)
+    _count('processed', 'calls')
+    columns = tuple(columns) if columns is not None else None
+    return _load_processed(path, _mtime(path), columns, years).copy(deep=False)
+
+
+def load_feature_importances(path=None):
+    """feature_importances_ of the trained model (config.MODEL_PATH) as exported next to it,
+    or None if its compact export has none. Raises FileNotFoundError if the model is missing."""
+    path = path or config.MODEL_PATH
+    _count('feature_importances', 'calls')
+    return _load_importances(path, _mtime(path))
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_aggregates(kind, path, mtime, _df):
+    # _df is excluded from the cache key; (path, mtime) already identifies it
+    _count(f'{kind}_aggregates', 'misses')
+    return load_or_build(_df, aggregates_path(path, os.path.dirname(config.DATA_PATH)))
+
+
+def load_raw_aggregates(path=None):
+    """Per-year summaries (means, counts, YoY, corr, describe) of the raw CSV."""
+    path = path or config.RAW_DATA_PATH
+    _count('raw_aggregates', 'calls')
+    mtime = _mtime(path)
+    return _load_aggregates('raw', path, mtime, _load_raw(path, mtime))
+
+
+def load_processed_aggregates(path=None):
+    """Per-year summaries (means, counts, YoY, corr, describe) of the processed dataset."""
+    path = _processed_file(path)
+    _count('processed_aggregates', 'calls')
+    mtime = _mtime(path)
+    return _load_aggregates('processed', path, mtime, _load_processed(path, mtime))
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _year_index(kind, path, mtime, columns, _df):
+    # Like _load_aggregates: (path, mtime, columns) identify _df
+    _count(f'{kind}_index', 'misses')
+    return YearIndex(_df)
+
+
+def load_raw_indexed(path=None):
+    """The cleaned raw CSV sorted by Year, with per-year slices and the year list (YearIndex)."""
+    path = path or config.RAW_DATA_PATH
+    _count('raw_index', 'calls')
+    mtime = _mtime(path)
+    return _year_index('raw', path, mtime, None, _load_raw(path, mtime))
+
+
+def load_processed_indexed(path=None, columns=None):
+    """The processed dataset (optionally just `columns`) as a YearIndex."""
+    path = _processed_file(path)
+    _count('processed_index', 'calls')
+    columns = tuple(columns) if columns is not None else None
+    mtime = _mtime(path)
+    return _year_index('processed', path, mtime, columns, _load_processed(path, mtime, columns, None))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _evaluate(model_path, model_mtime, data_path, data_mtime, sample_size):
+    from backend.shared.evaluation import evaluate
+    _count('evaluation', 'misses')
+    return evaluate(model_path, data_path, sample_size=sample_size)
+
+
+def load_evaluation(model_path=None, data_path=None, sample_size=None):
+    """Streaming evaluation (ErrorStats) of the model on the processed dataset,
+    recomputed only when either file changes. Raises FileNotFoundError if one is missing."""
+    model_path = model_path or config.MODEL_PATH
+    data_path = _processed_file(data_path)
+    _count('evaluation', 'calls')
+    sample_size = config.PLOT_MAX_POINTS if sample_size is None else sample_size
+    return _evaluate(model_path, _mtime(model_path), data_path, _mtime(data_path), sample_size)
+
+
+def cache_stats():
+    """Hit/miss counts per loader, e.g. {'raw': {'hits': 9, 'misses': 1}}."""
+    return {name: {'hits': c['calls'] - c['misses'], 'misses': c['misses']} for name, c in _stats.items()}
+
+
+def show_cache_stats():
+    """Render the cache counters in a collapsed sidebar section."""
+    stats = cache_stats()
+    if not stats:
+        return
+    with st.sidebar.expander("⚙️ Data cache"):
+        st.dataframe(pd.DataFrame(stats).T)
@@ -1,55 +1,104 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import requests
+import plotly.express as px
 import plotly.graph_objects as go
 import os
+import sys
 
-# Load data
-data_path = os.path.join('..', '..', 'data', 'processed', 'cleaned_tax_data.pkl')
+# Make the repo root importable so the page can use backend modules in-process
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from data_loader import load_processed_indexed, show_cache_stats
+from prediction_client import ApiError, get_client
+from backend.shared.schema import YEAR
+from backend.shared.tax_engine import get_engine
+import profiling
+
+profiler = profiling.start("ML Predictions")
+
+# Load data (cached; re-read only when the file changes)
 try:
-    df = pd.read_pickle(data_path)
+    with profiler.section("Load data"):
+        indexed = load_processed_indexed(columns=[YEAR])
 except FileNotFoundError:
     st.error("Data file not found.")
     st.stop()
+show_cache_stats()
 
 st.title("ML Predictions")
 st.write("Predict tax amounts using income and year inputs.")
 
 income = st.slider("Income", 0, 1000000, 50000)
-if 'Year' in df.columns:
-    year = st.selectbox("Year", df['Year'].unique())
+if indexed.years:
+    year = st.selectbox("Year", indexed.years)
 else:
-    st.error("Column 'Year' not found.")
+    st.error("No years found in the data.")
     st.stop()
 
+# Bracket engine: computed locally, no API round-trip needed
+with profiler.section("Bracket engine"):
+    engine = get_engine()
+    computed = float(engine.liability(income, year))
+st.subheader("Bracket Engine")
+col1, col2, col3 = st.columns(3)
+col1.metric("Computed Tax", f"${computed:,.2f}")
+col2.metric("Effective Rate", f"{computed / income * 100:.2f}%" if income else "0.00%")
+col3.metric("Marginal Rate", f"{float(engine.marginal_rate(income, year)) * 100:.2f}%")
+with st.expander(f"Bracket schedule for {year}"):
+    st.dataframe(engine.schedule(year))
+
+# Years whose curves are compared with the selected one
+compare_years = st.multiselect("Compare with years", indexed.years[::-1])
+
+# Income grid for the curves: the slider's full range
+SWEEP_MAX = 1000000
+SWEEP_STEP = 5000
+
 if st.button("Predict"):
     try:
-        response = requests.post('http://localhost:5000/predict', 
-                                 json={'income': income, 'year': year})
-        response.raise_for_status()
-        pred = response.json().get('predicted_tax')
-        
+        client = get_client()
+        with profiler.section("Predict request"):
+            prediction = client.predict(income, year)
+        pred = prediction.tax
+
         if pred is not None:
             st.success(f"Predicted Tax: ${pred:.2f}")
-            
-            # Prediction vs. Historical Data (Scatter with available data)
-            st.subheader("Prediction vs. Historical Data")
-            fig = go.Figure()
-            # Use available columns for plot
-            if 'Bottom Bracket Taxable Income up to' in df.columns:
-                fig.add_trace(go.Scatter(x=df['Bottom Bracket Taxable Income up to'], y=[pred] * len(df), 
-                                         mode='markers', name='Historical Income Brackets',
-                                         marker=dict(color='lightblue', size=6)))
-                fig.add_trace(go.Scatter(x=[income], y=[pred], 
+            if prediction.source == 'engine':
+                st.info(f"Flask API not reachable on {client.base_url} — showing the bracket engine's tax instead.")
+
+            # Whole curve for every selected year from one /predict/sweep request
+            years = [int(year)] + [int(y) for y in compare_years if int(y) != int(year)]
+            with profiler.section("Sweep request"):
+                sweep = client.sweep(0, SWEEP_MAX, SWEEP_STEP, years, mode='both')
+
+            st.subheader("Predicted Tax Curve")
+            with profiler.section("Tax curves"):
+                fig = go.Figure()
+                colors = px.colors.qualitative.Set2
+                for row, curve_year in enumerate(sweep.years):
+                    color = colors[row % len(colors)]
+                    fig.add_trace(go.Scatter(x=sweep.income, y=sweep.predicted_tax[row], mode='lines',
+                                             name=f"{curve_year} predicted", line=dict(color=color)))
+                    fig.add_trace(go.Scatter(x=sweep.income, y=sweep.computed_tax[row], mode='lines',
+                                             name=f"{curve_year} bracket engine", line=dict(color=color, dash='dash')))
+                fig.add_trace(go.Scatter(x=[income], y=[pred],
                                          mode='markers', name='Prediction',
                                          marker=dict(color='orange', size=12, symbol='star')))
-                fig.update_layout(title="Income Bracket vs. Prediction",
-                                  xaxis_title="Bottom Bracket Taxable Income up to", yaxis_title="Predicted Tax",
-                                  template="plotly_white", hovermode="closest")
+                fig.update_layout(title="Tax by Income",
+                                  xaxis_title="Income", yaxis_title="Tax",
+                                  template="plotly_white", hovermode="x unified")
                 st.plotly_chart(fig)
+
+            st.subheader("Per-Year Comparison")
+            st.dataframe(pd.DataFrame({
+                'Year': sweep.years,
+                'Predicted Tax': [np.interp(income, sweep.income, row) for row in sweep.predicted_tax],
+                'Computed Tax': [np.interp(income, sweep.income, row) for row in sweep.computed_tax],
+                'Model': sweep.model_version,
+            }).round(2), hide_index=True)
         else:
             st.warning("Prediction failed: 'predicted_tax' not in response.")
-    except requests.exceptions.ConnectionError:
-        st.error("Connection Error: Ensure Flask API is running on localhost:5000.")
-    except requests.exceptions.RequestException as e:
-        st.error(f"API Error: {e}")
\ No newline at end of file
+    except ApiError as e:
+        st.error(f"API Error: {e}")
+
+profiler.report()
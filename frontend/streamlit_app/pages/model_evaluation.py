@@ -1,65 +1,95 @@
 import streamlit as st
-import joblib
-import pandas as pd
-from sklearn.metrics import mean_squared_error
 import plotly.express as px
 import plotly.graph_objects as go
 import os
+import sys
 
-# Load model and data
-model_path = os.path.join('..', '..', 'models', 'model.pkl')
-data_path = os.path.join('..', '..', 'data', 'processed', 'cleaned_tax_data.pkl')
+# Make the repo root importable so the page can use backend modules in-process
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from data_loader import load_evaluation, load_feature_importances, show_cache_stats
+from backend.shared.schema import FEATURES, YEAR
+import plotting
+import profiling
+
+profiler = profiling.start("Model Evaluation")
+
+# Score the model on the processed data in chunks (cached; re-run only when either file changes).
+# Only the accumulated statistics and a bounded sample of points are kept, never every row.
 try:
-    model = joblib.load(model_path)
-    df = pd.read_pickle(data_path)
+    with profiler.section("Evaluate"):
+        stats = load_evaluation()
+    # Read from the compact export's metadata, so the forest is never unpickled here
+    with profiler.section("Load feature importances"):
+        importances = load_feature_importances()
 except FileNotFoundError:
     st.error("Model or data file not found.")
     st.stop()
+except ValueError as exc:
+    st.error(f"Required columns for evaluation not found: {exc}")
+    st.stop()
+show_cache_stats()
 
 st.title("Model Evaluation")
 st.write("Evaluate the ML model's performance on test data.")
 
-# Adjust X_test to use available columns (no 'tax_amount' for y_test, so use a placeholder or skip)
-if 'Year' in df.columns and 'Bottom Bracket Taxable Income up to' in df.columns:
-    X_test = df[['Year', 'Bottom Bracket Taxable Income up to']]
-    # Placeholder for y_test (since 'tax_amount' isn't in dataset, use a computed or dummy value)
-    y_test = df['Bottom Bracket Rate %']  # Example: predict rate instead
-    predictions = model.predict(X_test)
-    mse = mean_squared_error(y_test, predictions)
-    st.metric("Mean Squared Error", f"{mse:.2f}")
-else:
-    st.error("Required columns for evaluation not found.")
+# Features/target follow the served model contract: (year, income) -> rate %
+col1, col2, col3 = st.columns(3)
+col1.metric("Mean Squared Error", f"{stats.mse:.2f}")
+col2.metric("Mean Absolute Error", f"{stats.mae:.2f}")
+col3.metric("R²", f"{stats.r2:.3f}")
+st.caption(f"{stats.count:,} rows scored ({stats.skipped:,} skipped for missing values)")
 
 # 1. Prediction Errors (Histogram)
 st.subheader("Prediction Error Distribution")
-if 'y_test' in locals():
-    errors = y_test - predictions
-    fig = px.histogram(errors, nbins=20, 
-                       title="Distribution of Prediction Errors",
-                       color_discrete_sequence=px.colors.sequential.Plasma)  # Accessible
+with profiler.section("Error histogram"):
+    # Inner bins only; residuals beyond the fixed edges are counted in the caption
+    fig = plotting.binned(stats.edges, stats.hist[1:-1],
+                          title="Distribution of Prediction Errors",
+                          color=px.colors.sequential.Plasma[0])  # Accessible
     fig.update_layout(xaxis_title="Error", yaxis_title="Frequency", template="plotly_white")
     st.plotly_chart(fig)
+outside = int(stats.hist[0] + stats.hist[-1])
+if outside:
+    st.caption(f"{outside:,} errors outside ±{stats.edges[-1]:g} (min {stats.min_error:.2f}, max {stats.max_error:.2f})")
 
-# 2. Feature Importance (Bar Chart)
-st.subheader("Feature Importance")
-if hasattr(model, 'feature_importances_') and 'X_test' in locals():
-    importances = model.feature_importances_
-    fig = px.bar(x=X_test.columns, y=importances, 
-                 title="Feature Importances",
+# 2. Errors by year
+st.subheader("Errors by Year")
+with profiler.section("Errors by year"):
+    by_year = stats.by_year()
+    fig = px.bar(by_year, x=YEAR, y='mae', title="Mean Absolute Error by Year",
                  color_discrete_sequence=px.colors.qualitative.Set2)
-    fig.update_layout(xaxis_title="Feature", yaxis_title="Importance", template="plotly_white")
+    fig.update_layout(xaxis_title="Year", yaxis_title="MAE", template="plotly_white")
     st.plotly_chart(fig)
+    st.dataframe(by_year, hide_index=True)
+
+# 3. Feature Importance (Bar Chart)
+st.subheader("Feature Importance")
+if importances is not None:
+    with profiler.section("Feature importance"):
+        fig = px.bar(x=FEATURES, y=importances, 
+                     title="Feature Importances",
+                     color_discrete_sequence=px.colors.qualitative.Set2)
+        fig.update_layout(xaxis_title="Feature", yaxis_title="Importance", template="plotly_white")
+        st.plotly_chart(fig)
 else:
-    st.warning("Model does not have feature_importances_ attribute or data unavailable.")
+    st.warning("No feature importances found: the model has none, or has no matching compact export "
+               "(re-save it with compact_model.save_model).")
 
-# 3. New: Actual vs. Predicted Scatter
+# 4. Actual vs. Predicted Scatter (a uniform random sample kept during evaluation)
 st.subheader("Actual vs. Predicted Values")
-if 'y_test' in locals():
-    fig = px.scatter(x=y_test, y=predictions, 
-                     title="Actual vs. Predicted Values",
-                     labels={'x': 'Actual Value', 'y': 'Predicted Value'},
-                     color_discrete_sequence=px.colors.sequential.Viridis)
-    fig.add_trace(go.Scatter(x=[y_test.min(), y_test.max()], y=[y_test.min(), y_test.max()], 
-                             mode='lines', name='Perfect Fit', line=dict(color='red', dash='dash')))
+with profiler.section("Actual vs predicted scatter"):
+    actual, predicted = stats.sample()
+    fig = plotting.scatter(actual, predicted,
+                           title="Actual vs. Predicted Values",
+                           color=px.colors.sequential.Viridis[0])
+    fig.update_layout(xaxis_title='Actual Value', yaxis_title='Predicted Value')
+    if len(actual):
+        fig.add_trace(go.Scatter(x=[actual.min(), actual.max()], y=[actual.min(), actual.max()],
+                                 mode='lines', name='Perfect Fit', line=dict(color='red', dash='dash')))
+    if len(actual) < stats.count:
+        fig.add_annotation(text=f"{len(actual):,} of {stats.count:,} points", xref='paper', yref='paper',
+                           x=1, y=1.05, showarrow=False, font=dict(size=11))
     fig.update_layout(template="plotly_white")
-    st.plotly_chart(fig)
\ No newline at end of file
+    st.plotly_chart(fig)
+
+profiler.report()
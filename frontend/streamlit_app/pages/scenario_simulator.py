@@ -0,0 +1,109 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import os
+import sys
+
+# Make the repo root importable so the page can use backend modules in-process
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from data_loader import load_processed_data, show_cache_stats
+from backend.shared import config, simulation
+from backend.shared.schema import FEATURES
+from backend.shared.tax_engine import get_engine
+import profiling
+
+profiler = profiling.start("Scenario Simulator")
+
+
+# Same inputs -> same (seeded) result, so reruns and repeated clicks reuse it
+@st.cache_data(max_entries=16, show_spinner="Simulating filers...")
+def run_simulation(year, scenarios, distribution, filers, seed, population):
+    return simulation.simulate(get_engine(), year, scenarios, distribution, filers=filers, seed=seed,
+                               jobs=config.SIMULATION_JOBS, population=population)
+
+
+st.title("Scenario Simulator")
+st.write("Estimate the revenue impact of bracket changes over a simulated income distribution.")
+
+with profiler.section("Bracket engine"):
+    engine = get_engine()
+    years = engine.years.tolist()
+year = st.selectbox("Base year", years[::-1])
+base = simulation.baseline(engine, year)
+with st.expander(f"Bracket schedule for {year}"):
+    st.dataframe(engine.schedule(year))
+st.caption("The middle bracket is taxed at the midpoint of the bottom and top rates, as in the bracket engine.")
+
+# Income distribution of the simulated filers
+st.subheader("Filers")
+kind = st.radio("Income distribution", ["Lognormal", "Pareto", "Sampled from processed data"], horizontal=True)
+col1, col2 = st.columns(2)
+if kind == "Lognormal":
+    distribution = {'kind': 'lognormal',
+                    'median': col1.number_input("Median income", min_value=1.0, value=45000.0, step=1000.0),
+                    'sigma': col2.number_input("Sigma (log income)", min_value=0.01, value=0.9, step=0.05)}
+elif kind == "Pareto":
+    distribution = {'kind': 'pareto',
+                    'alpha': col1.number_input("Alpha (tail index)", min_value=0.1, value=1.8, step=0.1),
+                    'minimum': col2.number_input("Minimum income", min_value=1.0, value=20000.0, step=1000.0)}
+else:
+    try:
+        with profiler.section("Load data"):
+            incomes = load_processed_data(columns=[FEATURES[1]])[FEATURES[1]].dropna()
+    except FileNotFoundError:
+        st.error("Data file not found.")
+        st.stop()
+    show_cache_stats()
+    distribution = {'kind': 'empirical', 'values': tuple(incomes.tolist())}
+    col1.metric("Sampled incomes", f"{len(incomes):,}")
+
+col1, col2, col3 = st.columns(3)
+filers = col1.select_slider("Simulated filers", [100_000, 500_000, 1_000_000, 2_000_000, 5_000_000],
+                            value=1_000_000)
+seed = int(col2.number_input("Seed", min_value=0, value=0, step=1))
+population = col3.number_input("Scale to population (0 = simulated filers)", min_value=0, value=0, step=1_000_000)
+
+# Scenarios: blank cells keep the base year's value
+st.subheader("Scenarios")
+defaults = pd.DataFrame([
+    {'name': "Top rate +5 pts", 'bottom_rate': None, 'bottom_limit': None, 'top_rate': min(base['top_rate'] + 5, 100),
+     'top_limit': None},
+    {'name': "Bottom limit -10%", 'bottom_rate': None, 'bottom_limit': base['bottom_limit'] * 0.9, 'top_rate': None,
+     'top_limit': None},
+]).astype({field: float for field in simulation.Scenario._fields[1:]})
+edited = st.data_editor(defaults, num_rows="dynamic", hide_index=True, key=f"scenarios_{year}")
+
+if st.button("Run simulation"):
+    scenarios = tuple(
+        dict({field: float(row[field]) for field in simulation.Scenario._fields[1:] if pd.notna(row[field])},
+             name=str(row['name']) if pd.notna(row['name']) else f"Scenario {i}")
+        for i, row in enumerate(edited.to_dict(orient='records'), start=1))
+    try:
+        with profiler.section("Simulate"):
+            results = run_simulation(year, scenarios, distribution, filers, seed, population or None)
+    except ValueError as e:
+        st.error(f"Invalid scenario: {e}")
+        st.stop()
+
+    st.subheader("Results")
+    st.dataframe(results, hide_index=True)
+
+    with profiler.section("Charts"):
+        changes = results.iloc[1:]
+        fig = go.Figure(go.Bar(x=changes['scenario'], y=changes['revenue_change'],
+                               error_y=dict(type='data', array=1.96 * changes['revenue_change_se']),
+                               marker=dict(color=px.colors.qualitative.Set2[0])))
+        fig.update_layout(title="Revenue change vs. baseline (95% sampling interval)",
+                          xaxis_title="Scenario", yaxis_title="Revenue change", template="plotly_white")
+        st.plotly_chart(fig)
+
+        by_bracket = results.melt(id_vars='scenario', value_vars=[f'{b}_revenue' for b in simulation.BRACKETS],
+                                  var_name='Bracket', value_name='Revenue')
+        by_bracket['Bracket'] = by_bracket['Bracket'].str.replace('_revenue', '')
+        fig = px.bar(by_bracket, x='scenario', y='Revenue', color='Bracket', title="Revenue by bracket",
+                     color_discrete_sequence=px.colors.qualitative.Set2)
+        fig.update_layout(xaxis_title="Scenario", template="plotly_white")
+        st.plotly_chart(fig)
+
+profiler.report()
@@ -0,0 +1,136 @@
+"""Plotly figures whose size in the browser doesn't grow with the data.
+
+px.histogram, px.scatter and px.box serialize every row into the page. The
+builders here reduce the data in NumPy first and send only the result:
+
+- ``histogram``: bar heights from ``np.histogram``; the optional rug shows at
+  most ``MAX_RUG`` values (quantiles when there are more distinct ones).
+  ``binned`` draws counts that were already accumulated elsewhere (e.g. the
+  streaming residual histogram of ``backend/shared/evaluation.py``).
+- ``scatter``: above ``max_points`` rows, density-aware sampling keeps one
+  point from every occupied cell of a ``GRID`` x ``GRID`` grid (so outliers
+  and sparse regions survive) and fills the rest of the budget at random (so
+  dense regions still look dense). ``Scattergl`` above the WebGL threshold.
+- ``box``: boxes drawn from per-year quartiles that were computed once
+  (``AggregateStore.year_quartiles``), not from the rows.
+
+Limits come from ``PLOT_MAX_POINTS`` and ``PLOT_WEBGL_THRESHOLD`` in config.
+"""
+import os
+import sys
+
+import numpy as np
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from backend.shared import config
+
+GRID = 128
+MAX_RUG = 500
+# Largest marker (px) for sized scatters, as in px.scatter
+SIZE_MAX = 20
+
+
+def _values(data):
+    values = np.asarray(data, dtype=np.float64)
+    return values[np.isfinite(values)]
+
+
+def rug_values(values, max_values=MAX_RUG):
+    """Distinct values, or max_values evenly spaced quantiles when there are more."""
+    values = _values(values)
+    distinct = np.unique(values)
+    if len(distinct) <= max_values:
+        return distinct
+    return np.quantile(values, np.linspace(0, 1, max_values))
+
+
+def binned(edges, counts, title=None, color=None):
+    """Histogram from precomputed counts; edges has one more entry than counts."""
+    edges = np.asarray(edges, dtype=np.float64)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+                           marker=dict(color=color), name='count', showlegend=False))
+    fig.update_layout(title=title, bargap=0)
+    return fig
+
+
+def histogram(values, nbins=20, title=None, color=None, rug=False):
+    """Histogram of `values` as nbins pre-counted bars (plus a rug strip above)."""
+    values = _values(values)
+    counts, edges = np.histogram(values, bins=nbins) if len(values) else (np.array([]), np.array([0.0]))
+    fig = binned(edges, counts, title=title, color=color)
+    if rug:
+        # Rug strip on its own y axis above the bars, sharing the x axis
+        marks = rug_values(values)
+        fig.add_trace(go.Scatter(x=marks, y=np.zeros(len(marks)), yaxis='y2', mode='markers', showlegend=False,
+                                 marker=dict(symbol='line-ns-open', color=color, size=10)))
+        fig.update_layout(yaxis=dict(domain=[0, 0.85]), yaxis2=dict(domain=[0.88, 1], visible=False))
+    return fig
+
+
+def _cells(values, grid):
+    lo, hi = values.min(), values.max()
+    if hi <= lo:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.minimum(((values - lo) / (hi - lo) * grid).astype(np.int64), grid - 1)
+
+
+def density_sample(x, y, max_points, grid=GRID, seed=0):
+    """Sorted indices of at most max_points rows of (x, y), density-aware (see module docstring)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    candidates = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(candidates) <= max_points:
+        return candidates
+    rng = np.random.default_rng(seed)
+    cell = _cells(x[candidates], grid) * grid + _cells(y[candidates], grid)
+    _, first = np.unique(cell, return_index=True)
+    if len(first) >= max_points:
+        return np.sort(candidates[rng.choice(first, max_points, replace=False)])
+    rest = np.ones(len(candidates), dtype=bool)
+    rest[first] = False
+    extra = rng.choice(np.flatnonzero(rest), max_points - len(first), replace=False)
+    return np.sort(candidates[np.concatenate([first, extra])])
+
+
+def scatter(x, y, title=None, color=None, size=None, color_title=None, max_points=None, webgl_threshold=None):
+    """Scatter of at most max_points points; `color`/`size` may be per-row arrays or a single color."""
+    max_points = max_points or config.PLOT_MAX_POINTS
+    webgl_threshold = config.PLOT_WEBGL_THRESHOLD if webgl_threshold is None else webgl_threshold
+    keep = density_sample(x, y, max_points)
+    marker = {}
+    if color is not None and not isinstance(color, str):
+        marker.update(color=np.asarray(color)[keep], colorscale='Plasma', showscale=True,
+                      colorbar=dict(title=color_title))
+    elif color is not None:
+        marker['color'] = color
+    if size is not None:
+        sizes = np.nan_to_num(np.asarray(size, dtype=np.float64)[keep], nan=0.0).clip(min=0)
+        peak = sizes.max() if len(sizes) else 0
+        marker.update(size=sizes, sizemode='area', sizeref=2.0 * peak / SIZE_MAX ** 2 if peak else 1, sizemin=1)
+    trace = go.Scattergl if len(keep) > webgl_threshold else go.Scatter
+    fig = go.Figure(trace(x=np.asarray(x)[keep], y=np.asarray(y)[keep], mode='markers', marker=marker,
+                          showlegend=False))
+    fig.update_layout(title=title)
+    if len(keep) < len(x):
+        fig.add_annotation(text=f"{len(keep):,} of {len(x):,} points", xref='paper', yref='paper',
+                           x=1, y=1.05, showarrow=False, font=dict(size=11))
+    return fig
+
+
+def box(quartiles, title=None, color=None, name=None):
+    """Box plot per year from a quartiles table (Year, min, 25%, 50%, 75%, max).
+
+    Whiskers are Tukey fences (1.5 IQR) clipped to the observed min/max;
+    individual outliers aren't drawn since the rows never reach the browser.
+    """
+    quartiles = quartiles.dropna(subset=['25%', '50%', '75%'])
+    q1, q3 = quartiles['25%'].to_numpy(), quartiles['75%'].to_numpy()
+    iqr = q3 - q1
+    fig = go.Figure(go.Box(
+        x=quartiles.iloc[:, 0].to_numpy(), q1=q1, median=quartiles['50%'].to_numpy(), q3=q3,
+        lowerfence=np.maximum(quartiles['min'].to_numpy(), q1 - 1.5 * iqr),
+        upperfence=np.minimum(quartiles['max'].to_numpy(), q3 + 1.5 * iqr),
+        marker=dict(color=color), name=name, showlegend=False))
+    fig.update_layout(title=title)
+    return fig
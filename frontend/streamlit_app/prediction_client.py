@@ -0,0 +1,185 @@
+"""Client for the Flask prediction API, shared by the dashboard and its pages.
+
+One ``requests.Session`` per Streamlit server process keeps connections to
+the API alive between reruns, instead of a new TCP connection per click.
+Every call has connect/read timeouts, and connection errors and 502-504
+responses are retried with exponential backoff (urllib3 ``Retry``).
+
+``predict_many`` scores many (income, year) scenarios at once, e.g. a whole
+list of scenarios: the rows go to ``/predict/batch`` in chunks that are sent
+concurrently over the pooled connections. ``submit`` runs a ``predict_many``
+in the background and returns a Future. For a regular income grid (a chart
+curve), ``sweep`` sends only the range and years to ``/predict/sweep`` and
+gets every curve back from one request.
+
+When the API is unreachable (or keeps failing with 5xx) the client answers
+from the in-process bracket engine instead, marks the result with
+``source='engine'``, and skips the API for ``cooldown`` seconds so reruns
+don't each wait out a connect timeout.
+"""
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from backend.shared import config
+from backend.shared.tax_engine import get_engine, income_grid
+
+# Same label the API reports when it serves the bracket engine
+ENGINE_VERSION = 'tax-engine'
+
+Prediction = namedtuple('Prediction', ['tax', 'model_version', 'source'])
+
+# predicted_tax/computed_tax: arrays of shape (len(years), len(income)), None if not requested
+Sweep = namedtuple('Sweep', ['income', 'years', 'predicted_tax', 'computed_tax', 'model_version', 'source'])
+
+
+class ApiError(Exception):
+    """The API rejected the request (4xx); falling back would hide a bad input."""
+
+
+class PredictionClient:
+    def __init__(self, base_url=None, connect_timeout=None, read_timeout=None, retries=None,
+                 backoff=0.2, pool_size=8, chunk_size=5000, cooldown=10.0):
+        self.base_url = (base_url or config.API_URL).rstrip('/')
+        self.timeout = (connect_timeout or config.API_CONNECT_TIMEOUT, read_timeout or config.API_READ_TIMEOUT)
+        self.chunk_size = chunk_size
+        self.cooldown = cooldown
+        self.pool_size = pool_size
+        self.api_calls = 0
+        self.fallbacks = 0
+        self._down_until = 0.0
+        self._executor = None
+        self._background = None
+        self._lock = threading.Lock()
+
+        retry = Retry(total=config.API_RETRIES if retries is None else retries, backoff_factor=backoff,
+                      status_forcelist=(502, 503, 504), allowed_methods=frozenset({'POST'}),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _count(self, name):
+        # Chunks run on pool threads: `+= 1` on an attribute is not atomic
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _post(self, path, payload):
+        """JSON response of the API, or None if it is unreachable/failing (caller falls back)."""
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            self._count('api_calls')
+            response = self.session.post(self.base_url + path, json=payload, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            self._down_until = time.monotonic() + self.cooldown
+            return None
+        if 400 <= response.status_code < 500:
+            try:
+                message = response.json().get('error', response.text)
+            except ValueError:
+                message = response.text
+            raise ApiError(message)
+        if response.status_code >= 500:
+            self._down_until = time.monotonic() + self.cooldown
+            return None
+        return response.json()
+
+    def predict(self, income, year):
+        """Prediction for one income/year, from the API or else the bracket engine."""
+        body = self._post('/predict', {'income': float(income), 'year': int(year)})
+        if body is None:
+            self._count('fallbacks')
+            # Rounded to cents like the API's answer
+            return Prediction(round(float(get_engine().liability(income, year)), 2), ENGINE_VERSION, 'engine')
+        return Prediction(body['predicted_tax'], body.get('model_version'), 'api')
+
+    def _predict_chunk(self, income, year):
+        body = self._post('/predict/batch', {'income': income.tolist(), 'year': year.tolist()})
+        if body is None:
+            self._count('fallbacks')
+            return np.round(get_engine().liability(income, year), 2), ENGINE_VERSION, 'engine'
+        tax = np.array([np.nan if value is None else value for value in body['predicted_tax']], dtype=np.float64)
+        return tax, body.get('model_version'), 'api'
+
+    def predict_many(self, incomes, years):
+        """Predictions for many scenarios; `years` may be one year or one per income.
+
+        Chunks are sent concurrently. Returns Prediction(tax array, model_version, source),
+        with source 'api', 'engine' or 'mixed' if only some chunks reached the API.
+        """
+        incomes = np.asarray(incomes, dtype=np.float64)
+        years = np.broadcast_to(np.asarray(years, dtype=np.int64), incomes.shape)
+        starts = range(0, len(incomes), self.chunk_size)
+        chunks = [(incomes[i:i + self.chunk_size], years[i:i + self.chunk_size]) for i in starts]
+        if len(chunks) == 1:
+            results = [self._predict_chunk(*chunks[0])]
+        else:
+            results = list(self._pool().map(lambda chunk: self._predict_chunk(*chunk), chunks))
+
+        if not results:
+            return Prediction(np.empty(0), None, 'api')
+        sources = {source for _, _, source in results}
+        versions = [version for _, version, source in results if source == 'api'] or [ENGINE_VERSION]
+        return Prediction(np.concatenate([tax for tax, _, _ in results]), versions[0],
+                          sources.pop() if len(sources) == 1 else 'mixed')
+
+    def sweep(self, income_min, income_max, step, years, mode='both'):
+        """Tax curves over an income grid for each year, from one /predict/sweep request.
+
+        mode: 'model' (predicted), 'engine' (computed) or 'both'.
+        """
+        years = [int(year) for year in np.atleast_1d(years)]
+        body = self._post('/predict/sweep', {'income_min': float(income_min), 'income_max': float(income_max),
+                                             'step': float(step), 'years': years, 'mode': mode})
+        if body is not None:
+            def matrix(key):
+                return np.array(body[key], dtype=np.float64) if key in body else None
+            return Sweep(np.array(body['income']), years, matrix('predicted_tax'), matrix('computed_tax'),
+                         body.get('model_version'), 'api')
+
+        self._count('fallbacks')
+        income = income_grid(float(income_min), float(income_max), float(step))
+        computed = np.round(get_engine().sweep(income, years), 2)
+        return Sweep(income, years, computed if mode != 'engine' else None, computed if mode != 'model' else None,
+                     ENGINE_VERSION, 'engine')
+
+    def submit(self, incomes, years):
+        """Run predict_many in the background; returns a concurrent.futures.Future."""
+        with self._lock:
+            if self._background is None:
+                # Separate from the chunk pool so a background sweep can't wait on its own workers
+                self._background = ThreadPoolExecutor(max_workers=2, thread_name_prefix='predict-bg')
+        return self._background.submit(self.predict_many, incomes, years)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # No more threads than pooled connections, so none wait on the pool
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='predict')
+            return self._executor
+
+    def stats(self):
+        return {'api_calls': self.api_calls, 'fallbacks': self.fallbacks,
+                'api_down': time.monotonic() < self._down_until}
+
+
+_client = None
+
+
+def get_client():
+    """The client for config.API_URL, created once per Streamlit server process."""
+    global _client
+    if _client is None:
+        _client = PredictionClient()
+    return _client
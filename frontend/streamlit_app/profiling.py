@@ -0,0 +1,165 @@
+"""Opt-in timing of the dashboard's render path.
+
+Off by default. Turn it on for every session with ``PROFILE_DASHBOARD=1``
+or for one browser tab with ``?profile=1`` in the URL. Each page wraps its
+sections (data load, aggregates, figure building) in ``profiler.section``;
+``profiler.report()`` at the end of the page shows a per-section timing table
+in the sidebar for the current rerun.
+
+``cprofile`` (or ``pyinstrument``, if installed) instead of ``1`` also
+profiles the whole rerun and writes it to ``PROFILE_DIR``:
+
+    <page>-<timestamp>.prof   load with pstats / snakeviz
+    <page>-<timestamp>.html   pyinstrument's report
+    <page>-<timestamp>.json   the section timings
+
+When profiling is off, ``section`` hands back a shared no-op context manager,
+so the instrumented pages cost nothing extra.
+
+A rerun that ends early (``st.stop()``, a rerun request, an error) never
+reaches ``report()``. Its cProfile would stay enabled for the whole process,
+and from Python 3.12 on no other session could start one, so the next
+``start()`` disables a profiler whose rerun is over first.
+"""
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from backend.shared import config
+
+try:
+    from pyinstrument import Profiler as PyInstrumentProfiler
+except ImportError:  # optional, only needed for PROFILE_DASHBOARD=pyinstrument
+    PyInstrumentProfiler = None
+
+MODES = ('off', 'timing', 'cprofile', 'pyinstrument')
+_OFF_VALUES = ('', '0', 'off', 'false', 'no')
+_NULL_SECTION = contextlib.nullcontext()
+
+# (PageProfiler, script thread) whose cProfile is enabled in this process, if any
+_active = None
+_active_lock = threading.Lock()
+
+
+def _release_stale():
+    """Disable the active cProfile if its rerun ended without report() (or is this thread's)."""
+    global _active
+    with _active_lock:
+        if _active is None:
+            return
+        owner, thread = _active
+        if thread.is_alive() and thread is not threading.current_thread():
+            return  # another session's rerun is still being profiled
+        _active = None
+    owner._profiler.disable()
+
+
+def profile_mode():
+    """The mode for this rerun: the ?profile= query param, else PROFILE_DASHBOARD."""
+    value = st.query_params.get('profile', config.PROFILE_DASHBOARD).strip().lower()
+    if value in _OFF_VALUES:
+        return 'off'
+    return value if value in MODES else 'timing'
+
+
+class PageProfiler:
+    def __init__(self, page, mode):
+        self.page = page
+        self.mode = mode
+        self.sections = {}
+        self._start = time.perf_counter()
+        self._profiler = None
+        if mode == 'pyinstrument' and PyInstrumentProfiler is None:
+            self.mode = 'cprofile'
+        if self.mode == 'cprofile':
+            global _active
+            _release_stale()
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:  # another session's rerun is being profiled
+                self._profiler = None
+            else:
+                with _active_lock:
+                    _active = (self, threading.current_thread())
+        elif self.mode == 'pyinstrument':
+            self._profiler = PyInstrumentProfiler()
+            self._profiler.start()
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    def section(self, name):
+        """Context manager timing one named section (repeated names add up)."""
+        if not self.enabled:
+            return _NULL_SECTION
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds, calls = self.sections.get(name, (0.0, 0))
+            self.sections[name] = (seconds + time.perf_counter() - start, calls + 1)
+
+    def table(self, total):
+        rows = [(name, seconds * 1e3, calls) for name, (seconds, calls) in self.sections.items()]
+        rows.append(('other (widgets, layout)', max(total - sum(s for s, _ in self.sections.values()), 0.0) * 1e3, 1))
+        table = pd.DataFrame(rows, columns=['Section', 'ms', 'Calls'])
+        table['Share %'] = table['ms'] / (total * 1e3) * 100 if total else 0.0
+        return table.round(1)
+
+    def report(self):
+        """Stop profiling this rerun, show the sidebar table and write any dump."""
+        if not self.enabled:
+            return
+        total = time.perf_counter() - self._start
+        table = self.table(total)
+        dumped = self._dump(table, total)
+        with st.sidebar.expander(f"⏱️ Profile: {total * 1e3:,.0f} ms", expanded=True):
+            st.dataframe(table, hide_index=True)
+            if dumped:
+                st.caption(f"Saved to {dumped}")
+
+    def _disable(self):
+        global _active
+        with _active_lock:
+            if _active is not None and _active[0] is self:
+                _active = None
+        self._profiler.disable()
+
+    def _dump(self, table, total):
+        if self._profiler is None:
+            return None
+        os.makedirs(config.PROFILE_DIR, exist_ok=True)
+        slug = ''.join(c if c.isalnum() else '_' for c in self.page.lower())
+        base = os.path.join(config.PROFILE_DIR, f"{slug}-{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10 ** 6:06d}")
+        if self.mode == 'cprofile':
+            self._disable()
+            self._profiler.dump_stats(base + '.prof')
+            path = base + '.prof'
+        else:
+            self._profiler.stop()
+            with open(base + '.html', 'w', encoding='utf-8') as fh:
+                fh.write(self._profiler.output_html())
+            path = base + '.html'
+        with open(base + '.json', 'w', encoding='utf-8') as fh:
+            json.dump({'page': self.page, 'mode': self.mode, 'total_ms': total * 1e3,
+                       'sections': table.to_dict(orient='records')}, fh, indent=2)
+        return path
+
+
+def start(page):
+    """Profiler for this rerun of `page`; a disabled one unless profiling was asked for."""
+    return PageProfiler(page, profile_mode())
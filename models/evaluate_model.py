@@ -1,11 +1,28 @@
-import joblib
-from sklearn.metrics import mean_squared_error
-import pandas as pd
-
-model = joblib.load('model.pkl')
-df = pd.read_pickle('../data/processed/cleaned_tax_data.pkl')
-X_test = df[['year', 'income_bracket']]
-y_test = df['tax_amount']
-predictions = model.predict(X_test)
-mse = mean_squared_error(y_test, predictions)
-print(f"MSE: {mse}")
\ No newline at end of file
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.shared import config
+from backend.shared.evaluation import DEFAULT_CHUNK_ROWS, evaluate
+
+# Score the served model contract ((year, income) -> rate %) on the processed data,
+# chunk by chunk across worker processes (see backend/shared/evaluation.py)
+parser = argparse.ArgumentParser(description='Evaluate the trained model on the processed dataset.')
+parser.add_argument('--model', default=config.MODEL_PATH)
+parser.add_argument('--data', default=config.DATA_PATH)
+parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: all cores)')
+parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+parser.add_argument('--years', type=int, nargs='+', help='only evaluate these years (e.g. a holdout)')
+parser.add_argument('--json', action='store_true', help='print the metrics as JSON')
+args = parser.parse_args()
+
+stats = evaluate(args.model, args.data, chunk_rows=args.chunk_rows, jobs=args.jobs, years=args.years)
+
+if args.json:
+    print(json.dumps(dict(stats.summary(), by_year=stats.by_year().to_dict(orient='records'))))
+else:
+    print(f"Rows: {stats.count:,} ({stats.skipped:,} skipped)")
+    print(f"MSE: {stats.mse:.4f}  RMSE: {stats.rmse:.4f}  MAE: {stats.mae:.4f}  R²: {stats.r2:.4f}")
+    print(stats.by_year().to_string(index=False))
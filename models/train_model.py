@@ -1,31 +1,32 @@
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
-import joblib
 import os
+import sys
 
-# Load processed data
-df = pd.read_pickle('data/processed/cleaned_tax_data.pkl')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.shared.compact_model import save_model
+from backend.shared.schema import FEATURES, TARGET
+from backend.shared.shared_data import read_processed
 
-# Create a target variable 'tax_amount'
-# For simplicity, let's estimate tax_amount as (top_bracket_taxable_income_over * top_bracket_rate_percent / 100)
-df['tax_amount'] = df['top_bracket_taxable_income_over'] * df['top_bracket_rate_percent'] / 100
+# Load processed data (only the columns the model uses)
+df = read_processed(columns=FEATURES + [TARGET]).dropna()
 
-# Features: we can use Year and Bottom Bracket info
-X = df[['year', 'bottom_bracket_rate_percent', 'bottom_bracket_taxable_income_up_to']]
-y = df['tax_amount']
+# Features/target follow the served model contract in backend/shared/schema.py:
+# (year, income) -> effective rate in percent. This replaced the old derived
+# tax_amount target on three features; see docs/ml_model_details.md
+X = df[FEATURES]
+y = df[TARGET]
 
 # Split data
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-# Train model
-model = RandomForestRegressor(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
+# Train model on all cores (scripts/search_models.py tunes these settings)
+model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
+model.fit(X_train.to_numpy(), y_train)
+# Single-row /predict calls are faster without a thread pool
+model.set_params(n_jobs=1)
 
-# Ensure model folder exists
-os.makedirs('models', exist_ok=True)
-
-# Save trained model
-joblib.dump(model, 'models/model.pkl')
+# Save trained model, plus its NumPy export for the API (models/model_compact/)
+save_model(model, 'models/model.pkl')
 
 print("Model trained and saved to models/model.pkl")
@@ -1,28 +1,86 @@
-import pandas as pd
+import argparse
 import os
+import sys
+import time
 
-# Ensure processed folder exists
-os.makedirs('data/processed', exist_ok=True)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.shared import config, incremental, shared_data
+from backend.shared.schema import DEFAULT_CHUNK_BYTES, read_raw_chunks
+from backend.shared.storage import ProcessedWriter
 
-# Load CSV with correct delimiter
-df = pd.read_csv('data/raw/tax_data.csv', sep=';')
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
-# Drop completely empty columns (like the extra ;; at the end)
-df = df.dropna(axis=1, how='all')
 
-# Optional: normalize column names
-df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_').str.replace('%', 'percent')
+def peak_rss_mb():
+    if resource is None:
+        return float('nan')
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
 
-# Example: convert numeric columns to float
-numeric_cols = ['bottom_bracket_rate_percent', 
-                'bottom_bracket_taxable_income_up_to', 
-                'top_bracket_rate_percent', 
-                'top_bracket_taxable_income_over']
-for col in numeric_cols:
-    df[col] = df[col].astype(float)
 
-# Save processed data as pickle
-pickle_path = 'data/processed/cleaned_tax_data.pkl'
-df.to_pickle(pickle_path)
+def run(input_path, output_path=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Stream input_path (one CSV or a list of them) into the processed store. Returns (path, rows).
 
-print(f"Data processed successfully. Pickle saved at: {pickle_path}")
+    Memory use is bounded by chunk_bytes of input, not by the size of the file.
+    Reading and cleaning (fixed names/dtypes, no sniffing, no trailing ';;'
+    columns) is done by backend/shared/schema.py.
+    """
+    inputs = [input_path] if isinstance(input_path, str) else input_path
+    start = time.perf_counter()
+    with ProcessedWriter(output_path) as writer:
+        chunks = (chunk for path in inputs for chunk in read_raw_chunks(path, chunk_bytes))
+        for i, chunk in enumerate(chunks):
+            writer.write(chunk)
+            elapsed = time.perf_counter() - start
+            print(f"  chunk {i + 1}: {writer.rows:,} rows | {writer.rows / elapsed:,.0f} rows/s "
+                  f"| peak RSS {peak_rss_mb():,.1f} MB")
+    path = writer.path
+
+    elapsed = time.perf_counter() - start
+    print(f"Data processed successfully. Saved at: {path}")
+    print(f"{writer.rows:,} rows in {elapsed:.2f}s ({writer.rows / max(elapsed, 1e-9):,.0f} rows/s), "
+          f"peak RSS {peak_rss_mb():,.1f} MB")
+    return path, writer.rows
+
+
+def run_incremental(input_paths, output_path=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Reprocess only the inputs/years that changed since the last run. Returns (path, rows).
+
+    See backend/shared/incremental.py for the manifest and merge rules.
+    """
+    inputs = [input_paths] if isinstance(input_paths, str) else input_paths
+    start = time.perf_counter()
+    result = incremental.update(inputs, output_path, chunk_bytes)
+    elapsed = time.perf_counter() - start
+
+    if not result.reprocessed:
+        print(f"Processed data is up to date ({result.rows:,} rows): {result.path}")
+    else:
+        years = result.changed_years
+        span = f"{len(years)} year(s) {years[0]}-{years[-1]}" if years else "no years"
+        print(f"Reprocessed {len(result.reprocessed)} of {len(inputs)} input file(s), {span} changed.")
+        print(f"Data processed successfully. Saved at: {result.path}")
+    print(f"{result.rows:,} rows in {elapsed:.2f}s, peak RSS {peak_rss_mb():,.1f} MB")
+    return result.path, result.rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Clean the raw tax CSV into the processed store.')
+    parser.add_argument('--input', nargs='+', default=[config.RAW_DATA_PATH], help='raw ;-delimited CSV file(s)')
+    parser.add_argument('--output', default=config.DATA_PATH, help='processed file (.parquet, .feather or .pkl)')
+    parser.add_argument('--chunk-mb', type=float, default=DEFAULT_CHUNK_BYTES / (1 << 20),
+                        help='input megabytes per chunk')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only reprocess input files/years that changed since the last run')
+    parser.add_argument('--publish', nargs='?', const=config.SHARED_DATA_PATH,
+                        help='then publish the result for zero-copy sharing (default SHARED_DATA_PATH)')
+    args = parser.parse_args()
+    pipeline = run_incremental if args.incremental else run
+    path, _ = pipeline(args.input, args.output, int(args.chunk_mb * (1 << 20)))
+    if args.publish:
+        header = shared_data.publish(args.publish, path)
+        print(f"Published version {header['version']} ({header['rows']:,} rows) to {args.publish}")
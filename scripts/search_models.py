@@ -0,0 +1,252 @@
+"""Hyperparameter search with k-fold cross-validation across a process pool.
+
+    python scripts/search_models.py --folds 5 --jobs -1
+    python scripts/search_models.py --search random --n-iter 20 --grid grid.json --save-best models/model.pkl
+
+Candidates are (model family, params) pairs from a grid (all combinations) or
+a random sample of it. The features/target are read once, converted to float64
+arrays and saved next to the fold assignment in a cache directory; loky workers
+memory-map them, so no candidate re-reads, re-cleans or re-pickles the data.
+
+Folds are evaluated in rounds: every surviving candidate runs fold k in
+parallel, then candidates whose mean error so far is more than --prune-ratio
+times the best are dropped (after --min-folds folds), so clearly bad settings
+stop early instead of running every fold.
+
+The leaderboard (CSV) has one row per candidate: CV MSE (mean/std), mean fit
+time per fold, batch predict time per row and single-row predict latency,
+which is what the API pays per /predict call.
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.shared.compact_model import save_model
+from backend.shared.schema import FEATURES, TARGET
+from backend.shared.shared_data import read_processed
+
+FAMILIES = {
+    'linear': LinearRegression,
+    'ridge': Ridge,
+    'random_forest': RandomForestRegressor,
+    'gradient_boosting': GradientBoostingRegressor,
+    'hist_gradient_boosting': HistGradientBoostingRegressor,
+}
+
+# family -> {param: [values]}; override with --grid path/to/grid.json
+DEFAULT_GRID = {
+    'linear': {},
+    'ridge': {'alpha': [0.1, 1.0, 10.0]},
+    'random_forest': {'n_estimators': [50, 100, 200], 'max_depth': [None, 8], 'min_samples_leaf': [1, 3]},
+    'gradient_boosting': {'n_estimators': [100, 300], 'learning_rate': [0.05, 0.1], 'max_depth': [2, 3]},
+    'hist_gradient_boosting': {'max_iter': [100, 300], 'learning_rate': [0.05, 0.1]},
+}
+
+# Families that accept random_state get a fixed one so runs are reproducible
+SEEDED = ('random_forest', 'gradient_boosting', 'hist_gradient_boosting')
+
+LATENCY_REPEATS = 20
+
+
+def candidates(grid, strategy='grid', n_iter=20, seed=42):
+    """[(family, params)] for every combination in `grid`, or a random sample of n_iter of them."""
+    unknown = set(grid) - set(FAMILIES)
+    if unknown:
+        raise ValueError(f"Unknown model family: {', '.join(sorted(unknown))}")
+    combos = [(family, params) for family, space in grid.items() for params in ParameterGrid(space)]
+    if strategy == 'random' and n_iter < len(combos):
+        # Sample (family, params) pairs uniformly from the full grid
+        picks = ParameterSampler({'i': list(range(len(combos)))}, n_iter=n_iter, random_state=seed)
+        combos = [combos[pick['i']] for pick in picks]
+    return combos
+
+
+def make_model(family, params, seed=42):
+    model = FAMILIES[family](**params)
+    if family in SEEDED and 'random_state' not in params:
+        model.set_params(random_state=seed)
+    if 'n_jobs' in model.get_params():
+        # Parallelism is across candidates; one core per fit avoids oversubscription
+        model.set_params(n_jobs=1)
+    return model
+
+
+CACHE_FILES = ('X', 'y', 'fold_of')
+
+
+def prepare_cache(df, cache_dir, folds=5, seed=42):
+    """Save X, y and the fold assignment as .npy files the workers memory-map.
+
+    Returns the cache key to pass to evaluate_fold: the directory plus the
+    files' (mtime_ns, size, inode), so a rebuilt or reused directory never
+    matches arrays a reused worker mapped for an earlier search.
+    """
+    X = np.ascontiguousarray(df[FEATURES].to_numpy(dtype=np.float64))
+    y = np.ascontiguousarray(df[TARGET].to_numpy(dtype=np.float64))
+    fold_of = np.empty(len(y), dtype=np.int8)
+    for k, (_, test) in enumerate(KFold(n_splits=folds, shuffle=True, random_state=seed).split(X)):
+        fold_of[test] = k
+    for name, array in zip(CACHE_FILES, (X, y, fold_of)):
+        np.save(os.path.join(cache_dir, f'{name}.npy'), array)
+    stats = [os.stat(os.path.join(cache_dir, f'{name}.npy')) for name in CACHE_FILES]
+    return cache_dir, tuple((stat.st_mtime_ns, stat.st_size, stat.st_ino) for stat in stats)
+
+
+# One search's arrays per worker at a time: a new key releases the previous mappings
+@functools.lru_cache(maxsize=1)
+def _arrays(cache):
+    # Once per worker process and search; every later candidate reuses the mapped arrays
+    return tuple(np.load(os.path.join(cache[0], f'{name}.npy'), mmap_mode='r') for name in CACHE_FILES)
+
+
+@functools.lru_cache(maxsize=32)
+def _split(cache, fold):
+    fold_of = _arrays(cache)[2]
+    return np.flatnonzero(fold_of != fold), np.flatnonzero(fold_of == fold)
+
+
+def evaluate_fold(cache, family, params, fold, seed=42):
+    """Fit on every fold but `fold`, score on `fold`. Runs in a worker process.
+
+    cache: the key prepare_cache returned.
+    """
+    X, y, _ = _arrays(cache)
+    train, test = _split(cache, fold)
+    model = make_model(family, params, seed)
+
+    start = time.perf_counter()
+    model.fit(X[train], y[train])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictions = model.predict(X[test])
+    predict_time = time.perf_counter() - start
+
+    one = X[test[:1]]
+    latencies = []
+    for _ in range(LATENCY_REPEATS):
+        start = time.perf_counter()
+        model.predict(one)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        'mse': float(np.mean((y[test] - predictions) ** 2)),
+        'fit_time': fit_time,
+        'predict_per_row': predict_time / max(len(test), 1),
+        'latency': float(np.median(latencies)),
+    }
+
+
+def search(df, grid=None, strategy='grid', n_iter=20, folds=5, jobs=-1, prune_ratio=2.0, min_folds=1, seed=42,
+           cache_dir=None):
+    """Cross-validate every candidate and return the leaderboard, best first.
+
+    prune_ratio: after min_folds folds, drop candidates whose mean MSE so far is
+    more than prune_ratio x the best; None disables early stopping.
+    """
+    combos = candidates(grid or DEFAULT_GRID, strategy, n_iter, seed)
+    results = [[] for _ in combos]
+    pruned_at = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = prepare_cache(df, cache_dir or tmp, folds, seed)
+        alive = list(range(len(combos)))
+        with joblib.Parallel(n_jobs=jobs, backend='loky') as parallel:
+            for fold in range(folds):
+                scores = parallel(joblib.delayed(evaluate_fold)(cache, *combos[i], fold, seed) for i in alive)
+                for i, score in zip(alive, scores):
+                    results[i].append(score)
+                if prune_ratio is None or fold + 1 < min_folds or fold + 1 == folds:
+                    continue
+                means = {i: np.mean([r['mse'] for r in results[i]]) for i in alive}
+                cutoff = min(means.values()) * prune_ratio
+                for i in alive:
+                    if means[i] > cutoff:
+                        pruned_at[i] = fold + 1
+                alive = [i for i in alive if i not in pruned_at]
+
+    rows = []
+    for i, (family, params) in enumerate(combos):
+        mse = np.array([r['mse'] for r in results[i]])
+        rows.append({
+            'family': family,
+            'params': json.dumps(params, sort_keys=True),
+            'status': 'pruned' if i in pruned_at else 'complete',
+            'folds': len(mse),
+            'cv_mse': mse.mean(),
+            'cv_mse_std': mse.std(),
+            'cv_rmse': np.sqrt(mse.mean()),
+            'fit_time_s': np.mean([r['fit_time'] for r in results[i]]),
+            'predict_us_per_row': 1e6 * np.mean([r['predict_per_row'] for r in results[i]]),
+            'predict_latency_ms': 1e3 * np.median([r['latency'] for r in results[i]]),
+        })
+    board = pd.DataFrame(rows)
+    # Complete candidates first; a pruned one's partial mean is not comparable
+    order = np.lexsort((board['cv_mse'].to_numpy(), (board['status'] == 'pruned').to_numpy()))
+    board = board.iloc[order].reset_index(drop=True)
+    board.insert(0, 'rank', range(1, len(board) + 1))
+    return board
+
+
+def fit_best(df, board, seed=42):
+    """Refit the top leaderboard candidate on all rows (all cores), ready to serve."""
+    best = board.iloc[0]
+    model = make_model(best['family'], json.loads(best['params']), seed)
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=-1)
+    model.fit(df[FEATURES].to_numpy(), df[TARGET].to_numpy())
+    if 'n_jobs' in model.get_params():
+        # Single-row /predict calls are faster without a thread pool
+        model.set_params(n_jobs=1)
+    return model
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cross-validated hyperparameter search over model families.')
+    parser.add_argument('--data', default=None, help='processed dataset (default: config.DATA_PATH)')
+    parser.add_argument('--grid', default=None, help='JSON file {family: {param: [values]}}')
+    parser.add_argument('--search', choices=('grid', 'random'), default='grid')
+    parser.add_argument('--n-iter', type=int, default=20, help='candidates to sample with --search random')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=-1, help='worker processes (-1: all cores)')
+    parser.add_argument('--prune-ratio', type=float, default=2.0,
+                        help='drop candidates worse than this x the best so far (0 disables)')
+    parser.add_argument('--min-folds', type=int, default=1, help='folds before a candidate can be pruned')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--leaderboard', default=os.path.join('models', 'leaderboard.csv'))
+    parser.add_argument('--save-best', default=None, help='refit the best candidate and save it here')
+    args = parser.parse_args()
+
+    grid = None
+    if args.grid:
+        with open(args.grid) as fh:
+            grid = json.load(fh)
+
+    df = read_processed(args.data, columns=FEATURES + [TARGET]).dropna()
+    start = time.perf_counter()
+    board = search(df, grid, args.search, args.n_iter, args.folds, args.jobs,
+                   args.prune_ratio or None, args.min_folds, args.seed)
+    print(f"Evaluated {len(board)} candidates x {args.folds} folds in {time.perf_counter() - start:.1f}s "
+          f"({(board['status'] == 'pruned').sum()} pruned early)")
+    print(board.head(10).to_string(index=False))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.leaderboard)), exist_ok=True)
+    board.to_csv(args.leaderboard, index=False)
+    print(f"Leaderboard saved to {args.leaderboard}")
+
+    if args.save_best:
+        model = fit_best(df, board, args.seed)
+        save_model(model, args.save_best)
+        print(f"Best model ({board.iloc[0]['family']} {board.iloc[0]['params']}) saved to {args.save_best}")
@@ -1,51 +1,55 @@
 import os
-import pandas as pd
-import joblib
+import sys
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.shared import config, incremental
+from backend.shared.compact_model import save_model
+from backend.shared.schema import FEATURES, TARGET
+from backend.shared.shared_data import read_processed
+
 # ✅ Paths
-raw_data_path = os.path.join("data", "raw", "tax_data.csv")
-processed_dir = os.path.join("data", "processed")
+raw_data_path = config.RAW_DATA_PATH
 model_dir = "models"
-processed_path = os.path.join(processed_dir, "cleaned_tax_data.pkl")
 model_path = os.path.join(model_dir, "model.pkl")
 
 # ✅ Ensure directories exist
-os.makedirs(processed_dir, exist_ok=True)
 os.makedirs(model_dir, exist_ok=True)
 
 # ✅ Load raw data
 if not os.path.exists(raw_data_path):
     raise FileNotFoundError(f"❌ Data file not found at: {raw_data_path}")
 
+# ✅ Update cleaned data (only files/years that changed since the last run are reprocessed)
 print("📂 Loading data from:", raw_data_path)
-df = pd.read_csv(raw_data_path, sep=';')
+result = incremental.update([raw_data_path])
+if result.reprocessed:
+    print(f"✅ Cleaned data saved to: {result.path} ({len(result.changed_years)} year(s) changed)")
+else:
+    print(f"✅ Cleaned data up to date: {result.path}")
 
 # ✅ Basic cleaning — drop missing values
-df = df.dropna(subset=["Year", "Bottom Bracket Taxable Income up to", "Bottom Bracket Rate %"])
-
-# ✅ Save cleaned data
-df.to_pickle(processed_path)
-print(f"✅ Cleaned data saved to: {processed_path}")
+df = read_processed(result.path, columns=FEATURES + [TARGET]).dropna()
 
 # ✅ Features and target
-X = df[["Year", "Bottom Bracket Taxable Income up to"]]
-y = df["Bottom Bracket Rate %"]
+X = df[FEATURES]
+y = df[TARGET]
 
 # ✅ Train-test split
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
 # ✅ Train model
+# Fit on plain arrays: the API feeds (year, income) rows in this column order (see backend/shared/model_registry.py)
 model = LinearRegression()
-model.fit(X_train, y_train)
+model.fit(X_train.to_numpy(), y_train)
 
 # ✅ Evaluate
-predictions = model.predict(X_test)
+predictions = model.predict(X_test.to_numpy())
 mse = mean_squared_error(y_test, predictions)
 print(f"📊 Model trained successfully | MSE = {mse:.4f}")
 
-# ✅ Save trained model
-joblib.dump(model, model_path)
+# ✅ Save trained model (+ NumPy export for the API, see backend/shared/compact_model.py)
+save_model(model, model_path)
 print(f"✅ Model saved successfully to: {model_path}")
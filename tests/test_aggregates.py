@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from backend.shared.aggregates import build_aggregates, load_or_build
+
+
+def _frame(years):
+    rng = np.random.default_rng(0)
+    n = len(years)
+    return pd.DataFrame({
+        'Year': np.asarray(years, dtype=np.int64),
+        'Bottom Bracket Rate %': rng.uniform(1, 20, n),
+        'Top Bracket Rate %': rng.uniform(20, 90, n),
+    })
+
+
+def test_aggregates_match_pandas():
+    """Test stored summaries match the groupby/corr/describe the pages used to run"""
+    df = _frame(np.repeat(np.arange(2000, 2010), 5))
+    store, changed = build_aggregates(df)
+    assert changed == list(range(2000, 2010))
+
+    expected = df.groupby('Year')['Bottom Bracket Rate %'].mean()
+    assert np.allclose(store.year_means('Bottom Bracket Rate %')['Bottom Bracket Rate %'], expected)
+    assert np.allclose(store.yoy('Bottom Bracket Rate %')['YoY Change'][1:], expected.pct_change()[1:])
+    assert np.allclose(store.corr(), df.corr())
+    pd.testing.assert_frame_equal(store.describe(), df.describe())
+    pd.testing.assert_frame_equal(store.describe(2003), df[df['Year'] == 2003].describe(), check_names=False)
+    quartiles = store.year_quartiles('Top Bracket Rate %').set_index('Year')
+    assert np.allclose(quartiles['50%'], df.groupby('Year')['Top Bracket Rate %'].median())
+
+
+def test_aggregates_rebuild_only_new_years(tmp_path):
+    """Test appending a year recomputes just that year and persists the store"""
+    df = _frame(np.repeat(np.arange(2000, 2010), 5))
+    path = str(tmp_path / 'agg.pkl')
+    load_or_build(df[df['Year'] < 2009], path)
+
+    previous = pd.read_pickle(path)
+    store, changed = build_aggregates(df, previous)
+    assert changed == [2009]
+    assert np.allclose(store.corr(), df.corr())
+
+    assert build_aggregates(df, store) == (store, [])
@@ -0,0 +1,64 @@
+import sqlite3
+
+import numpy as np
+
+from backend.shared.audit_log import AuditLog
+
+
+def _rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute('SELECT endpoint, income, year, predicted_tax, model_version, cached '
+                            'FROM prediction_log ORDER BY id').fetchall()
+
+
+def test_records_are_written_in_batches(tmp_path):
+    """Test the writer thread bulk-inserts buffered records into a WAL database"""
+    path = str(tmp_path / 'audit.db')
+    log = AuditLog(path, batch_size=4, flush_interval=60)
+    for i in range(10):
+        assert log.record('predict', 1000.0 * i, 2020, 10.0 * i, 'v1', 0.5, cached=i % 2)
+    assert log.record_many('predict/batch', np.array([1.0, 2.0]), np.array([2019, 2018]), np.array([0.1, 0.2]),
+                           'v1', 2.0) == 2
+    assert log.flush()
+
+    rows = _rows(path)
+    assert len(rows) == 12 and rows[3] == ('predict', 3000.0, 2020, 30.0, 'v1', 1)
+    assert rows[-1] == ('predict/batch', 2.0, 2018, 0.2, 'v1', 0)
+    stats = log.stats()
+    assert stats['written'] == 12 and stats['queued'] == 0 and stats['dropped'] == 0 and stats['batches'] >= 3
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    log.close()
+
+
+def test_full_buffer_drops_or_blocks(tmp_path):
+    """Test a full buffer drops with counters, or waits for the writer under the block policy"""
+    # batch_size above maxsize and a long interval: the writer never wakes up on its own
+    dropping = AuditLog(str(tmp_path / 'drop.db'), maxsize=3, batch_size=100, flush_interval=60)
+    results = [dropping.record('predict', 1.0, 2020, 0.1, 'v1', 0.1) for _ in range(5)]
+    assert results == [True, True, True, False, False]
+    assert dropping.record_many('predict/batch', [1.0] * 4, [2020] * 4, [0.1] * 4, 'v1', 1.0) == 0
+    assert dropping.stats()['dropped'] == 6
+    assert dropping.flush() and len(_rows(dropping.path)) == 3
+
+    blocking = AuditLog(str(tmp_path / 'block.db'), maxsize=2, batch_size=100, flush_interval=60,
+                        full_policy='block', block_timeout=5.0)
+    results = [blocking.record('predict', 1.0, 2020, 0.1, 'v1', 0.1) for _ in range(4)]
+    assert results == [True] * 4
+    assert blocking.stats()['blocked'] >= 1 and blocking.stats()['dropped'] == 0
+    assert blocking.flush() and len(_rows(blocking.path)) == 4
+
+
+def test_unwritable_path_counts_failures_and_keeps_writer(tmp_path):
+    """Test a database that can't be created fails rows without killing the writer or filling the buffer"""
+    blocker = tmp_path / 'file'
+    blocker.write_text('not a directory')
+    log = AuditLog(str(blocker / 'sub' / 'audit.db'), maxsize=5, batch_size=2, flush_interval=60,
+                   full_policy='block', block_timeout=5.0)
+    for _ in range(20):
+        assert log.record('predict', 1.0, 2020, 0.1, 'v1', 0.1)
+    assert log.flush(timeout=5)
+    stats = log.stats()
+    assert stats['failed'] == 20 and stats['written'] == 0 and stats['queued'] == 0 and stats['dropped'] == 0
+    assert log._thread.is_alive()
+    log.close()
@@ -0,0 +1,26 @@
+from benchmarks import run_suite
+
+
+def test_run_suite_and_compare():
+    """Test the suite runs at a small size and flags slower benchmarks."""
+    results = run_suite.run_suite([100], repeat=1, only=['clean', 'predict'], log=lambda line: None)
+    names = {r['name'] for r in results}
+    assert {'clean.load_raw', 'clean.clean_frame', 'predict.single', 'predict.batch'} <= names
+    assert all(r['min_s'] > 0 for r in results)
+
+    current = run_suite.report(results)
+    baseline = {'commit': 'old', 'results': [dict(r, median_s=r['median_s'] / 2) for r in results]}
+    assert len(run_suite.compare(current, baseline, threshold=1.5, log=lambda line: None)) == len(results)
+    assert run_suite.compare(current, current, threshold=1.5, log=lambda line: None) == []
+
+
+def test_dashboard_start_skips_heavy_imports(tmp_path, monkeypatch):
+    """Test the API, the dashboard Home page and Model Evaluation start without sklearn, joblib or requests"""
+    from benchmarks import bench_startup
+    monkeypatch.setenv('DATA_PATH', str(tmp_path / 'cleaned_tax_data.parquet'))  # keep caches out of the repo
+    monkeypatch.setenv('MODEL_PATH', str(tmp_path / 'model.pkl'))
+    results = bench_startup.run(['api', 'dashboard', 'page.model_evaluation'], repeat=1, log=lambda line: None)
+    assert results['api']['forbidden'] == []
+    assert results['dashboard']['forbidden'] == []
+    assert results['page.model_evaluation']['forbidden'] == []
+    assert results['dashboard']['import_ms'] > 0
@@ -0,0 +1,64 @@
+import joblib
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from backend.shared import compact_model
+from backend.shared.compact_model import CompactModel
+from backend.shared.model_registry import ModelRegistry
+
+
+def _data(rows=300):
+    rng = np.random.default_rng(0)
+    X = np.column_stack((rng.integers(1913, 2021, rows), rng.uniform(0, 1e6, rows)))
+    y = 10 + (X[:, 0] - 1913) / 5 + X[:, 1] / 1e5 + rng.normal(0, 1, rows)
+    return X, y
+
+
+def test_compact_predictions_match_sklearn(monkeypatch):
+    """Test the NumPy export predicts what the sklearn model predicts"""
+    X, y = _data()
+    probe = _data(2000)[0]
+    models = [LinearRegression(), RandomForestRegressor(20, random_state=0),
+              GradientBoostingRegressor(n_estimators=20, random_state=0)]
+    for model in models:
+        model.fit(X, y)
+        compact = CompactModel(*compact_model.to_arrays(model))
+        assert np.allclose(compact.predict(probe), model.predict(probe))
+        assert np.allclose(compact.predict(probe[:1]), model.predict(probe[:1]))
+
+    # Without the lookup grid, forests fall back to walking the node arrays
+    monkeypatch.setattr(compact_model, 'MAX_GRID_CELLS', 0)
+    meta, arrays = compact_model.to_arrays(models[1])
+    assert 'grid' not in arrays
+    assert np.allclose(CompactModel(meta, arrays).predict(probe), models[1].predict(probe))
+
+
+def test_registry_serves_matching_export_only(tmp_path):
+    """Test the registry uses the compact export only when it came from the same pickle"""
+    X, y = _data()
+    path = str(tmp_path / 'model.pkl')
+    model = RandomForestRegressor(10, random_state=0).fit(X, y)
+    compact_model.save_model(model, path)
+
+    loaded = ModelRegistry(path).load()
+    assert isinstance(loaded.model, CompactModel)
+    assert np.allclose(loaded.model.predict(X[:5]), model.predict(X[:5]))
+
+    # A pickle written without re-exporting must not be paired with the old export
+    joblib.dump(LinearRegression().fit(X, y), path)
+    assert not isinstance(ModelRegistry(path).load().model, CompactModel)
+
+
+def test_meta_carries_feature_importances(tmp_path):
+    """Test the export records feature_importances_ for forests and nothing for linear models"""
+    X, y = _data()
+    path = str(tmp_path / 'model.pkl')
+    model = RandomForestRegressor(10, random_state=0).fit(X, y)
+    compact_model.save_model(model, path)
+    meta = compact_model.read_meta(compact_model.compact_path(path))
+    assert np.allclose(meta['feature_importances'], model.feature_importances_)
+    assert compact_model.read_meta(compact_model.compact_path(path), source_digest='other') is None
+
+    meta, _ = compact_model.to_arrays(LinearRegression().fit(X, y))
+    assert 'feature_importances' not in meta
@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'frontend', 'streamlit_app'))
+
+import data_loader
+from backend.shared import config
+
+
+def test_raw_data_is_cleaned_and_cached():
+    """Test the raw CSV is read and cleaned once, then served from cache"""
+    before = data_loader.cache_stats().get('raw', {'hits': 0, 'misses': 0})
+    first = data_loader.load_raw_data(config.RAW_DATA_PATH)
+    second = data_loader.load_raw_data(config.RAW_DATA_PATH)
+    after = data_loader.cache_stats()['raw']
+
+    assert first['Top Bracket Rate %'].dtype == float
+    assert after['hits'] + after['misses'] == before['hits'] + before['misses'] + 2
+    assert after['misses'] <= before['misses'] + 1
+    assert second.equals(first)
+
+
+def test_loaded_frames_do_not_share_mutations():
+    """Test pages can modify their frame without touching the cache"""
+    first = data_loader.load_raw_data(config.RAW_DATA_PATH)
+    first['Year'] = 0
+    first.loc[first.index[0], 'Top Bracket Rate %'] = -1.0
+    second = data_loader.load_raw_data(config.RAW_DATA_PATH)
+    assert (second['Year'] > 0).all()
+    assert (second['Top Bracket Rate %'] >= 0).all()
+
+
+def test_changed_file_is_reloaded(tmp_path):
+    """Test a new mtime invalidates the cached frame"""
+    path = tmp_path / 'tax_data.csv'
+    header = 'Year;Bottom Bracket Rate %;Bottom Bracket Taxable Income up to;Top Bracket Rate %;Top Bracket Taxable Income Over;;\n'
+    path.write_text(header + '2020;10;19400;37;622050;;\n')
+    assert len(data_loader.load_raw_data(str(path))) == 1
+
+    path.write_text(header + '2020;10;19400;37;622050;;\n2021;10;19900;37;628300;;\n')
+    os.utime(path, ns=(os.stat(path).st_mtime_ns + 10**9,) * 2)
+    assert len(data_loader.load_raw_data(str(path))) == 2
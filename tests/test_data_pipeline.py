@@ -0,0 +1,16 @@
+import pandas as pd
+
+from backend.shared import config, schema
+from scripts import data_pipeline
+
+
+def test_chunked_run_matches_single_chunk(tmp_path):
+    """Test tiny chunks produce the same processed data as one big chunk"""
+    small, rows = data_pipeline.run(config.RAW_DATA_PATH, str(tmp_path / 'small.parquet'), chunk_bytes=256)
+    whole, _ = data_pipeline.run(config.RAW_DATA_PATH, str(tmp_path / 'whole.parquet'), chunk_bytes=1 << 20)
+
+    df = pd.read_parquet(small)
+    assert rows == 109
+    assert df.columns.tolist() == schema.COLUMNS
+    assert df.notna().all().all()
+    pd.testing.assert_frame_equal(df, pd.read_parquet(whole))
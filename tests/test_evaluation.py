@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from backend.shared import evaluation, storage
+from backend.shared.compact_model import save_model
+from backend.shared.evaluation import ErrorStats
+from backend.shared.schema import FEATURES, TARGET, YEAR
+
+
+def _data(rows):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({YEAR: rng.integers(1990, 2000, rows),
+                       FEATURES[1]: rng.uniform(0, 1e5, rows)})
+    df[TARGET] = 10 + (df[YEAR] - 1990) / 2 + df[FEATURES[1]] / 1e4 + rng.normal(0, 2, rows)
+    return df
+
+
+def test_merged_chunks_match_full_arrays():
+    """Test stats folded chunk by chunk and merged equal the metrics of the whole arrays"""
+    rng = np.random.default_rng(1)
+    year = rng.integers(2000, 2005, 5000)
+    actual = rng.uniform(0, 40, 5000)
+    predicted = actual + rng.normal(0, 3, 5000)
+
+    parts = [ErrorStats(sample_size=100).update(year[i:i + 700], actual[i:i + 700], predicted[i:i + 700], rng)
+             for i in range(0, 5000, 700)]
+    total = ErrorStats(sample_size=100)
+    for part in reversed(parts):
+        total.merge(part)
+
+    error = actual - predicted
+    assert total.count == 5000
+    assert total.mse == pytest.approx(np.mean(error ** 2))
+    assert total.mae == pytest.approx(np.mean(np.abs(error)))
+    assert total.r2 == pytest.approx(1 - np.sum(error ** 2) / np.sum((actual - actual.mean()) ** 2))
+    counts = np.histogram(error, bins=evaluation.RESIDUAL_EDGES)[0]
+    assert (total.hist[1:-1] == counts).all() and total.hist.sum() == 5000
+    by_year = total.by_year().set_index(YEAR)
+    assert by_year.loc[2003, 'mse'] == pytest.approx(np.mean(error[year == 2003] ** 2))
+    sample_actual, sample_predicted = total.sample()
+    assert len(sample_actual) == 100 and np.isin(sample_actual, actual).all()
+
+
+def test_evaluate_is_the_same_for_any_chunking(tmp_path, monkeypatch):
+    """Test evaluate over row groups and chunks agrees with predicting every row at once"""
+    df = _data(3000)
+    df.loc[5, TARGET] = np.nan
+    data_path = str(tmp_path / 'data.parquet')
+    model_path = str(tmp_path / 'model.pkl')
+    monkeypatch.setattr(storage, 'ROW_GROUP_SIZE', 1000)
+    storage.write_processed(df, data_path)
+    model = LinearRegression().fit(df[FEATURES].to_numpy()[:1000], df[TARGET].fillna(0).to_numpy()[:1000])
+    save_model(model, model_path)
+
+    clean = df.dropna()
+    error = clean[TARGET].to_numpy() - model.predict(clean[FEATURES].to_numpy())
+    inline = evaluation.evaluate(model_path, data_path, chunk_rows=256, jobs=1)
+    pooled = evaluation.evaluate(model_path, data_path, chunk_rows=1000, jobs=2)
+
+    assert storage.count_parts(data_path) == 3
+    for stats in (inline, pooled):
+        assert stats.count == 2999 and stats.skipped == 1
+        assert stats.mse == pytest.approx(np.mean(error ** 2))
+    assert (inline.hist == pooled.hist).all()
+
+    holdout = evaluation.evaluate(model_path, data_path, jobs=1, years=[1995])
+    assert holdout.by_year()[YEAR].tolist() == [1995]
@@ -1,3 +1,7 @@
+import json
+
+import pytest
+
 from backend.flask_api import app
 
 def test_predict():
@@ -26,3 +30,187 @@ def test_predict_invalid_types():
     json_data = response.get_json()
     assert 'error' in json_data
     assert json_data['error'] == 'Invalid input type — income must be numeric, year must be integer'
+
+def test_predict_batch_rejects_out_of_range_rows():
+    """Test huge years and incomes become row errors instead of wrapped years or Infinity"""
+    client = app.test_client()
+    rows = [{'income': 5e4, 'year': 1e20}, {'income': 5e4, 'year': 10 ** 30}, {'income': 1e308, 'year': 2017},
+            {'income': 5e4, 'year': 2017}]
+    response = client.post('/predict/batch', json=rows)
+    assert response.status_code == 200
+    body = json.loads(response.data, parse_constant=lambda name: pytest.fail(f'{name} in response'))
+    assert body['predicted_tax'][:3] == [None] * 3 and body['predicted_tax'][3] is not None
+    assert [error['row'] for error in body['errors']] == [0, 1, 2]
+    assert client.post('/predict', json={'income': 1e308, 'year': 2017}).status_code == 400
+
+def test_predict_batch_json_array():
+    """Test batch prediction with a JSON array and per-row errors"""
+    client = app.test_client()
+    rows = [{'income': 50000, 'year': 2020}, {'income': 'abc', 'year': 2020}, {'income': 1000}]
+    response = client.post('/predict/batch', json=rows)
+    assert response.status_code == 200
+    json_data = response.get_json()
+    assert json_data['count'] == 3
+    assert json_data['failed'] == 2
+    assert isinstance(json_data['predicted_tax'][0], (float, int))
+    assert json_data['predicted_tax'][1] is None
+    assert json_data['errors'] == [
+        {'row': 1, 'error': 'Invalid input type — income must be numeric, year must be integer'},
+        {'row': 2, 'error': 'Missing required fields: income and year'},
+    ]
+
+def test_predict_batch_columnar_formats():
+    """Test columnar JSON, NDJSON and CSV payloads give the same answer"""
+    client = app.test_client()
+    columnar = client.post('/predict/batch', json={'income': [50000, 120000], 'year': [2020, 2019]})
+    ndjson = client.post('/predict/batch', content_type='application/x-ndjson',
+                         data='{"income": 50000, "year": 2020}\n{"income": 120000, "year": 2019}\n')
+    csv = client.post('/predict/batch', content_type='text/csv',
+                      data='income,year\n50000,2020\n120000,2019\n')
+    expected = columnar.get_json()['predicted_tax']
+    assert len(expected) == 2
+    assert ndjson.get_json()['predicted_tax'] == expected
+    assert csv.get_json()['predicted_tax'] == expected
+
+def test_predict_batch_malformed():
+    """Test a payload that cannot be parsed at all"""
+    client = app.test_client()
+    response = client.post('/predict/batch', data='not json', content_type='application/json')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+def test_tax_endpoint():
+    """Test the bracket-engine tax endpoint"""
+    client = app.test_client()
+    response = client.post('/tax', json={'income': 10000, 'year': 2020})
+    assert response.status_code == 200
+    json_data = response.get_json()
+    assert json_data['computed_tax'] == 1000.0
+    assert json_data['marginal_rate'] == 10.0
+
+def test_tax_rejects_invalid_scalars():
+    """Test /tax and /predict reject non-scalar and non-finite inputs with 400"""
+    client = app.test_client()
+    for body in ({'income': [1], 'year': 2017}, {'income': 'nan', 'year': 2017}, {'income': 1e400, 'year': 2017},
+                 {'income': 1000, 'year': 'inf'}, {'income': 5e4, 'year': 1e20}, {'income': 5e4, 'year': 10 ** 30},
+                 {'income': 5e4, 'year': -2017}):
+        for route in ('/tax', '/predict'):
+            response = client.post(route, json=body)
+            assert response.status_code == 400, (route, body)
+            assert 'error' in response.get_json()
+
+def test_predict_repeat_is_cached():
+    """Test repeated /predict calls are answered from the result cache"""
+    client = app.test_client()
+    before = client.get('/cache/stats').get_json()
+    first = client.post('/predict', json={'income': 43210, 'year': 2011}).get_json()
+    second = client.post('/predict', json={'income': '43210.00', 'year': '2011'}).get_json()
+    after = client.get('/cache/stats').get_json()
+    assert first == second
+    assert after['enabled'] is True
+    assert after['hits'] == before['hits'] + 1
+    assert 0 < after['hit_ratio'] <= 1
+
+def test_predict_sweep():
+    """Test an income sweep returns columnar curves for every year"""
+    client = app.test_client()
+    response = client.post('/predict/sweep', json={'income_min': 0, 'income_max': 100000, 'step': 25000,
+                                                  'years': [2019, 2020], 'mode': 'both'})
+    assert response.status_code == 200
+    json_data = response.get_json()
+    assert json_data['income'] == [0, 25000, 50000, 75000, 100000]
+    assert json_data['years'] == [2019, 2020]
+    assert len(json_data['predicted_tax']) == 2 and len(json_data['predicted_tax'][0]) == 5
+    computed = client.post('/tax', json={'income': 75000, 'year': 2020}).get_json()['computed_tax']
+    assert json_data['computed_tax'][1][3] == computed
+
+def test_predict_sweep_invalid():
+    """Test bad or oversized sweeps are rejected"""
+    client = app.test_client()
+    assert client.post('/predict/sweep', json={'income_max': 1000}).status_code == 400
+    assert client.post('/predict/sweep', json={'income_max': 10, 'step': 0, 'years': 2020}).status_code == 400
+    too_big = client.post('/predict/sweep', json={'income_max': 1e9, 'step': 1, 'years': [2020]})
+    assert too_big.status_code == 413
+    huge = client.post('/predict/sweep', json={'income_max': 1e308, 'step': 1e-10, 'years': [2017]})
+    assert huge.status_code == 413
+    wide = client.post('/predict/sweep', json={'income_min': -1e308, 'income_max': 1e308, 'step': 1, 'years': 2017})
+    assert wide.status_code == 400
+    assert client.post('/predict/sweep', json={'income_max': 100, 'step': 10, 'years': [10 ** 30]}).status_code == 400
+
+def test_simulate():
+    """Test /simulate returns the baseline first and a higher top rate raises revenue"""
+    client = app.test_client()
+    body = {'year': 2020, 'filers': 20000, 'seed': 3,
+            'distribution': {'kind': 'pareto', 'alpha': 1.5, 'minimum': 30000},
+            'scenarios': [{'name': 'Top +10', 'top_rate': 47}]}
+    response = client.post('/simulate', json=body)
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [row['scenario'] for row in results] == ['Baseline', 'Top +10']
+    assert results[0]['revenue_change'] == 0 and results[1]['revenue_change'] > 0
+    assert client.post('/simulate', json=body).get_json()['results'] == results
+    assert client.post('/simulate', json={'year': 2020}).status_code == 400
+    body['scenarios'] = [{'top_rate': 150}]
+    assert client.post('/simulate', json=body).status_code == 400
+    body['filers'] = 10 ** 12
+    assert client.post('/simulate', json=body).status_code == 413
+
+def test_simulate_rejects_bad_input_and_sends_strict_json():
+    """Test malformed distributions and unknown years get 400, and NaN results come back as null"""
+    client = app.test_client()
+    for year, distribution in ((2020, {'kind': 'lognormal', 'median': [1], 'sigma': 1}),
+                               (2020, {'kind': 'empirical', 'values': 5}),
+                               (2020, {'kind': 'empirical', 'values': [[1, 2]]}),
+                               (1500, {'kind': 'pareto', 'alpha': 1.5, 'minimum': 30000}),
+                               (10 ** 30, {'kind': 'pareto', 'alpha': 1.5, 'minimum': 30000}),
+                               (1e300, {'kind': 'pareto', 'alpha': 1.5, 'minimum': 30000})):
+        response = client.post('/simulate', json={'year': year, 'distribution': distribution, 'filers': 100})
+        assert response.status_code == 400, distribution
+        assert 'error' in response.get_json()
+
+    response = client.post('/simulate', json={'year': 2020, 'filers': 100,
+                                              'distribution': {'kind': 'empirical', 'values': [0, 0]}})
+    assert response.status_code == 200
+    strict = json.loads(response.data, parse_constant=lambda name: pytest.fail(f'{name} in response'))
+    assert strict['results'][0]['effective_rate_pct'] is None
+
+def test_predictions_are_audited(tmp_path, monkeypatch):
+    """Test /predict and /predict/batch results land in the audit log"""
+    from backend import flask_api
+    from backend.shared.audit_log import AuditLog
+    audit = AuditLog(str(tmp_path / 'audit.db'), flush_interval=60)
+    monkeypatch.setattr(flask_api, 'audit', audit)
+    client = app.test_client()
+    tax = client.post('/predict', json={'income': 43217.5, 'year': 2017}).get_json()['predicted_tax']
+    client.post('/predict', json={'income': 43217.5, 'year': 2017})  # answered from the result cache
+    client.post('/predict/batch', json=[{'income': 100, 'year': 2017}, {'income': 'x', 'year': 2017}])
+    assert audit.flush()
+    assert audit.stats()['written'] == 3
+    assert client.get('/audit/stats').get_json()['written'] == 3
+    import sqlite3
+    with sqlite3.connect(audit.path) as conn:
+        rows = conn.execute('SELECT endpoint, income, year, predicted_tax, cached FROM prediction_log '
+                            'ORDER BY id').fetchall()
+    assert rows[0] == ('predict', 43217.5, 2017, tax, 0) and rows[1] == ('predict', 43217.5, 2017, tax, 1)
+    assert rows[2][:3] == ('predict/batch', 100.0, 2017)
+    audit.close()
+
+def test_metrics_endpoint():
+    """Test /metrics reports /predict stage timings, errors, model and cache state"""
+    client = app.test_client()
+    client.post('/predict', json={'income': 12345.67, 'year': 2018})
+    client.post('/predict', json={'income': 12345.67, 'year': 2018})
+    client.post('/predict', json={'income': 50000})
+    client.post('/predict', json={'income': 'abc', 'year': 2018})
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    lines = response.get_data(as_text=True).splitlines()
+    value = lambda prefix: float(next(line for line in lines if line.startswith(prefix)).rsplit(' ', 1)[1])
+    assert value('tax_api_predict_stage_seconds_count{stage="total"') >= 2
+    assert value('tax_api_predict_stage_seconds_bucket{stage="total"') <= value(
+        'tax_api_predict_stage_seconds_count{stage="total"')
+    assert value('tax_api_predict_errors_total{error="missing_fields"') >= 1
+    assert value('tax_api_predict_errors_total{error="invalid_type"') >= 1
+    assert value('tax_api_model_info{') == 1
+    assert value('tax_api_result_cache_lookups_total{result="hit"') >= 1
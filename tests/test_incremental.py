@@ -0,0 +1,43 @@
+import pandas as pd
+
+from backend.shared import config, incremental
+from backend.shared.schema import YEAR
+from scripts import data_pipeline
+
+
+def _split_raw(tmp_path):
+    """Write the raw CSV as two files: years before 1970 and from 1970 on."""
+    with open(config.RAW_DATA_PATH, encoding='utf-8-sig') as fh:
+        header, *rows = fh.read().splitlines()
+    early = [row for row in rows if row[:4].isdigit() and int(row[:4]) < 1970]
+    late = [row for row in rows if row[:4].isdigit() and int(row[:4]) >= 1970]
+    paths = tmp_path / 'early.csv', tmp_path / 'late.csv'
+    for path, part in zip(paths, (early, late)):
+        path.write_text('\n'.join([header] + part) + '\n', encoding='utf-8')
+    return [str(path) for path in paths], late
+
+
+def test_incremental_only_reprocesses_changed_years(tmp_path):
+    """Test incremental updates touch only changed inputs/years and match a full rebuild"""
+    inputs, late = _split_raw(tmp_path)
+    output = str(tmp_path / 'out.parquet')
+
+    first = incremental.update(inputs, output)
+    assert sorted(first.reprocessed) == sorted(inputs)
+    assert incremental.update(inputs, output).reprocessed == []
+
+    # Change one year's rate in the second file
+    edited = [';'.join([row.split(';')[0], '99'] + row.split(';')[2:]) if row.startswith('2000;') else row
+              for row in late]
+    header = open(inputs[1], encoding='utf-8').readline().rstrip('\n')
+    (tmp_path / 'late.csv').write_text('\n'.join([header] + edited) + '\n', encoding='utf-8')
+
+    second = incremental.update(inputs, output)
+    assert second.reprocessed == [inputs[1]]
+    assert second.changed_years == [2000]
+
+    full, _ = data_pipeline.run(inputs, str(tmp_path / 'full.parquet'))
+    key = lambda df: df.sort_values(list(df.columns)).reset_index(drop=True)
+    merged = pd.read_parquet(output)
+    pd.testing.assert_frame_equal(key(merged), key(pd.read_parquet(full)))
+    assert merged.loc[merged[YEAR] == 2000, 'Bottom Bracket Rate %'].tolist() == [99.0]
@@ -0,0 +1,22 @@
+from backend.shared import metrics
+
+
+def test_histogram_buckets_and_render():
+    """Test rows are bucketed by upper bound, NaN stages skipped and rendered cumulatively"""
+    histogram = metrics.Histogram('stage_seconds', 'Stage time.', 'stage', ('parse', 'model'), buckets=(0.1, 1.0))
+    histogram.FLUSH_EVERY = 2
+    histogram.observe((0.1, float('nan')))
+    histogram.observe((0.5, 2.0))
+    histogram.observe((0.05, 0.2))
+    snapshot = histogram.snapshot()
+    assert snapshot['parse'][0] == [2, 3, 3]
+    assert snapshot['model'][0] == [0, 1, 2]
+    assert abs(snapshot['model'][1] - 2.2) < 1e-9
+
+    errors = metrics.Counter('errors_total', 'Errors.', 'error', ('missing_fields',))
+    errors.inc('missing_fields')
+    body = metrics.render((histogram, errors), [metrics.sample('info', 1, (('version', 'a"b'),))])
+    assert 'stage_seconds_bucket{stage="model",pid=' in body
+    assert 'le="+Inf"} 2' in body
+    assert 'errors_total{error="missing_fields",pid=' in body
+    assert 'info{version="a\\"b",pid=' in body
@@ -0,0 +1,56 @@
+import os
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from backend.shared.model_registry import ModelRegistry
+
+
+def _dump_model(path, rate):
+    X = np.array([[2019, 10000.0], [2020, 20000.0], [2021, 30000.0]])
+    model = LinearRegression().fit(X, np.full(3, rate))
+    joblib.dump(model, path)
+
+
+def test_registry_loads_once(tmp_path):
+    """Test the model is loaded once and reused"""
+    path = tmp_path / 'model.pkl'
+    _dump_model(path, 20.0)
+    registry = ModelRegistry(str(path), reload_interval=3600)
+    first = registry.get()
+    assert first is not None
+    assert registry.get() is first
+    assert registry.reloads == 1
+
+
+def test_registry_hot_swaps_changed_file(tmp_path):
+    """Test a new model file is swapped in and gets a new version"""
+    path = tmp_path / 'model.pkl'
+    _dump_model(path, 20.0)
+    registry = ModelRegistry(str(path), reload_interval=3600)
+    old = registry.load()
+
+    _dump_model(path, 30.0)
+    os.utime(path, ns=(old.signature[0] + 10**9, old.signature[0] + 10**9))
+    new = registry.load()
+    assert new.version != old.version
+    assert np.allclose(new.model.predict([[2020, 20000.0]]), 30.0)
+
+
+def test_registry_keeps_previous_model_on_bad_file(tmp_path):
+    """Test a broken model file does not replace the working one"""
+    path = tmp_path / 'model.pkl'
+    _dump_model(path, 20.0)
+    registry = ModelRegistry(str(path), reload_interval=3600)
+    old = registry.load()
+
+    path.write_bytes(b'not a pickle')
+    assert registry.load() is old
+    assert registry.reload_errors == 1
+
+
+def test_registry_missing_file(tmp_path):
+    """Test a missing model file yields None instead of an error"""
+    registry = ModelRegistry(str(tmp_path / 'missing.pkl'))
+    assert registry.get() is None
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'frontend', 'streamlit_app'))
+
+import plotting
+
+
+def test_payload_is_bounded_for_large_inputs():
+    """Test histogram, scatter and box figures stay small however many rows there are"""
+    rng = np.random.default_rng(0)
+    x = rng.lognormal(10, 1, 1_000_000)
+    y = x * 0.3 + rng.normal(0, 1000, len(x))
+    x[0], y[0] = 1e9, -1e9  # a lone outlier must survive the sampling
+
+    hist = plotting.histogram(x, nbins=20, rug=True)
+    assert len(hist.data[0].y) == 20 and hist.data[0].y.sum() == len(x)
+    assert len(hist.data[1].x) <= plotting.MAX_RUG
+
+    fig = plotting.scatter(x, y, color=rng.integers(1913, 2021, len(x)), size=x, max_points=2000)
+    assert fig.data[0].type == 'scattergl'
+    assert len(fig.data[0].x) == 2000 and 1e9 in fig.data[0].x
+    assert len(fig.to_json()) < 200_000
+
+    quartiles = pd.DataFrame({'Year': [2019, 2020], 'min': [0, 1], '25%': [1, 2], '50%': [2, 3],
+                              '75%': [3, 4], 'max': [100, 5]})
+    box = plotting.box(quartiles)
+    assert list(box.data[0].upperfence) == [6.0, 5.0]
+
+
+def test_small_scatter_keeps_every_point():
+    """Test small inputs are drawn in full with the SVG trace"""
+    keep = plotting.density_sample([1, 2, np.nan, 4], [1, 2, 3, 4], max_points=10)
+    assert keep.tolist() == [0, 1, 3]
+    assert plotting.scatter([1, 2, 3], [3, 2, 1]).data[0].type == 'scatter'
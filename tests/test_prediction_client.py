@@ -0,0 +1,61 @@
+import os
+import sys
+import threading
+
+import numpy as np
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'frontend', 'streamlit_app'))
+
+from backend.flask_api import app
+from backend.shared.tax_engine import get_engine
+from prediction_client import PredictionClient
+
+
+def _serve():
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_client_matches_api_single_and_batched():
+    """Test single and concurrent batched predictions go through the API"""
+    server = _serve()
+    try:
+        client = PredictionClient(f'http://127.0.0.1:{server.port}', chunk_size=100)
+        single = client.predict(50000, np.int64(2020))
+        incomes = np.linspace(0, 1e6, 450)
+        many = client.predict_many(incomes, 2020)
+        background = client.submit(incomes, 2020).result(timeout=30)
+        sweep = client.sweep(0, 1e6, 10000, [2019, 2020])
+    finally:
+        server.shutdown()
+
+    assert single.source == 'api'
+    assert many.source == 'api' and len(many.tax) == 450
+    np.testing.assert_array_equal(background.tax, many.tax)
+    assert sweep.source == 'api' and sweep.predicted_tax.shape == (2, 101)
+    np.testing.assert_allclose(sweep.computed_tax, np.round(get_engine().sweep(sweep.income, [2019, 2020]), 2))
+    assert client.stats()['fallbacks'] == 0
+
+
+def test_client_falls_back_to_engine_when_api_is_down():
+    """Test an unreachable API is answered by the in-process engine and then skipped"""
+    server = _serve()
+    url = f'http://127.0.0.1:{server.port}'
+    server.shutdown()
+    server.server_close()
+
+    client = PredictionClient(url, retries=0, cooldown=60)
+    single = client.predict(50000, 2020)
+    many = client.predict_many([10000, 50000], [2019, 2020])
+
+    assert single.source == 'engine' and single.model_version == 'tax-engine'
+    assert single.tax == round(float(get_engine().liability(50000, 2020)), 2)
+    assert many.source == 'engine'
+    assert client.stats() == {'api_calls': 1, 'fallbacks': 2, 'api_down': True}
+
+    # Concurrent chunks each count their fallback
+    client.chunk_size = 1
+    assert client.predict_many(np.arange(200.0), 2020).source == 'engine'
+    assert client.stats()['fallbacks'] == 202
@@ -0,0 +1,49 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'frontend', 'streamlit_app'))
+
+import profiling
+from backend.shared import config
+
+
+def test_sections_are_timed_and_dumped(tmp_path, monkeypatch):
+    """Test section timings add up per name and a cProfile dump is written per rerun"""
+    monkeypatch.setattr(config, 'PROFILE_DIR', str(tmp_path))
+    profiler = profiling.PageProfiler('Tax Trends', 'cprofile')
+    for _ in range(2):
+        with profiler.section('Correlation heatmap'):
+            sum(range(1000))
+    table = profiler.table(total=1.0)
+    assert table.loc[0, 'Section'] == 'Correlation heatmap'
+    assert table.loc[0, 'Calls'] == 2
+
+    path = profiler._dump(table, 1.0)
+    assert path.endswith('.prof') and os.path.exists(path)
+    with open(path[:-len('.prof')] + '.json') as fh:
+        assert json.load(fh)['sections'][0]['Section'] == 'Correlation heatmap'
+
+
+def test_disabled_profiler_is_a_no_op():
+    """Test sections cost nothing and record nothing when profiling is off"""
+    profiler = profiling.PageProfiler('Home', 'off')
+    with profiler.section('Load data'):
+        pass
+    assert profiler.sections == {}
+    assert profiler.section('a') is profiler.section('b')
+
+
+def test_profiler_of_an_aborted_rerun_is_released():
+    """Test a cProfile left enabled by a rerun that never reached report() doesn't block the next one"""
+    import threading
+    aborted = []
+    thread = threading.Thread(target=lambda: aborted.append(profiling.PageProfiler('Home', 'cprofile')))
+    thread.start()
+    thread.join()  # the rerun ended (e.g. st.stop()) without report()
+    assert profiling._active[0] is aborted[0]
+
+    profiler = profiling.PageProfiler('Home', 'cprofile')
+    assert profiler._profiler is not None and profiling._active[0] is profiler
+    profiler._disable()
+    assert profiling._active is None
@@ -0,0 +1,80 @@
+import sqlite3
+
+from backend.shared.result_cache import ResultCache, SQLiteStore
+
+
+def test_lru_eviction_and_ttl():
+    """Test the least recently used entry is evicted and expired entries miss"""
+    cache = ResultCache(maxsize=2, ttl=60)
+    cache.set(50000, 2020, 'v1', 1.0)
+    cache.set(60000, 2020, 'v1', 2.0)
+    assert cache.get(50000.001, '2020', 'v1') == 1.0  # normalized key
+    cache.set(70000, 2020, 'v1', 3.0)
+    assert cache.get(60000, 2020, 'v1') is None
+    assert cache.stats()['evictions'] == 1
+
+    expired = ResultCache(maxsize=10, ttl=-1)
+    expired.set(50000, 2020, 'v1', 1.0)
+    assert expired.get(50000, 2020, 'v1') is None
+    assert expired.stats()['expirations'] == 1
+
+
+def test_new_model_version_invalidates():
+    """Test entries for an old model version are dropped when a new version is seen"""
+    cache = ResultCache(maxsize=10, ttl=60)
+    cache.set(50000, 2020, 'v1', 1.0)
+    assert cache.get(50000, 2020, 'v2') is None
+    stats = cache.stats()
+    assert stats['invalidations'] == 1
+    assert stats['size'] == 0
+    assert stats['model_version'] == 'v2'
+
+
+def test_sqlite_store_is_shared(tmp_path):
+    """Test two caches (as in two workers) share hits through SQLite"""
+    path = str(tmp_path / 'cache.db')
+    first = ResultCache(maxsize=10, ttl=60, store=SQLiteStore(path))
+    second = ResultCache(maxsize=10, ttl=60, store=SQLiteStore(path))
+    first.set(50000, 2020, 'v1', 1.0)
+    assert second.get(50000, 2020, 'v1') == 1.0
+    assert second.stats()['shared_hits'] == 1
+
+    second.get(50000, 2020, 'v2')  # second worker sees a new model: old rows are purged
+    assert SQLiteStore(path).get((50000.0, 2020, 'v1'), 0) is None
+
+
+class LockedStore(SQLiteStore):
+    def __init__(self):
+        self._writes = 0
+
+    def _connect(self):
+        raise sqlite3.OperationalError('database is locked')
+
+
+def test_store_errors_are_misses():
+    """Test a failing shared store turns lookups into counted misses instead of errors"""
+    cache = ResultCache(maxsize=10, ttl=60, store=LockedStore())
+    cache.set(50000, 2020, 'v1', 1.0)
+    assert cache.get(50000, 2020, 'v1') == 1.0
+    assert cache.get(60000, 2020, 'v1') is None
+    assert cache.get(50000, 2020, 'v2') is None  # purge and lookup both fail
+    stats = cache.stats()
+    assert stats['store_errors'] == 4 and stats['misses'] == 2 and stats['hits'] == 1
+
+
+class DownStore:
+    """A custom RESULT_CACHE_BACKEND store whose server is unreachable."""
+
+    def __getattr__(self, name):
+        def call(*args):
+            raise ConnectionError('store unreachable')
+        return call
+
+
+def test_custom_store_errors_are_misses():
+    """Test any exception from a custom store is a counted miss, including clear()"""
+    cache = ResultCache(maxsize=10, ttl=60, store=DownStore())
+    cache.set(50000, 2020, 'v1', 1.0)
+    assert cache.get(60000, 2020, 'v1') is None
+    cache.clear()
+    assert cache.stats()['store_errors'] == 3
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from backend.shared import config, schema
+
+
+def test_parse_numeric_handles_currency_percent_and_blanks():
+    """Test dirty numeric strings parse in one call"""
+    raw = pd.Series(['37', '39.6\xa0', '$622,050', '10%', '', None, 'n/a', '-2.5'], dtype=object)
+    parsed = schema.parse_numeric(raw)
+    expected = [37.0, 39.6, 622050.0, 10.0, np.nan, np.nan, np.nan, -2.5]
+    assert np.allclose(parsed, expected, equal_nan=True)
+
+
+def test_load_raw_has_canonical_schema():
+    """Test the raw CSV loads with canonical names and dtypes and no junk columns"""
+    df = schema.load_raw(config.RAW_DATA_PATH)
+    assert df.columns.tolist() == schema.COLUMNS
+    assert df.dtypes.astype(str).to_dict() == schema.DTYPES
+    assert len(df) == 109
+    assert df.notna().all().all()
+
+
+def test_clean_frame_accepts_raw_and_legacy_frames():
+    """Test raw pandas frames and old snake_case frames clean to the same result"""
+    raw = pd.read_csv(config.RAW_DATA_PATH, sep=';')
+    cleaned = schema.clean_frame(raw)
+    pd.testing.assert_frame_equal(cleaned, schema.load_raw(config.RAW_DATA_PATH))
+
+    legacy = cleaned.rename(columns={v: k for k, v in schema.LEGACY_NAMES.items()})
+    pd.testing.assert_frame_equal(schema.clean_frame(legacy), cleaned)
@@ -0,0 +1,43 @@
+import json
+
+from backend.shared import config
+from backend.shared.schema import FEATURES, TARGET, load_raw
+from scripts import search_models
+
+
+def test_search_ranks_and_prunes_candidates():
+    """Test the CV search ranks complete candidates first and stops bad ones early"""
+    df = load_raw(config.RAW_DATA_PATH)[FEATURES + [TARGET]].dropna()
+    grid = {'linear': {}, 'random_forest': {'n_estimators': [10, 20], 'min_samples_leaf': [3]}}
+
+    board = search_models.search(df, grid, folds=3, jobs=2, prune_ratio=2.0)
+
+    assert len(board) == 3
+    assert board['rank'].tolist() == [1, 2, 3]
+    assert board.iloc[0]['family'] == 'random_forest' and board.iloc[0]['folds'] == 3
+    linear = board[board['family'] == 'linear'].iloc[0]
+    assert linear['status'] == 'pruned' and linear['folds'] == 1
+    assert (board[['fit_time_s', 'predict_us_per_row', 'predict_latency_ms']] > 0).all().all()
+
+    model = search_models.fit_best(df, board)
+    assert model.get_params()['n_estimators'] == json.loads(board.iloc[0]['params'])['n_estimators']
+    assert model.predict(df[FEATURES].to_numpy()[:2]).shape == (2,)
+
+
+def test_random_search_samples_grid():
+    """Test random search draws a reproducible subset of the grid"""
+    first = search_models.candidates(search_models.DEFAULT_GRID, 'random', n_iter=5, seed=1)
+    again = search_models.candidates(search_models.DEFAULT_GRID, 'random', n_iter=5, seed=1)
+    assert len(first) == 5 and first == again
+
+
+def test_rebuilt_cache_is_not_served_stale(tmp_path):
+    """Test a worker reusing a rebuilt cache directory maps the new arrays, not the old ones"""
+    df = load_raw(config.RAW_DATA_PATH)[FEATURES + [TARGET]].dropna()
+    first = search_models.prepare_cache(df, str(tmp_path), folds=3)
+    assert len(search_models._arrays(first)[1]) == len(df)
+
+    second = search_models.prepare_cache(df.iloc[:50], str(tmp_path), folds=3)
+    assert second != first
+    assert len(search_models._arrays(second)[1]) == 50
+    assert search_models.evaluate_fold(second, 'linear', {}, 0)['mse'] >= 0
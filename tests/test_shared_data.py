@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from backend.shared import config, shared_data, storage
+from backend.shared.schema import YEAR
+from backend.shared.tax_engine import TaxEngine
+
+
+def _publish(tmp_path, years=range(2000, 2010)):
+    data_path = str(tmp_path / 'data.parquet')
+    storage.write_processed(pd.DataFrame({YEAR: list(years), 'Rate': np.linspace(1, 2, len(years))}), data_path)
+    path = str(tmp_path / 'shared.bin')
+    return path, data_path, shared_data.publish(path, data_path, config.RAW_DATA_PATH)
+
+
+def test_readers_get_zero_copy_views_of_the_published_data(tmp_path):
+    """Test attached columns and bracket tables are read-only views that match the sources"""
+    path, data_path, header = _publish(tmp_path)
+    snapshot = shared_data.Snapshot(path)
+
+    df = snapshot.frame()
+    assert header['version'] == snapshot.version == 1
+    assert df.equals(storage.read_processed(data_path))
+    years = df[YEAR].to_numpy()
+    assert not years.flags.writeable and np.shares_memory(years, np.frombuffer(snapshot._mmap, np.uint8))
+
+    engine = snapshot.engine()
+    reference = TaxEngine.from_csv(config.RAW_DATA_PATH)
+    incomes = np.linspace(0, 1e6, 50)
+    assert np.array_equal(engine.liability(incomes, 1990), reference.liability(incomes, 1990))
+    assert snapshot.is_current('dataset', data_path) and snapshot.is_current('brackets', config.RAW_DATA_PATH)
+
+
+def test_publish_swaps_versions_atomically(tmp_path, monkeypatch):
+    """Test a new publish bumps the version, old views stay valid and stale data is not served"""
+    path, data_path, _ = _publish(tmp_path)
+    shared = shared_data.SharedData(path, check_interval=0)
+    old = shared.get()
+    old_years = old.frame()[YEAR]
+
+    _, _, header = _publish(tmp_path, years=range(2010, 2013))
+    assert header['version'] == 2
+    assert old_years.tolist() == list(range(2000, 2010))
+    assert shared.get().version == 2 and shared.get().frame()[YEAR].tolist() == [2010, 2011, 2012]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+    monkeypatch.setattr(shared_data, '_shared', shared)
+    assert shared_data.read_processed(data_path, years=(2011, None))[YEAR].tolist() == [2011, 2012]
+    # The processed file changed after publishing: read it from disk instead
+    storage.write_processed(pd.DataFrame({YEAR: [1999], 'Rate': [3.0]}), data_path)
+    assert shared.current('dataset', data_path) is None
+    assert shared_data.read_processed(data_path)[YEAR].tolist() == [1999]
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from backend.shared import simulation
+from backend.shared.tax_engine import get_engine
+
+LOGNORMAL = {'kind': 'lognormal', 'median': 40000, 'sigma': 1.0}
+
+
+def test_baseline_matches_engine_and_jobs_do_not_change_results(monkeypatch):
+    """Test the baseline revenue is the engine's tax on the drawn filers, for any number of workers"""
+    monkeypatch.setattr(simulation, 'BLOCK_FILERS', 5000)
+    engine = get_engine()
+    scenarios = [{'name': 'Top 50', 'top_rate': 50}, {'name': 'Lower limit', 'bottom_limit': 5000}]
+    inline = simulation.simulate(engine, 2018, scenarios, LOGNORMAL, filers=12000, seed=7, jobs=1)
+    pooled = simulation.simulate(engine, 2018, scenarios, LOGNORMAL, filers=12000, seed=7, jobs=2)
+    assert inline.equals(pooled)
+
+    incomes = np.concatenate([simulation.draw_incomes(LOGNORMAL, size, np.random.default_rng([7, block]))
+                              for block, size in enumerate((5000, 5000, 2000))])
+    assert inline.loc[0, 'revenue'] == pytest.approx(engine.liability(incomes, 2018).sum())
+    assert inline['scenario'].tolist() == ['Baseline', 'Top 50', 'Lower limit']
+    assert (inline.loc[1:, 'revenue_change'] > 0).all() and (inline['paying_less_pct'] == 0).all()
+    assert inline.filter(like='_filers_pct').sum(axis=1).round(6).eq(100).all()
+
+
+def test_distributions_and_population_scaling():
+    """Test each income distribution, population scaling and invalid input"""
+    engine = get_engine()
+    pareto = simulation.draw_incomes({'kind': 'pareto', 'alpha': 2.0, 'minimum': 10000}, 1000,
+                                     np.random.default_rng(0))
+    assert pareto.min() >= 10000
+    empirical = simulation.draw_incomes({'kind': 'empirical', 'values': [1, 2]}, 100, np.random.default_rng(0))
+    assert set(empirical) == {1.0, 2.0}
+
+    small = simulation.simulate(engine, 2018, [], LOGNORMAL, filers=1000)
+    scaled = simulation.simulate(engine, 2018, [], LOGNORMAL, filers=1000, population=1e6)
+    assert scaled.loc[0, 'revenue'] == pytest.approx(small.loc[0, 'revenue'] * 1000)
+
+    with pytest.raises(ValueError):
+        simulation.simulate(engine, 2018, [], {'kind': 'lognormal', 'median': 1}, filers=10)
+    with pytest.raises(ValueError):
+        simulation.simulate(engine, 2018, [{'name': 'bad', 'top_rate': -1}], LOGNORMAL, filers=10)
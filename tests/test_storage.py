@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.shared.storage import iter_part, read_processed, write_processed
+
+
+def _frame():
+    years = np.repeat(np.arange(2000, 2010), 3)
+    return pd.DataFrame({
+        'Year': years,
+        'Bottom Bracket Rate %': np.linspace(1, 30, len(years)),
+        'Top Bracket Rate %': np.linspace(30, 90, len(years)),
+    })
+
+
+@pytest.mark.parametrize('name', ['data.parquet', 'data.feather', 'data.pkl'])
+def test_round_trip_with_projection_and_year_range(tmp_path, name):
+    """Test every format supports column projection and a year range"""
+    df = _frame()
+    path = str(tmp_path / name)
+    write_processed(df, path)
+
+    pd.testing.assert_frame_equal(read_processed(path), df, check_dtype=False)
+
+    subset = read_processed(path, columns=['Top Bracket Rate %', 'missing'], years=(2003, 2004))
+    expected = df.loc[df['Year'].between(2003, 2004), ['Top Bracket Rate %']].reset_index(drop=True)
+    pd.testing.assert_frame_equal(subset, expected)
+
+
+def test_falls_back_to_pickle(tmp_path):
+    """Test a missing parquet file falls back to the legacy pickle"""
+    df = _frame()
+    df.to_pickle(tmp_path / 'data.pkl')
+    loaded = read_processed(str(tmp_path / 'data.parquet'), years=(2009, None))
+    assert loaded['Year'].unique().tolist() == [2009]
+
+
+def test_missing_data_raises(tmp_path):
+    """Test a clear error when there is nothing to read"""
+    with pytest.raises(FileNotFoundError):
+        read_processed(str(tmp_path / 'data.parquet'))
+
+
+@pytest.mark.parametrize('name', ['data.parquet', 'data.feather', 'data.pkl'])
+def test_legacy_snake_case_files_read_with_canonical_names(tmp_path, name):
+    """Test files written with the old snake_case names come back under the canonical ones"""
+    df = _frame()
+    legacy = df.rename(columns={'Year': 'year', 'Bottom Bracket Rate %': 'bottom_bracket_rate_percent',
+                                'Top Bracket Rate %': 'top_bracket_rate_percent'})
+    path = tmp_path / name
+    getattr(legacy, {'.parquet': 'to_parquet', '.feather': 'to_feather', '.pkl': 'to_pickle'}[path.suffix])(path)
+
+    subset = read_processed(str(path), columns=['Bottom Bracket Rate %'], years=(2003, 2004))
+    expected = df.loc[df['Year'].between(2003, 2004), ['Bottom Bracket Rate %']].reset_index(drop=True)
+    pd.testing.assert_frame_equal(subset, expected)
+    parts = list(iter_part(str(path), 0, columns=['Year', 'Top Bracket Rate %']))
+    assert list(parts[0].columns) == ['Year', 'Top Bracket Rate %']
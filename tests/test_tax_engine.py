@@ -0,0 +1,57 @@
+import numpy as np
+
+from backend.shared.tax_engine import TaxEngine, get_engine, income_grid
+
+
+def _engine():
+    # 2019: 10% up to 10k, 20% to 50k, 30% above; 2020: 5% up to 20k, 15% to 100k, 25% above
+    thresholds = np.array([[0, 10000, 50000], [0, 20000, 100000]], dtype=float)
+    rates = np.array([[0.10, 0.20, 0.30], [0.05, 0.15, 0.25]])
+    return TaxEngine([2020, 2019], thresholds[::-1], rates[::-1])
+
+
+def test_liability_matches_hand_computed_brackets():
+    """Test liability against brackets worked out by hand"""
+    engine = _engine()
+    incomes = np.array([0, 5000, 10000, 30000, 50000, 80000])
+    expected = np.array([0, 500, 1000, 5000, 9000, 18000])
+    assert np.allclose(engine.liability(incomes, 2019), expected)
+
+
+def test_mixed_years_match_single_year():
+    """Test a mixed-year array gives the same answer as per-year calls"""
+    engine = _engine()
+    incomes = np.random.default_rng(0).uniform(0, 200000, 1000)
+    years = np.where(np.arange(1000) % 2 == 0, 2019, 2020)
+    mixed = engine.liability(incomes, years)
+    for year in (2019, 2020):
+        assert np.allclose(mixed[years == year], engine.liability(incomes[years == year], year))
+
+
+def test_years_outside_data_are_clamped():
+    """Test years before/after the data use the nearest schedule"""
+    engine = _engine()
+    assert engine.liability(30000, 1990) == engine.liability(30000, 2019)
+    assert engine.liability(30000, 2030) == engine.liability(30000, 2020)
+
+
+def test_engine_from_raw_data():
+    """Test the engine built from tax_data.csv is continuous and non-negative"""
+    engine = get_engine()
+    schedule = engine.schedule(2020)
+    assert list(schedule['Rate %']) == [10.0, 23.5, 37.0]
+    at_threshold = schedule['Income Over'].to_numpy()
+    below = engine.liability(at_threshold - 1e-6, 2020)
+    above = engine.liability(at_threshold, 2020)
+    assert np.allclose(below[1:], above[1:])
+    assert engine.liability(-100, 2020) == 0
+
+
+def test_sweep_grid():
+    """Test a sweep gives one liability row per year over an inclusive income grid"""
+    engine = _engine()
+    incomes = income_grid(0, 100000, 25000)
+    assert incomes.tolist() == [0, 25000, 50000, 75000, 100000]
+    curves = engine.sweep(incomes, [2019, 2020])
+    assert curves.shape == (2, 5)
+    assert np.allclose(curves[1], engine.liability(incomes, 2020))
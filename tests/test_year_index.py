@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from backend.shared.year_index import YearIndex
+
+
+def test_year_slices_match_boolean_filter():
+    """Test per-year slices equal the old boolean filter and the year list is sorted"""
+    df = pd.DataFrame({'Year': [2020, 1913, 2020, 1950, 1913], 'Top Bracket Rate %': [37.0, 7.0, 39.6, 91.0, 6.0]})
+    index = YearIndex(df)
+    assert index.years == [1913, 1950, 2020]
+    assert index.counts() == {1913: 2, 1950: 1, 2020: 2}
+    for year in index.years:
+        expected = df[df['Year'] == year].reset_index(drop=True)
+        pd.testing.assert_frame_equal(index.year(year).reset_index(drop=True), expected)
+    assert len(index.select('All')) == 5
+    assert index.year(1999).empty
+
+
+def test_sorted_input_is_sliced_without_copying():
+    """Test already-sorted data is not copied and slices share its memory"""
+    df = pd.DataFrame({'Year': np.repeat(np.arange(2000, 2010), 1000), 'Rate': np.arange(10000.0)})
+    index = YearIndex(df)
+    assert np.shares_memory(index.year(2005)['Rate'].to_numpy(), df['Rate'].to_numpy())